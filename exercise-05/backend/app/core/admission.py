@@ -0,0 +1,110 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.core.metrics import admission_in_flight, admission_queue_depth
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+QUEUE_FULL = "queue_full"
+TIMEOUT = "timeout"
+
+
+class ConcurrencyLimit:
+    """At most ``limit`` requests of one group in flight.
+
+    Up to ``queue_size`` more wait, first come first served, for at most
+    ``timeout`` seconds; anything beyond that is turned away at once, so a
+    slow database makes clients retry instead of piling up in the
+    threadpool. Used from a single event loop, so no lock is needed.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot; return ``None`` once admitted, or why not."""
+        if self.active < self.limit and not self._waiters:
+            self._admit()
+            return None
+        if len(self._waiters) >= self.queue_size:
+            return QUEUE_FULL
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        admission_queue_depth.inc((self.name,))
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended.
+                self.release()
+            if not isinstance(e, asyncio.TimeoutError):
+                raise
+            return TIMEOUT
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            admission_queue_depth.dec((self.name,))
+        return None
+
+    def release(self) -> None:
+        admission_in_flight.dec((self.name,))
+        self.active -= 1
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._admit()
+                waiter.set_result(None)
+                return
+
+    def _admit(self) -> None:
+        self.active += 1
+        admission_in_flight.inc((self.name,))
+
+
+class AdmissionController:
+    """Picks the concurrency limit a request counts against.
+
+    ``route_limits`` maps ``"[METHOD ]/path/prefix"`` to its own limit, the
+    longest matching prefix wins; other requests share the ``read`` limit
+    (GET, HEAD, OPTIONS) or the ``write`` limit. Paths starting with one of
+    ``exempt`` are never limited.
+    """
+
+    def __init__(
+        self,
+        read_limit: int,
+        write_limit: int,
+        queue_size: int,
+        timeout: float,
+        route_limits: Optional[Dict[str, int]] = None,
+        exempt: Optional[List[str]] = None,
+    ):
+        self.read = ConcurrencyLimit("read", read_limit, queue_size, timeout)
+        self.write = ConcurrencyLimit("write", write_limit, queue_size, timeout)
+        self.routes: List[Tuple[Optional[str], str, ConcurrencyLimit]] = []
+        for route, limit in (route_limits or {}).items():
+            method, _, prefix = route.rpartition(" ")
+            self.routes.append(
+                (method.upper() or None, prefix, ConcurrencyLimit(route, limit, queue_size, timeout))
+            )
+        self.routes.sort(key=lambda entry: len(entry[1]), reverse=True)
+        self.exempt = exempt or []
+
+    def limit_for(self, method: str, path: str) -> Optional[ConcurrencyLimit]:
+        if any(path.startswith(prefix) for prefix in self.exempt):
+            return None
+        for route_method, prefix, limit in self.routes:
+            if path.startswith(prefix) and route_method in (None, method):
+                return limit
+        return self.read if method in READ_METHODS else self.write
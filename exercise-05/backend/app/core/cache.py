@@ -0,0 +1,199 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Protocol
+
+from app.core.config import settings
+from app.core.logger import logger
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[str]: ...
+
+    def set(self, key: str, value: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+class MemoryCacheBackend:
+    """LRU dict bounded by entry count, with a per-entry TTL."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """File-backed LRU shared by every worker on the same host."""
+
+    def __init__(self, path: str, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_response_cache_accessed_at "
+            "ON response_cache (accessed_at)"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now),
+            )
+            overflow = len(self) - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM response_cache WHERE key IN ("
+                    "SELECT key FROM response_cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """Serialized responses keyed by request parameters.
+
+    Keys are expected to embed a generation number, so a write that bumps the
+    generation makes every older entry unreachable; TTL and LRU eviction then
+    reclaim the space.
+    """
+
+    def __init__(self, name: str, backend: Optional[CacheBackend]):
+        self.name = name
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.backend.get(f"{self.name}:{key}")
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self.backend.set(f"{self.name}:{key}", value)
+
+    def clear(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.backend) if self.backend is not None else 0,
+            "evictions": getattr(self.backend, "evictions", 0),
+        }
+
+
+def make_cache_key(*parts) -> str:
+    return "|".join("" if p is None else str(p) for p in parts)
+
+
+def build_cache_backend(kind: str, ttl: float, max_entries: int) -> Optional[CacheBackend]:
+    if kind == "memory":
+        return MemoryCacheBackend(ttl, max_entries)
+    if kind == "sqlite":
+        return SQLiteCacheBackend(settings.VEHICLE_CACHE_PATH, ttl, max_entries)
+    if kind != "none":
+        logger.warning(f"Unknown cache backend '{kind}', caching disabled")
+    return None
+
+
+vehicle_cache = ResponseCache(
+    "vehicles",
+    build_cache_backend(
+        settings.VEHICLE_CACHE_BACKEND,
+        settings.VEHICLE_CACHE_TTL,
+        settings.VEHICLE_CACHE_MAX_ENTRIES,
+    ),
+)
+
+# Listing totals, keyed like the pages by table version and filters, so
+# paging through one result set counts it once.
+count_cache = ResponseCache(
+    "counts",
+    build_cache_backend(
+        settings.COUNT_CACHE_BACKEND,
+        settings.COUNT_CACHE_TTL,
+        settings.COUNT_CACHE_MAX_ENTRIES,
+    ),
+)
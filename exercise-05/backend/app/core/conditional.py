@@ -0,0 +1,58 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """Strong entity tag derived from the values that determine a response."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """Evaluate ``If-None-Match`` and, only when it is absent,
+    ``If-Modified-Since`` as RFC 9110 requires."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # If-None-Match uses the weak comparison.
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have whole-second precision.
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def set_validators(
+    response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> None:
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(
+            _as_utc(last_modified), usegmt=True
+        )
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified)
+    return response
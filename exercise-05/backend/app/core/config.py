@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
 
@@ -9,11 +9,116 @@ class Settings(BaseSettings):
     )
 
     DATABASE_URL: str = None
+    READ_DATABASE_URLS: str = ""
+    READ_REPLICA_STRATEGY: str = "round_robin"
+    READ_AFTER_WRITE_SECONDS: float = 5.0
 
     API_PREFIX: str = "/api"
     DEBUG: bool = True
     ALLOWED_ORIGINS: str = ""
 
+    INIT_ON_STARTUP: bool = True
+
+    LOG_FILE: str = "app.log"
+    LOG_FORMAT: str = "text"
+    LOG_BUFFER_SIZE: int = 1000
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_ROTATE_SECONDS: int = 24 * 60 * 60
+    LOG_BACKUP_COUNT: int = 30
+    LOG_COMPRESS: bool = False
+    LOG_INDEX_INTERVAL: int = 64 * 1024
+
+    ORJSON_RESPONSES: bool = False
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1000
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+
+    METRICS_ENABLED: bool = True
+    METRICS_DIR: Optional[str] = None
+    METRICS_FLUSH_SECONDS: float = 1.0
+
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_READ_LIMIT: int = 32
+    ADMISSION_WRITE_LIMIT: int = 8
+    ADMISSION_QUEUE_SIZE: int = 64
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    ADMISSION_RETRY_AFTER: int = 1
+    ADMISSION_ROUTE_LIMITS: str = ""
+    ADMISSION_EXEMPT_PATHS: str = (
+        "/metrics,/api/logs/stream,/api/changes/stream,/docs,/redoc,/openapi.json"
+    )
+
+    RATE_LIMIT_BACKEND: str = "none"
+    RATE_LIMIT_PER_SECOND: float = 10.0
+    RATE_LIMIT_BURST: int = 20
+    RATE_LIMIT_MAX_KEYS: int = 10000
+    RATE_LIMIT_PATH: str = "./ratelimit.db"
+    RATE_LIMIT_KEY_HEADER: str = ""
+
+    SLOW_QUERY_MS: float = 200.0
+
+    BRAND_REGISTRY_TTL: float = 5.0
+
+    VEHICLE_CACHE_BACKEND: str = "memory"
+    VEHICLE_CACHE_TTL: float = 30.0
+    VEHICLE_CACHE_MAX_ENTRIES: int = 1024
+    VEHICLE_CACHE_PATH: str = "./cache.db"
+
+    COUNT_CACHE_BACKEND: str = "memory"
+    COUNT_CACHE_TTL: float = 300.0
+    COUNT_CACHE_MAX_ENTRIES: int = 4096
+
+    BULK_BATCH_SIZE: int = 1000
+    EXPORT_YIELD_PER: int = 1000
+    IMPORT_CHUNK_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 1000
+    BRAND_DELETE_CHUNK_SIZE: int = 5000
+    ARCHIVE_AFTER_DAYS: float = 90.0
+    ARCHIVE_CHUNK_SIZE: int = 1000
+    ARCHIVE_INTERVAL_SECONDS: float = 3600.0
+
+    JOBS_ENABLED: bool = True
+    JOBS_WORKERS: int = 4
+    JOBS_CONCURRENCY: str = (
+        "export=2,import=1,rebuild_stats=1,delete_brand=1,archive_vehicles=1,purge_changes=1"
+    )
+    JOBS_DIR: str = "./jobs"
+    JOBS_POLL_SECONDS: float = 1.0
+    JOBS_STALE_SECONDS: float = 60.0
+    JOBS_RETENTION_DAYS: float = 7.0
+
+    CHANGES_POLL_SECONDS: float = 1.0
+    CHANGES_BUFFER_SIZE: int = 1000
+    CHANGES_RETENTION_HOURS: float = 24.0
+    CHANGES_PURGE_INTERVAL_SECONDS: float = 3600.0
+
+    @field_validator("READ_DATABASE_URLS")
+    def parse_read_database_urls(cls, v: str) -> List[str]:
+        return [u.strip() for u in v.split(",") if u.strip()] if v else []
+
+    @field_validator("JOBS_CONCURRENCY")
+    def parse_jobs_concurrency(cls, v: str) -> Dict[str, int]:
+        limits = {}
+        for entry in v.split(",") if v else []:
+            job_type, _, limit = entry.partition("=")
+            if job_type.strip():
+                limits[job_type.strip()] = int(limit)
+        return limits
+
+    @field_validator("ADMISSION_ROUTE_LIMITS")
+    def parse_admission_route_limits(cls, v: str) -> Dict[str, int]:
+        limits = {}
+        for entry in v.split(",") if v else []:
+            route, _, limit = entry.rpartition("=")
+            if route.strip():
+                limits[route.strip()] = int(limit)
+        return limits
+
+    @field_validator("ADMISSION_EXEMPT_PATHS")
+    def parse_admission_exempt_paths(cls, v: str) -> List[str]:
+        return [p.strip() for p in v.split(",") if p.strip()] if v else []
+
     @field_validator("ALLOWED_ORIGINS")
     def parse_allowed_origins(cls, v: str) -> List[str]:
         if v == "*":
@@ -0,0 +1,238 @@
+import bisect
+import gzip
+import io
+import logging
+import os
+import re
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import BaseRotatingHandler
+from typing import IO, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.core.log_tail import LineFilter
+
+INDEX_SUFFIX = ".idx"
+STAMP_FORMAT = "%Y%m%dT%H%M%S%f"
+
+TEXT_TIME = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d),(\d{3})\]")
+JSON_TIME = re.compile(r'^\{"time": "([^"]+)"')
+
+
+class IndexedRotatingFileHandler(BaseRotatingHandler):
+    """File handler that rotates by size or age and keeps a sparse index.
+
+    Every ``index_interval`` bytes the handler appends ``<created> <offset>``
+    to ``<file>.idx``, so a reader can seek close to a timestamp without
+    scanning the segment. Closed segments are renamed to
+    ``<file>.<start time>`` and, with ``compress``, gzipped one index block
+    per gzip member so the index offsets stay seekable.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 0,
+        interval: float = 0,
+        backup_count: int = 0,
+        compress: bool = False,
+        index_interval: int = 65536,
+    ):
+        super().__init__(filename, "a", encoding="utf-8")
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.compress = compress
+        self.index_interval = index_interval
+        self.index_path = self.baseFilename + INDEX_SUFFIX
+
+        entries = read_index(self.index_path)
+        self._last_indexed = entries[-1][1] if entries else None
+        if entries:
+            self._segment_start = entries[0][0]
+        elif os.path.getsize(self.baseFilename):
+            self._segment_start = os.path.getmtime(self.baseFilename)
+        else:
+            self._segment_start = None
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+        size = self.stream.tell()
+        if size == 0:
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        return bool(
+            self.interval
+            and self._segment_start is not None
+            and record.created - self._segment_start >= self.interval
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            offset = self.stream.tell()
+            if self._last_indexed is None or offset - self._last_indexed >= self.index_interval:
+                with open(self.index_path, "a", encoding="utf-8") as index:
+                    index.write(f"{record.created:.6f} {offset}\n")
+                self._last_indexed = offset
+                if self._segment_start is None:
+                    self._segment_start = record.created
+            logging.FileHandler.emit(self, record)
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        start = self._segment_start or os.path.getmtime(self.baseFilename)
+        stamp = datetime.fromtimestamp(start, timezone.utc).strftime(STAMP_FORMAT)
+        segment = f"{self.baseFilename}.{stamp}"
+        os.replace(self.baseFilename, segment)
+        if os.path.exists(self.index_path):
+            os.replace(self.index_path, segment + INDEX_SUFFIX)
+        if self.compress:
+            compress_segment(segment)
+        if self.backup_count:
+            for old in list_segments(self.baseFilename)[: -self.backup_count]:
+                _remove(old.path)
+                _remove(old.path + INDEX_SUFFIX)
+
+        self._segment_start = None
+        self._last_indexed = None
+
+
+class Segment(NamedTuple):
+    path: str
+    start: float
+    compressed: bool
+
+
+def read_index(path: str) -> List[Tuple[float, int]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = []
+            for line in f:
+                created, _, offset = line.partition(" ")
+                if offset.strip():
+                    entries.append((float(created), int(offset)))
+            return entries
+    except FileNotFoundError:
+        return []
+
+
+def compress_segment(path: str) -> str:
+    """Gzip ``path`` one index block per member and rewrite the index with
+    the compressed offsets. Returns the path of the compressed segment."""
+    entries = read_index(path + INDEX_SUFFIX) or [(os.path.getmtime(path), 0)]
+    target = path + ".gz"
+    compressed_entries = []
+    with open(path, "rb") as source, open(target, "wb") as out:
+        ends = [offset for _, offset in entries[1:]] + [None]
+        for (created, offset), end in zip(entries, ends):
+            source.seek(offset)
+            block = source.read() if end is None else source.read(end - offset)
+            compressed_entries.append((created, out.tell()))
+            out.write(gzip.compress(block))
+    with open(target + INDEX_SUFFIX, "w", encoding="utf-8") as index:
+        index.writelines(f"{created:.6f} {offset}\n" for created, offset in compressed_entries)
+    _remove(path)
+    _remove(path + INDEX_SUFFIX)
+    return target
+
+
+def list_segments(path: str) -> List[Segment]:
+    """Closed segments of ``path`` oldest first, followed by ``path`` itself."""
+    directory, base = os.path.split(os.path.abspath(path))
+    pattern = re.compile(rf"^{re.escape(base)}\.(\d{{8}}T\d{{12}})(\.gz)?$")
+    segments = []
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            start = (
+                datetime.strptime(match.group(1), STAMP_FORMAT)
+                .replace(tzinfo=timezone.utc)
+                .timestamp()
+            )
+            segments.append(Segment(os.path.join(directory, name), start, bool(match.group(2))))
+    segments.sort(key=lambda s: s.start)
+    if os.path.exists(path):
+        entries = read_index(path + INDEX_SUFFIX)
+        start = entries[0][0] if entries else (segments[-1].start if segments else 0.0)
+        segments.append(Segment(os.path.abspath(path), start, False))
+    return segments
+
+
+def line_time(line: str) -> Optional[float]:
+    match = TEXT_TIME.match(line)
+    if match:
+        # asctime is written in local time, which is what a naive
+        # datetime's timestamp() assumes as well.
+        created = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S")
+        return created.timestamp() + int(match.group(2)) / 1000
+    match = JSON_TIME.match(line)
+    if match:
+        return datetime.fromisoformat(match.group(1)).timestamp()
+    return None
+
+
+def query_logs(
+    path: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    level: Optional[str] = None,
+    limit: int = 100,
+) -> str:
+    """Return up to the last ``limit`` lines logged between ``since`` and
+    ``until`` at or above ``level``.
+
+    Only segments overlapping the window are opened, and each is entered at
+    the last index entry before ``since``.
+    """
+    segments = list_segments(path)
+    ends = [s.start for s in segments[1:]] + [float("inf")]
+    line_filter = LineFilter(level)
+    kept = deque(maxlen=limit)
+    for segment, end in zip(segments, ends):
+        if since is not None and end < since:
+            continue
+        if until is not None and segment.start > until:
+            break
+        for created, line in _read_segment(segment, since):
+            if since is not None and created is not None and created < since:
+                continue
+            if until is not None and created is not None and created > until:
+                return "".join(kept)
+            if line_filter(line):
+                kept.append(line)
+    return "".join(kept)
+
+
+def _read_segment(segment: Segment, since: Optional[float]) -> Iterator[Tuple[Optional[float], str]]:
+    entries = read_index(segment.path + INDEX_SUFFIX)
+    offset = 0
+    if since is not None and entries:
+        position = bisect.bisect_right([created for created, _ in entries], since)
+        offset = entries[max(position - 1, 0)][1]
+
+    with open(segment.path, "rb") as raw:
+        raw.seek(offset)
+        stream: IO[bytes] = gzip.GzipFile(fileobj=raw) if segment.compressed else raw
+        created = None
+        for line in io.TextIOWrapper(stream, encoding="utf-8", errors="replace"):
+            # Lines without a timestamp, such as tracebacks, belong to the
+            # record above them.
+            created = line_time(line) or created
+            yield created, line
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
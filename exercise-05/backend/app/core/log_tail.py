@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+LEVEL_PATTERN = re.compile(r'^(?:\[[^\]]*\] ([A-Z]+) in |\{.*?"level": "([A-Z]+)")')
+
+
+def tail_lines(path: str, lines: int, block_size: int = 8192) -> str:
+    """Return the last ``lines`` lines of ``path``, reading backwards from the
+    end one block at a time instead of loading the whole file."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        # One extra newline guarantees the first kept line is complete.
+        while position > 0 and data.count(b"\n") <= lines:
+            read = min(block_size, position)
+            position -= read
+            f.seek(position)
+            data = f.read(read) + data
+    kept = data.splitlines(keepends=True)[-lines:]
+    return b"".join(kept).decode("utf-8", errors="replace")
+
+
+class LineFilter:
+    """Keeps lines at or above ``level`` that contain ``contains``.
+
+    Lines without a level prefix, such as traceback lines, inherit the level
+    of the record they belong to.
+    """
+
+    def __init__(self, level: Optional[str] = None, contains: Optional[str] = None):
+        self.min_level = logging.getLevelName(level.upper()) if level else None
+        self.contains = contains
+        self._current_level = logging.NOTSET
+
+    def __call__(self, line: str) -> bool:
+        match = LEVEL_PATTERN.match(line)
+        if match:
+            self._current_level = logging.getLevelName(match.group(1) or match.group(2))
+        if self.min_level is not None:
+            if not isinstance(self._current_level, int) or self._current_level < self.min_level:
+                return False
+        return self.contains is None or self.contains in line
+
+
+async def follow_log(
+    path: str,
+    line_filter: LineFilter,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    poll_interval: float = 0.5,
+    heartbeat: float = 15.0,
+) -> AsyncIterator[str]:
+    """Yield server-sent events for lines appended to ``path``.
+
+    File reads run in the threadpool. The file is reopened from the start
+    when it is truncated or replaced, e.g. after rotation.
+    """
+    log_file = None
+    from_start = False
+    partial = ""
+    last_sent = time.monotonic()
+    try:
+        while not await is_disconnected():
+            if log_file is None:
+                try:
+                    log_file = await run_in_threadpool(
+                        open, path, "r", encoding="utf-8", errors="replace"
+                    )
+                except FileNotFoundError:
+                    from_start = True
+                    await asyncio.sleep(poll_interval)
+                    continue
+                if not from_start:
+                    await run_in_threadpool(log_file.seek, 0, os.SEEK_END)
+
+            chunk = await run_in_threadpool(log_file.read)
+            if chunk:
+                partial += chunk
+                *complete, partial = partial.split("\n")
+                events = [f"data: {line}\n\n" for line in complete if line_filter(line)]
+                if events:
+                    last_sent = time.monotonic()
+                    yield "".join(events)
+                continue
+
+            if await run_in_threadpool(_replaced, path, log_file):
+                log_file.close()
+                log_file = None
+                from_start = True
+                partial = ""
+                continue
+            if time.monotonic() - last_sent >= heartbeat:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(poll_interval)
+    finally:
+        if log_file is not None:
+            log_file.close()
+
+
+def _replaced(path: str, log_file) -> bool:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return True
+    return stat.st_ino != os.fstat(log_file.fileno()).st_ino or stat.st_size < log_file.tell()
@@ -1,19 +1,107 @@
+import atexit
+import json
 import logging
+import queue
+import threading
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.log_store import IndexedRotatingFileHandler
+
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s in %(module)s: %(message)s"
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+class RequestIdFilter(logging.Filter):
+    """Copies the current request id onto the record. Runs on the calling
+    thread, before the record is handed to the queue."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "module": record.module,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last ``capacity`` formatted records in memory."""
+
+    def __init__(self, capacity: int):
+        super().__init__()
+        self.capacity = capacity
+        self._records = deque(maxlen=capacity)
+        self._lock_buffer = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        line = self.format(record)
+        with self._lock_buffer:
+            self._records.append(line)
+
+    def tail(self, lines: int) -> List[str]:
+        with self._lock_buffer:
+            records = list(self._records)
+        return records[-lines:]
+
+
+def build_formatter() -> logging.Formatter:
+    if settings.LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter(TEXT_FORMAT)
+
+
+ring_buffer = RingBufferHandler(settings.LOG_BUFFER_SIZE)
+
 
 def get_logger(name="app"):
     logger = logging.getLogger(name)
     if not logger.handlers:
+        formatter = build_formatter()
+
         stream_handler = logging.StreamHandler()
-        stream_formatter = logging.Formatter("[%(asctime)s] %(levelname)s in %(module)s: %(message)s")
-        stream_handler.setFormatter(stream_formatter)
-        logger.addHandler(stream_handler)
+        stream_handler.setFormatter(formatter)
+
+        file_handler = IndexedRotatingFileHandler(
+            settings.LOG_FILE,
+            max_bytes=settings.LOG_MAX_BYTES,
+            interval=settings.LOG_ROTATE_SECONDS,
+            backup_count=settings.LOG_BACKUP_COUNT,
+            compress=settings.LOG_COMPRESS,
+            index_interval=settings.LOG_INDEX_INTERVAL,
+        )
+        file_handler.setFormatter(formatter)
+
+        ring_buffer.setFormatter(formatter)
+
+        # Request handlers only enqueue records; formatting and disk I/O
+        # happen on the listener thread.
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(RequestIdFilter())
+        logger.addHandler(queue_handler)
 
-        file_handler = logging.FileHandler("app.log")
-        file_formatter = logging.Formatter("[%(asctime)s] %(levelname)s in %(module)s: %(message)s")
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        listener = QueueListener(
+            log_queue, stream_handler, file_handler, ring_buffer, respect_handler_level=True
+        )
+        listener.start()
+        atexit.register(listener.stop)
+        logger.listener = listener
 
         logger.setLevel(logging.INFO)
     return logger
 
-logger = get_logger()
\ No newline at end of file
+logger = get_logger()
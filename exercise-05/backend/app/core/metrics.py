@@ -0,0 +1,305 @@
+import atexit
+import bisect
+import glob
+import json
+import math
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.types import Scope
+
+from app.core.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+Labels = Tuple[str, ...]
+
+
+class Metric(ABC):
+    """A named family of samples keyed by label values.
+
+    Updates take a per-metric lock only around the dictionary write; label
+    tuples are built by the caller, so the critical section stays tiny.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def snapshot(self) -> dict:
+        """Current samples, in a form that survives a JSON round trip."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every sample."""
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = defaultdict(float)
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] += amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"\0".join(k): v for k, v in self._values.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: one count per bucket plus +Inf, then the sum.
+        self._values: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"\0".join(k): list(v) for k, v in self._values.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """Holds this process's metrics and renders the Prometheus text format.
+
+    With ``directory`` set, each process writes its snapshot to
+    ``<directory>/<pid>.json`` and rendering merges every snapshot found
+    there, so any worker can answer a scrape for all of them. Gauges of
+    processes that are no longer running are dropped; their counters are
+    kept so totals never go backwards.
+    """
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.metrics: Dict[str, Metric] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> dict:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def clear(self) -> None:
+        for metric in self.metrics.values():
+            metric.clear()
+
+    def flush(self) -> None:
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(f"{path}.tmp", path)
+
+    def start_flusher(self) -> None:
+        """Flush this process's snapshot every ``flush_interval`` seconds."""
+        if not self.directory or self._flusher is not None:
+            return
+        with self._flusher_lock:
+            if self._flusher is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._flusher = threading.Thread(
+                    target=self._flush_forever, name="metrics-flusher", daemon=True
+                )
+                self._flusher.start()
+                atexit.register(self.flush)
+
+    def _flush_forever(self) -> None:
+        stop = threading.Event()
+        while not stop.wait(self.flush_interval):
+            self.flush()
+
+    def collect(self) -> dict:
+        """Snapshot of this process, merged with the other workers' when a
+        shared directory is configured."""
+        if not self.directory:
+            return self.snapshot()
+        self.flush()
+        merged: Dict[str, dict] = {name: {} for name in self.metrics}
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            pid = int(os.path.basename(path).split(".")[0])
+            try:
+                with open(path, encoding="utf-8") as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            alive = pid == os.getpid() or _running(pid)
+            for name, samples in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None or (metric.type == "gauge" and not alive):
+                    continue
+                _merge(merged[name], samples)
+        return merged
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, samples in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for key, value in sorted(samples.items()):
+                labels = list(zip(metric.labelnames, key.split("\0") if key else ()))
+                if metric.type == "histogram":
+                    lines.extend(_histogram_lines(name, labels, metric.buckets, value))
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _merge(into: dict, samples: dict) -> None:
+    for key, value in samples.items():
+        if isinstance(value, list):
+            current = into.setdefault(key, [0] * len(value))
+            into[key] = [a + b for a, b in zip(current, value)]
+        else:
+            into[key] = into.get(key, 0) + value
+
+
+def _running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _histogram_lines(name, labels, buckets, counts) -> Iterable[str]:
+    cumulative = 0
+    for bound, count in zip(buckets + (math.inf,), counts):
+        cumulative += count
+        le = "+Inf" if bound == math.inf else _format_value(bound)
+        yield f"{name}_bucket{_format_labels(labels + [('le', le)])} {_format_value(cumulative)}"
+    yield f"{name}_sum{_format_labels(labels)} {_format_value(counts[-1])}"
+    yield f"{name}_count{_format_labels(labels)} {_format_value(cumulative)}"
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def route_template(scope: Scope) -> str:
+    """Full path template of the matched route, e.g. ``/api/vehicles/{id}``.
+
+    Routes of included routers only know their own part of the path, so the
+    prefix is taken from the request path in front of the rendered route.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return "unmatched"
+    params = {k: str(v) for k, v in scope.get("path_params", {}).items()}
+    try:
+        rendered = path_format.format(**params)
+    except (KeyError, IndexError):
+        return path_format
+    path = scope["path"]
+    if rendered and path.endswith(rendered):
+        return path[: len(path) - len(rendered)] + path_format
+    return path_format
+
+
+registry = MetricsRegistry(settings.METRICS_DIR, settings.METRICS_FLUSH_SECONDS)
+
+http_requests = registry.counter(
+    "http_requests_total", "Requests handled", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Request latency", ("method", "route")
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "Requests being handled", ("method",)
+)
+http_response_size = registry.histogram(
+    "http_response_size_bytes", "Response body size", ("method", "route"), SIZE_BUCKETS
+)
+db_queries = registry.histogram(
+    "db_queries_per_request",
+    "SQL statements executed per request",
+    ("method", "route"),
+    (0, 1, 2, 5, 10, 20, 50, 100),
+)
+db_duration = registry.histogram(
+    "db_duration_seconds", "Time spent in SQL statements per request", ("method", "route")
+)
+db_slow_queries = registry.counter(
+    "db_slow_queries_total", "Statements slower than SLOW_QUERY_MS", ("route",)
+)
+admission_in_flight = registry.gauge(
+    "admission_in_flight", "Requests admitted and not finished", ("group",)
+)
+admission_queue_depth = registry.gauge(
+    "admission_queue_depth", "Requests waiting for a concurrency slot", ("group",)
+)
+admission_rejections = registry.counter(
+    "admission_rejections_total",
+    "Requests shed with 503 because the queue was full or the wait timed out",
+    ("group", "reason"),
+)
+rate_limit_rejections = registry.counter(
+    "rate_limit_rejections_total", "Requests refused with 429 by the per-client rate limit"
+)
@@ -0,0 +1,302 @@
+import math
+import time
+import uuid
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, IdentityResponder
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.admission import AdmissionController
+from app.core.logger import logger, request_id_var
+from app.core.metrics import (
+    admission_rejections,
+    db_duration,
+    db_queries,
+    http_request_duration,
+    http_requests,
+    http_requests_in_progress,
+    http_response_size,
+    rate_limit_rejections,
+    registry,
+    route_template,
+)
+from app.core.rate_limit import RateLimitBackend
+from app.db.instrumentation import QueryStats, query_stats_var
+from app.db.routing import PIN_COOKIE, ReplicaSet, RequestWrites, request_writes_var
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+class RequestIdMiddleware:
+    """Binds a request id to the logging context and echoes it back.
+
+    Reuses the client's ``X-Request-ID`` when present so logs can be joined
+    with an upstream proxy's.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = REQUEST_ID_HEADER.lower().encode()
+        request_id = next(
+            (v.decode("latin-1") for k, v in scope["headers"] if k == header), None
+        ) or uuid.uuid4().hex
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+
+class MetricsMiddleware:
+    """Records latency, status, response size and in-flight requests per
+    route template, so path parameters do not create new series."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._templates = {}
+        registry.start_flusher()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_progress.inc((method,))
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_progress.dec((method,))
+            route = scope.get("route")
+            # Routes live as long as the app and are not hashable, so they
+            # are cached by identity.
+            template = self._templates.get(id(route))
+            if template is None:
+                template = route_template(scope)
+                if route is not None:
+                    self._templates[id(route)] = template
+            labels = (method, template)
+            http_requests.inc(labels + (str(status_code),))
+            http_request_duration.observe(labels, elapsed)
+            http_response_size.observe(labels, size)
+
+
+class RateLimitMiddleware:
+    """Token bucket per client: ``429`` with ``Retry-After`` once a client
+    has used up its burst faster than the refill rate.
+
+    Clients are told apart by ``key_header`` (an API key or the
+    ``X-Forwarded-For`` set by a trusted proxy) when it is sent, by their
+    address otherwise.
+    """
+
+    def __init__(self, app: ASGIApp, backend: RateLimitBackend, key_header: str = ""):
+        self.app = app
+        self.backend = backend
+        self.key_header = key_header.lower()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        key = Headers(scope=scope).get(self.key_header) if self.key_header else None
+        if key is None:
+            key = scope["client"][0] if scope.get("client") else "unknown"
+        if self.backend.blocking:
+            # A busy SQLite file would otherwise stall every request in flight.
+            wait = await run_in_threadpool(self.backend.take, key)
+        else:
+            wait = self.backend.take(key)
+        if wait:
+            rate_limit_rejections.inc()
+            logger.warning(f"Rate limit exceeded by '{key}'")
+            response = JSONResponse(
+                {"detail": "Too many requests"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+class AdmissionMiddleware:
+    """Caps the requests in flight per route group and sheds the excess
+    with ``503`` and ``Retry-After`` instead of queueing it in the
+    threadpool without bound."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, retry_after: int = 1):
+        self.app = app
+        self.controller = controller
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.controller.limit_for(scope["method"], scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejected = await limit.acquire()
+        if rejected:
+            admission_rejections.inc((limit.name, rejected))
+            logger.warning(f"Shedding {scope['method']} {scope['path']}: {limit.name} {rejected}")
+            response = JSONResponse(
+                {"detail": "Server is busy, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
+
+
+class ReadYourWritesMiddleware:
+    """Pins a client that wrote to the primary: its response sets a cookie
+    that sends the client's reads there until the replicas caught up."""
+
+    def __init__(self, app: ASGIApp, replicas: ReplicaSet):
+        self.app = app
+        self.replicas = replicas
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes = RequestWrites()
+
+        async def send_with_pin(message: Message) -> None:
+            if (
+                message["type"] == "http.response.start"
+                and writes.wrote
+                and self.replicas.enabled
+                and self.replicas.pin_seconds > 0
+            ):
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{PIN_COOKIE}={self.replicas.pin_until():.3f}; "
+                    f"Max-Age={math.ceil(self.replicas.pin_seconds)}; Path=/; "
+                    "HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        token = request_writes_var.set(writes)
+        try:
+            await self.app(scope, receive, send_with_pin)
+        finally:
+            request_writes_var.reset(token)
+
+
+class ServerTimingMiddleware:
+    """Counts the SQL statements each request runs and reports them in a
+    ``Server-Timing`` header and in the per-route database metrics."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total = (time.perf_counter() - started) * 1000
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", '
+                    f"total;dur={total:.2f}",
+                )
+            await send(message)
+
+        token = query_stats_var.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats_var.reset(token)
+            labels = (scope["method"], stats.route)
+            db_queries.observe(labels, stats.count)
+            db_duration.observe(labels, stats.duration)
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        compressed = self.compressor.process(body)
+        if more_body:
+            return compressed + self.compressor.flush()
+        return compressed + self.compressor.finish()
+
+
+class CompressionMiddleware:
+    """Brotli when the client accepts it and the ``brotli`` package is
+    installed, gzip otherwise. Bodies under ``minimum_size`` bytes and event
+    streams are sent uncompressed."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1000,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.brotli_quality = brotli_quality
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and brotli is not None:
+            if "br" in Headers(scope=scope).get("accept-encoding", ""):
+                responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+                await responder(scope, receive, send)
+                return
+        await self.gzip(scope, receive, send)
@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Protocol, Tuple
+
+from app.core.logger import logger
+
+# How often, in checks, the SQLite backend drops buckets that have refilled.
+PRUNE_EVERY = 1000
+
+
+def refill(
+    tokens: float, elapsed: float, rate: float, burst: float
+) -> Tuple[float, float]:
+    """Top the bucket up for ``elapsed`` seconds and take one token.
+
+    Returns the tokens left and, when the bucket was empty, how many seconds
+    until the next token; nothing is taken then.
+    """
+    tokens = min(burst, tokens + elapsed * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class RateLimitBackend(Protocol):
+    # Whether take() may wait on I/O or locks held by other processes, and
+    # must run off the event loop.
+    blocking: bool
+
+    def take(self, key: str) -> float: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryRateLimitBackend:
+    """Token buckets of this process, the least recently seen dropped once
+    there are more than ``max_keys``."""
+
+    blocking = False
+
+    def __init__(self, rate: float, burst: float, max_keys: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str) -> float:
+        """Take a token for ``key``; return 0, or the seconds to wait."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.burst, now))
+            tokens, wait = refill(tokens, now - updated_at, self.rate, self.burst)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteRateLimitBackend:
+    """Token buckets in a SQLite file, shared by every worker on the same
+    host. Each check is one short ``BEGIN IMMEDIATE`` transaction."""
+
+    blocking = True
+
+    def __init__(self, path: str, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._checks = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=5.0
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def take(self, key: str) -> float:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at FROM rate_limits WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated_at = row or (self.burst, now)
+                tokens, wait = refill(tokens, now - updated_at, self.rate, self.burst)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?)", (key, tokens, now)
+                )
+                self._checks += 1
+                if self._checks % PRUNE_EVERY == 0:
+                    # A bucket untouched this long is full again.
+                    self._conn.execute(
+                        "DELETE FROM rate_limits WHERE updated_at < ?",
+                        (now - self.burst / self.rate,),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limits")
+
+
+def build_rate_limit_backend(
+    kind: str, rate: float, burst: float, max_keys: int, path: str
+) -> Optional[RateLimitBackend]:
+    if kind == "memory":
+        return MemoryRateLimitBackend(rate, burst, max_keys)
+    if kind == "sqlite":
+        return SQLiteRateLimitBackend(path, rate, burst)
+    if kind != "none":
+        logger.warning(f"Unknown rate limit backend '{kind}', rate limiting disabled")
+    return None
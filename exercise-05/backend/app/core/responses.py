@@ -0,0 +1,51 @@
+from typing import Any, Mapping, Optional, Type
+
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with fastapi[all]
+    orjson = None
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson instead of the standard library."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def default_response_class() -> Type[Response]:
+    """orjson for routes that return plain dicts, when enabled and installed.
+
+    Left off by default: recent FastAPI versions already serialize routes
+    with a response model straight to bytes through pydantic, and any
+    explicit default response class opts out of that. ``Default`` keeps
+    FastAPI's own choice.
+    """
+    if settings.ORJSON_RESPONSES and orjson is not None:
+        return ORJSONResponse
+    return Default(JSONResponse)
+
+
+def model_response(
+    model: BaseModel,
+    headers: Optional[Mapping[str, str]] = None,
+    status_code: int = 200,
+) -> Response:
+    """Serialize ``model`` with pydantic-core and return it as is.
+
+    FastAPI validates a returned model against the response model again
+    and, in older versions, dumps it to Python objects for ``json`` to encode;
+    for pages of already validated items both steps are overhead.
+    """
+    return Response(
+        model.model_dump_json(),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
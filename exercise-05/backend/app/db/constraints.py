@@ -0,0 +1,18 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def enable_foreign_keys(engine: Engine) -> None:
+    """Make SQLite enforce foreign keys, ``ON DELETE CASCADE`` included.
+
+    SQLite ignores them unless every new connection turns them on; other
+    databases always enforce them.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
@@ -0,0 +1,42 @@
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+
+def exact_count(query: Query) -> int:
+    """``COUNT(*)`` over ``query`` without its ordering."""
+    return query.order_by(None).count()
+
+
+def approximate_count(db: Session, table: str) -> Optional[int]:
+    """Row count of ``table`` from the planner statistics, or ``None`` when
+    the database has none yet.
+
+    Postgres keeps ``pg_class.reltuples`` up to date through autovacuum;
+    SQLite only has ``sqlite_stat1`` once ``ANALYZE`` (or ``PRAGMA
+    optimize``) has run.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        estimate = db.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table},
+        ).scalar()
+        # -1 means the table was never analyzed.
+        return int(estimate) if estimate is not None and estimate >= 0 else None
+
+    if dialect == "sqlite":
+        has_stats = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        ).scalar()
+        if not has_stats:
+            return None
+        # The first number of each row is the row count of the table or index.
+        stat = db.execute(
+            text("SELECT stat FROM sqlite_stat1 WHERE tbl = :table LIMIT 1"),
+            {"table": table},
+        ).scalar()
+        return int(stat.split()[0]) if stat else None
+
+    return None
@@ -1,13 +1,39 @@
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.logger import logger
 
 from app.core.config import settings
+from app.db.constraints import enable_foreign_keys
+from app.db.instrumentation import instrument_engine
+from app.db.journal import enable_wal
+from app.db.migrations import (
+    migrate_foreign_keys,
+    migrate_indexes,
+    migrate_sqlite_autoincrement,
+)
+from app.db.routing import PIN_COOKIE, ReplicaSet, RoutingSession, track_writes
+from app.db.search import ensure_search_index
 
 engine = create_engine(settings.DATABASE_URL)
+instrument_engine(engine)
+enable_foreign_keys(engine)
+enable_wal(engine)
+
+replica_engines = [create_engine(url) for url in settings.READ_DATABASE_URLS]
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine)
+    enable_foreign_keys(replica_engine)
+replicas = ReplicaSet(
+    replica_engines, settings.READ_REPLICA_STRATEGY, settings.READ_AFTER_WRITE_SECONDS
+)
+track_writes()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, replicas=replicas
+)
 
 Base = declarative_base()
 
@@ -20,7 +46,24 @@ def get_db():
         db.close()
 
 
+def get_read_db(request: Request):
+    """Session for read-only handlers: reads go to a replica unless the
+    client wrote recently and its pin cookie sends it to the primary."""
+    if replicas.enabled and not replicas.pinned(request.cookies.get(PIN_COOKIE)):
+        db = ReadSessionLocal()
+    else:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def create_tables():
     logger.info("Creating tables...")
     Base.metadata.create_all(bind=engine)
+    migrate_foreign_keys(engine, Base.metadata)
+    migrate_sqlite_autoincrement(engine, Base.metadata)
+    migrate_indexes(engine, Base.metadata)
+    ensure_search_index(engine)
     logger.info("Tables created successfully.")
@@ -0,0 +1,65 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import db_slow_queries, route_template
+
+MAX_LOGGED_PARAMETERS = 500
+
+
+class QueryStats:
+    """Statements executed while handling one request.
+
+    The middleware binds one instance per request; sync routes run in a
+    copy of the context, so they update the same object.
+    """
+
+    __slots__ = ("scope", "count", "duration")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+
+    @property
+    def route(self) -> str:
+        return route_template(self.scope) if self.scope else "-"
+
+
+query_stats_var: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on ``engine`` and attribute it to the current request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's own context: after_cursor_execute does not fire
+    # for a failed statement, and anything kept on the connection would leak.
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start
+    stats = query_stats_var.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+
+    if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        route = stats.route if stats is not None else "-"
+        db_slow_queries.inc((route,))
+        params = repr(parameters)
+        if len(params) > MAX_LOGGED_PARAMETERS:
+            params = params[:MAX_LOGGED_PARAMETERS] + "..."
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms) on {route}: "
+            f"{' '.join(statement.split())} params={params}"
+        )
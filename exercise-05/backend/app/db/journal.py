@@ -0,0 +1,20 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def enable_wal(engine: Engine) -> None:
+    """Put a SQLite database in write-ahead-log mode.
+
+    In the default rollback journal a reader blocks every writer until it
+    finishes, so a long export or job would stall all writes; with WAL one
+    writer and any number of readers proceed together. The mode is stored
+    in the file, so setting it again on each connection costs nothing.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
@@ -0,0 +1,179 @@
+from typing import Set
+
+from sqlalchemy import Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import AddConstraint, CreateTable
+
+from app.core.logger import logger
+
+# Indexes replaced by the listing indexes, which end with the sort key.
+OBSOLETE_INDEXES = {
+    "vehicles": [
+        "ix_vehicles_brand_id",
+        "ix_vehicles_color",
+        "ix_vehicles_year",
+        "ix_vehicles_brand_listing",
+        "ix_vehicles_year_listing",
+        "ix_vehicles_color_listing",
+        "ix_vehicles_sold_listing",
+    ],
+    "vehicles_archive": [
+        "ix_vehicles_archive_brand_listing",
+        "ix_vehicles_archive_year_listing",
+        "ix_vehicles_archive_color_listing",
+    ],
+}
+
+# Tables whose rows move to another table keeping their ids; new ids must
+# stay above the ids in both.
+SHARED_IDS = {"vehicles": "vehicles_archive"}
+
+
+def index_names(conn: Connection, table: str) -> Set[str]:
+    if conn.dialect.name == "sqlite":
+        # SQLite reflection skips expression indexes such as lower(name).
+        return set(
+            conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t"),
+                {"t": table},
+            ).scalars()
+        )
+    return {ix["name"] for ix in inspect(conn).get_indexes(table)}
+
+
+def migrate_indexes(engine: Engine, metadata) -> None:
+    """Bring indexes of existing tables in line with the models.
+
+    ``create_all`` only creates indexes together with new tables, so indexes
+    added to an existing table are created here and obsolete ones dropped.
+    """
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = index_names(conn, table.name)
+            for index in table.indexes:
+                if index.name not in existing:
+                    logger.info(f"Creating index {index.name}")
+                    index.create(conn)
+            for name in OBSOLETE_INDEXES.get(table.name, []):
+                if name in existing:
+                    logger.info(f"Dropping index {name}")
+                    conn.execute(text(f"DROP INDEX {name}"))
+
+
+def migrate_foreign_keys(engine: Engine, metadata) -> None:
+    """Bring the ``ON DELETE`` rule of existing foreign keys in line with
+    the models.
+
+    Postgres swaps the constraint in place. SQLite cannot alter constraints,
+    so the table is rebuilt; its indexes and triggers go with the old table
+    and are recreated by ``migrate_indexes`` and ``ensure_search_index``,
+    which run after this. The search index is repopulated as well.
+    """
+    with engine.connect() as conn:
+        inspector = inspect(conn)
+        stale = []
+        for table in metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            reflected = {
+                tuple(fk["constrained_columns"]): fk
+                for fk in inspector.get_foreign_keys(table.name)
+            }
+            for constraint in table.foreign_key_constraints:
+                existing = reflected.get(tuple(constraint.column_keys))
+                if existing is None:
+                    continue
+                ondelete = existing.get("options", {}).get("ondelete")
+                if (ondelete or "").upper() != (constraint.ondelete or "").upper():
+                    stale.append((table, constraint, existing["name"]))
+
+    for table, constraint, name in stale:
+        columns = ", ".join(constraint.column_keys)
+        logger.info(f"Setting ON DELETE {constraint.ondelete} on {table.name}({columns})")
+        if engine.dialect.name == "sqlite":
+            rebuild_sqlite_table(engine, table)
+        else:
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table.name} DROP CONSTRAINT {name}"))
+                conn.execute(AddConstraint(constraint))
+
+
+def migrate_sqlite_autoincrement(engine: Engine, metadata) -> None:
+    """Rebuild SQLite tables declared with ``sqlite_autoincrement`` that
+    were created without it.
+
+    Without ``AUTOINCREMENT`` SQLite gives a new row the highest id in the
+    table plus one, so the ids of deleted or archived rows come back. The
+    sequence is then moved above the ids of the table in ``SHARED_IDS``,
+    which a rebuild cannot see.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as conn:
+        stale = []
+        for table in metadata.sorted_tables:
+            if not table.dialect_options["sqlite"]["autoincrement"]:
+                continue
+            sql = conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (table.name,),
+            ).scalar()
+            if sql is not None and "AUTOINCREMENT" not in sql.upper():
+                stale.append(table)
+
+    for table in stale:
+        logger.info(f"Rebuilding {table.name} with AUTOINCREMENT")
+        rebuild_sqlite_table(engine, table)
+
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for name, shared in SHARED_IDS.items():
+            if not (inspector.has_table(name) and inspector.has_table(shared)):
+                continue
+            top = conn.exec_driver_sql(f"SELECT max(id) FROM {shared}").scalar()
+            seq = conn.exec_driver_sql(
+                "SELECT seq FROM sqlite_sequence WHERE name = ?", (name,)
+            ).first()
+            if top is None or (seq is not None and seq[0] >= top):
+                continue
+            logger.info(f"Moving the id sequence of {name} past {shared}")
+            if seq is None:
+                conn.exec_driver_sql(
+                    "INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (name, top)
+                )
+            else:
+                conn.exec_driver_sql(
+                    "UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (top, name)
+                )
+
+
+def rebuild_sqlite_table(engine: Engine, table: Table) -> None:
+    """Recreate ``table`` from its model definition, keeping its rows."""
+    temporary = f"{table.name}__rebuild"
+    with engine.connect() as conn:
+        columns = ", ".join(
+            column["name"]
+            for column in inspect(conn).get_columns(table.name)
+            if column["name"] in table.c
+        )
+        create = str(CreateTable(table).compile(conn)).replace(
+            f"CREATE TABLE {table.name} ", f"CREATE TABLE {temporary} ", 1
+        )
+        # Foreign keys must be off while the table is swapped, and the
+        # pragma is ignored inside a transaction.
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        try:
+            conn.exec_driver_sql("BEGIN")
+            conn.exec_driver_sql(create)
+            conn.exec_driver_sql(
+                f"INSERT INTO {temporary} ({columns}) SELECT {columns} FROM {table.name}"
+            )
+            conn.exec_driver_sql(f"DROP TABLE {table.name}")
+            conn.exec_driver_sql(f"ALTER TABLE {temporary} RENAME TO {table.name}")
+            conn.commit()
+        finally:
+            conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+            conn.commit()
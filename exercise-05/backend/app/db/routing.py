@@ -0,0 +1,151 @@
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+
+# Cookie holding the Unix time until which a client that wrote reads from
+# the primary.
+PIN_COOKIE = "read_primary_until"
+
+# Session.info flag of sessions that do not act for a client, such as the
+# job runner's; their commits pin nobody.
+BACKGROUND = "background"
+
+
+class RequestWrites:
+    """Whether the current request committed a write. The middleware binds
+    one per request; sync routes run in a copy of the context, so their
+    sessions mark the same object."""
+
+    __slots__ = ("wrote",)
+
+    def __init__(self):
+        self.wrote = False
+
+
+request_writes_var: ContextVar[Optional[RequestWrites]] = ContextVar(
+    "request_writes", default=None
+)
+
+
+class ReplicaSet:
+    """Read replicas of the primary database.
+
+    ``acquire`` hands out the next replica in turn (``round_robin``) or the
+    one with the fewest sessions open in this process
+    (``least_connections``). A client that commits a write reads from the
+    primary for ``pin_seconds``, long enough for the replicas to catch up,
+    so it sees its own write; the pin travels with the client in a cookie,
+    so other clients keep using the replicas and every worker honours it.
+    """
+
+    def __init__(
+        self,
+        engines: List[Engine],
+        strategy: str = ROUND_ROBIN,
+        pin_seconds: float = 0.0,
+    ):
+        if strategy not in (ROUND_ROBIN, LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica strategy '{strategy}'")
+        self.engines = engines
+        self.strategy = strategy
+        self.pin_seconds = pin_seconds
+        self.in_use = [0] * len(engines)
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def pin_until(self) -> float:
+        """Unix time until which a client writing now reads the primary."""
+        return time.time() + self.pin_seconds
+
+    @staticmethod
+    def pinned(cookie: Optional[str]) -> bool:
+        """Whether the pin cookie a client sent is still in force."""
+        try:
+            return cookie is not None and time.time() < float(cookie)
+        except ValueError:
+            return False
+
+    def acquire(self) -> int:
+        with self._lock:
+            if self.strategy == LEAST_CONNECTIONS:
+                index = min(range(len(self.engines)), key=self.in_use.__getitem__)
+            else:
+                index = next(self._turn) % len(self.engines)
+            self.in_use[index] += 1
+            return index
+
+    def release(self, index: int) -> None:
+        with self._lock:
+            self.in_use[index] -= 1
+
+
+class RoutingSession(Session):
+    """Session that reads from a replica and sends everything else to the
+    primary it is bound to.
+
+    The first write moves the session to the primary for good, so the rest
+    of the request reads its own changes.
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self._replica: Optional[int] = None
+        self._primary = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replicas is None or not self.replicas.enabled:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        if self._flushing or isinstance(clause, UpdateBase) or self.info.get("wrote"):
+            self._primary = True
+        if self._primary:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        if self._replica is None:
+            self._replica = self.replicas.acquire()
+        return self.replicas.engines[self._replica]
+
+    def close(self) -> None:
+        super().close()
+        if self._replica is not None:
+            self.replicas.release(self._replica)
+            self._replica = None
+
+
+def track_writes() -> None:
+    """Mark the current request as having written whenever one of its
+    sessions commits a write. Sessions outside a request, or flagged
+    ``BACKGROUND``, mark nothing."""
+
+    @event.listens_for(Session, "after_flush")
+    def _after_flush(session, flush_context):
+        session.info["wrote"] = True
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _do_orm_execute(state):
+        if state.is_insert or state.is_update or state.is_delete:
+            state.session.info["wrote"] = True
+
+    @event.listens_for(Session, "after_commit")
+    def _after_commit(session):
+        if session.info.pop("wrote", False) and not session.info.get(BACKGROUND):
+            writes = request_writes_var.get()
+            if writes is not None:
+                writes.wrote = True
+
+    @event.listens_for(Session, "after_rollback")
+    def _after_rollback(session):
+        session.info.pop("wrote", None)
@@ -0,0 +1,94 @@
+from typing import List
+
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Connection, Engine
+
+# Tables with a search index: vehicles, and the archive its sold vehicles
+# move to.
+SEARCH_TABLES = ("vehicles", "vehicles_archive")
+
+
+def search_vector(table: str) -> str:
+    """Postgres matches the expression index only when the query repeats the
+    exact same expression, so both use this string."""
+    return (
+        f"to_tsvector('simple', coalesce({table}.model, '') || ' ' || "
+        f"coalesce({table}.description, ''))"
+    )
+
+
+def sqlite_ddl(table: str) -> List[str]:
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"model, description, content='{table}', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, model, description) "
+        "VALUES (new.id, new.model, new.description); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, model, description) "
+        "VALUES ('delete', old.id, old.model, old.description); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF model, description "
+        f"ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, model, description) "
+        "VALUES ('delete', old.id, old.model, old.description); "
+        f"INSERT INTO {fts}(rowid, model, description) "
+        "VALUES (new.id, new.model, new.description); END",
+    ]
+
+
+def postgres_ddl(table: str) -> List[str]:
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING GIN ("
+        + search_vector(table).replace(f"{table}.", "")
+        + ")",
+    ]
+
+
+def create_search_index(target, connection: Connection, **kw) -> None:
+    _create_search_index(connection, target.name)
+
+
+def _create_search_index(connection: Connection, table: str) -> None:
+    if connection.dialect.name == "sqlite":
+        statements = sqlite_ddl(table)
+    elif connection.dialect.name == "postgresql":
+        statements = postgres_ddl(table)
+    else:
+        return
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def drop_search_index(target, connection: Connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {target.name}_fts")
+
+
+def register_search_index(table) -> None:
+    event.listen(table, "after_create", create_search_index)
+    event.listen(table, "before_drop", drop_search_index)
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """Add the search index to tables created before it existed, or whose
+    triggers went with them when the table was rebuilt."""
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for name in SEARCH_TABLES:
+            if not inspector.has_table(name):
+                continue
+            if conn.dialect.name == "sqlite":
+                fts = f"{name}_fts"
+                existing = conn.exec_driver_sql(
+                    "SELECT count(*) FROM sqlite_master WHERE name IN (?, ?, ?, ?)",
+                    (fts, f"{fts}_ai", f"{fts}_ad", f"{fts}_au"),
+                ).scalar()
+                if existing == len(sqlite_ddl(name)):
+                    continue
+                _create_search_index(conn, name)
+                # Writes made while a trigger was missing never reached the index.
+                conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            else:
+                _create_search_index(conn, name)
@@ -0,0 +1,29 @@
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.version import Version
+
+BRANDS = "brands"
+VEHICLES = "vehicles"
+
+
+def get_version(db: Session, name: str) -> int:
+    value = db.execute(select(Version.value).where(Version.name == name)).scalar()
+    return value or 0
+
+
+def bump_version(db: Session, name: str) -> int:
+    """Increment a version counter inside the caller's transaction.
+
+    The new value becomes visible to other workers once the caller commits.
+    """
+    value = db.execute(
+        update(Version)
+        .where(Version.name == name)
+        .values(value=Version.value + 1)
+        .returning(Version.value)
+    ).scalar()
+    if value is None:
+        db.execute(insert(Version).values(name=name, value=1))
+        value = 1
+    return value
@@ -0,0 +1,36 @@
+import argparse
+
+from app.core.config import settings
+from app.db.database import SessionLocal, create_tables
+from app.services.vehicle_import import detect_format, import_vehicles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import vehicles from a CSV or NDJSON file")
+    parser.add_argument("path", help="File to import")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    import_format = args.format or detect_format(args.path)
+    if import_format is None:
+        parser.error("cannot detect the file format, pass --format")
+
+    create_tables()
+    session = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as stream:
+            result = import_vehicles(session, stream, import_format, args.chunk_size)
+    finally:
+        session.close()
+
+    print(
+        f"{result.imported}/{result.rows} rows imported in {result.seconds}s "
+        f"({result.rows_per_second} rows/s), {result.failed} failed"
+    )
+    for error in result.errors:
+        print(f"  row {error.row}: {error.detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,52 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_pagination import add_pagination
 
+from app.core.admission import AdmissionController
 from app.core.config import settings
 from app.core.logger import logger
-from app.db.database import create_tables
+from app.core.rate_limit import build_rate_limit_backend
+from app.core.responses import default_response_class
+from app.core.middleware import (
+    AdmissionMiddleware,
+    CompressionMiddleware,
+    MetricsMiddleware,
+    RateLimitMiddleware,
+    ReadYourWritesMiddleware,
+    RequestIdMiddleware,
+    ServerTimingMiddleware,
+)
+from app.db.database import create_tables, replicas
 
-from app.routers import vehicle, brand, logs
+from app.routers import vehicle, brand, changes, jobs, logs, metrics, stats
 from app.seed import seed_brands
+from app.services.brand_registry import load_brand_registry
+from app.services.job_handlers import job_runner
+
+
+def initialize():
+    """Create missing tables and indexes, seed brands and warm the brand
+    registry. Safe to run on every boot; on an initialized database it costs
+    a handful of catalog queries and one brand select."""
+    create_tables()
+    seed_brands()
+    load_brand_registry()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.INIT_ON_STARTUP:
+        await run_in_threadpool(initialize)
+    else:
+        logger.info("Skipping database initialization (INIT_ON_STARTUP=false)")
+    if settings.JOBS_ENABLED:
+        job_runner.start()
+    yield
+    job_runner.stop()
 
-create_tables()
-seed_brands()
 
 app = FastAPI(
     title="Vehicle Manager",
@@ -18,20 +54,67 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=default_response_class(),
 )
 
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+app.add_middleware(ReadYourWritesMiddleware, replicas=replicas)
+app.add_middleware(ServerTimingMiddleware)
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=AdmissionController(
+            settings.ADMISSION_READ_LIMIT,
+            settings.ADMISSION_WRITE_LIMIT,
+            settings.ADMISSION_QUEUE_SIZE,
+            settings.ADMISSION_QUEUE_TIMEOUT,
+            settings.ADMISSION_ROUTE_LIMITS,
+            settings.ADMISSION_EXEMPT_PATHS,
+        ),
+        retry_after=settings.ADMISSION_RETRY_AFTER,
+    )
+rate_limit_backend = build_rate_limit_backend(
+    settings.RATE_LIMIT_BACKEND,
+    settings.RATE_LIMIT_PER_SECOND,
+    settings.RATE_LIMIT_BURST,
+    settings.RATE_LIMIT_MAX_KEYS,
+    settings.RATE_LIMIT_PATH,
+)
+if rate_limit_backend is not None:
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=rate_limit_backend,
+        key_header=settings.RATE_LIMIT_KEY_HEADER,
+    )
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
+# Added last so it is outermost: responses the middlewares above answer on
+# their own, such as 429 and 503, carry the CORS headers too.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "Server-Timing", "Retry-After"],
 )
 
 app.include_router(vehicle.router, prefix=settings.API_PREFIX)
+app.include_router(stats.router, prefix=settings.API_PREFIX)
 app.include_router(brand.router, prefix=settings.API_PREFIX)
+app.include_router(jobs.router, prefix=settings.API_PREFIX)
+app.include_router(changes.router, prefix=settings.API_PREFIX)
 app.include_router(logs.router, prefix=settings.API_PREFIX)
+app.include_router(metrics.router)
 add_pagination(app)
 
 if __name__ == "__main__":
@@ -1,2 +1,7 @@
 from .brand import Brand
-from .vehicle import Vehicle
\ No newline at end of file
+from .vehicle import Vehicle
+from .vehicle_archive import VehicleArchive
+from .version import Version
+from .stats import VehicleStat
+from .job import Job
+from .change import Change
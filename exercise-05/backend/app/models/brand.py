@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -12,6 +12,12 @@ class Brand(Base):
     name = Column(String(100), index=True, unique=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # The database deletes a brand's vehicles (ON DELETE CASCADE), so the
+    # ORM does not load them to delete them one by one.
     vehicles = relationship(
-        "Vehicle", back_populates="brand", cascade="all, delete-orphan"
+        "Vehicle", back_populates="brand", cascade="all, delete-orphan", passive_deletes=True
     )
+
+
+# Serves the case-insensitive lookup in /brands/resolve.
+Index("ix_brands_name_lower", func.lower(Brand.name))
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+VEHICLE = "vehicle"
+BRAND = "brand"
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+# Moved to the archive: gone from the default listing, still readable by id.
+ARCHIVED = "archived"
+
+
+class Change(Base):
+    """One create, update or delete of a vehicle or brand, written in the
+    transaction that made it. The id is the event id of
+    ``/changes/stream``; rows only say what changed, clients fetch the
+    rest."""
+
+    __tablename__ = "changes"
+    # Retention deletes by age.
+    __table_args__ = (Index("ix_changes_created_at", "created_at"),)
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(20), nullable=False)
+    action = Column(String(20), nullable=False)
+    entity_id = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
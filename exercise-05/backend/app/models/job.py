@@ -0,0 +1,39 @@
+from sqlalchemy import JSON, Boolean, Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class Job(Base):
+    """Long-running work submitted through ``/jobs`` and run by the
+    in-process job runner; the row is the job's only state, so queued and
+    interrupted jobs survive a restart."""
+
+    __tablename__ = "jobs"
+    # The runner claims the oldest queued job and reaps running jobs by
+    # heartbeat.
+    __table_args__ = (Index("ix_jobs_status_created_at", "status", "created_at"),)
+
+    id = Column(String(32), primary_key=True)
+    type = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default=QUEUED)
+    params = Column(JSON, nullable=False, default=dict)
+    progress = Column(Integer, nullable=False, default=0)
+    total = Column(Integer)
+    result = Column(JSON)
+    result_path = Column(String(255))
+    error = Column(Text)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    worker = Column(String(32))
+    heartbeat_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String
+
+from app.db.database import Base
+
+
+class VehicleStat(Base):
+    """Pre-aggregated vehicle count for one group of one dimension, e.g.
+    ``("decade", "2020")`` or ``("brand", "3")``."""
+
+    __tablename__ = "vehicle_stats"
+
+    dimension = Column(String(20), primary_key=True)
+    key = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,18 +1,37 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
+from app.db.search import register_search_index
 
 
 class Vehicle(Base):
     __tablename__ = "vehicles"
+    # Listings filter on any combination of brand_id, year, color and
+    # is_sold and always sort by (created_at, id). Each index is a filter
+    # prefix followed by the sort key: a listing reads the index of one of
+    # its filters in order, checks the others on the way and stops after a
+    # page, without a separate sort step. brand_id+year and year+color are
+    # common enough to get their own.
+    __table_args__ = (
+        Index("ix_vehicles_created_at_id", "created_at", "id"),
+        Index("ix_vehicles_brand_created_at", "brand_id", "created_at", "id"),
+        Index("ix_vehicles_year_created_at", "year", "created_at", "id"),
+        Index("ix_vehicles_color_created_at", "color", "created_at", "id"),
+        Index("ix_vehicles_sold_created_at", "is_sold", "created_at", "id"),
+        Index("ix_vehicles_brand_year_created_at", "brand_id", "year", "created_at", "id"),
+        Index("ix_vehicles_year_color_created_at", "year", "color", "created_at", "id"),
+        # Archived vehicles keep their ids, so SQLite must never hand out an
+        # id again, even once the rows with the highest ids are gone.
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     model = Column(String(100), index=True)
-    brand_id = Column(Integer, ForeignKey("brands.id"), index=True)
-    color = Column(String(50), index=True)
-    year = Column(Integer, index=True)
+    brand_id = Column(Integer, ForeignKey("brands.id", ondelete="CASCADE"))
+    color = Column(String(50))
+    year = Column(Integer)
     description = Column(Text)
     is_sold = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -21,3 +40,6 @@ class Vehicle(Base):
     )
 
     brand = relationship("Brand", back_populates="vehicles")
+
+
+register_search_index(Vehicle.__table__)
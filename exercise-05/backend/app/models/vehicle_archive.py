@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+from app.db.search import register_search_index
+
+
+class VehicleArchive(Base):
+    """Sold vehicles moved out of ``vehicles`` by the archive job, with the
+    same ids and columns, so the hot table only grows with the inventory.
+    Every row is sold."""
+
+    __tablename__ = "vehicles_archive"
+    # The listing indexes of vehicles without is_sold, which is always true
+    # here.
+    __table_args__ = (
+        Index("ix_vehicles_archive_created_at_id", "created_at", "id"),
+        Index("ix_vehicles_archive_brand_created_at", "brand_id", "created_at", "id"),
+        Index("ix_vehicles_archive_year_created_at", "year", "created_at", "id"),
+        Index("ix_vehicles_archive_color_created_at", "color", "created_at", "id"),
+        Index(
+            "ix_vehicles_archive_brand_year_created_at", "brand_id", "year", "created_at", "id"
+        ),
+        Index(
+            "ix_vehicles_archive_year_color_created_at", "year", "color", "created_at", "id"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    model = Column(String(100))
+    brand_id = Column(Integer, ForeignKey("brands.id", ondelete="CASCADE"))
+    color = Column(String(50))
+    year = Column(Integer)
+    description = Column(Text)
+    is_sold = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+register_search_index(VehicleArchive.__table__)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+
+from app.db.database import Base
+
+
+class Version(Base):
+    __tablename__ = "versions"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
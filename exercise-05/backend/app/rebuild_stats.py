@@ -0,0 +1,11 @@
+from app.db.database import SessionLocal, create_tables
+from app.services.vehicle_stats import rebuild_stats
+
+
+if __name__ == "__main__":
+    create_tables()
+    session = SessionLocal()
+    try:
+        print(f"Rebuilt {rebuild_stats(session)} stat groups")
+    finally:
+        session.close()
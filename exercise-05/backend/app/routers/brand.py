@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi_pagination.ext.sqlalchemy import paginate
-from fastapi_pagination import Page
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi_pagination import Params
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.core.conditional import is_not_modified, make_etag, not_modified
+from app.core.config import settings
 from app.core.logger import logger
-from app.db.database import get_db
+from app.core.responses import model_response
+from app.db.database import get_db, get_read_db
+from app.db.versions import BRANDS, VEHICLES, bump_version, get_version
 from app.models.brand import Brand
+from app.models.change import BRAND, CREATED, DELETED
 from app.schemas.brand import BrandCreate, BrandResponse
+from app.routers.jobs import accept_job
 from app.routers.vehicle import get_brand_or_404
+from app.services.brand_registry import brand_registry
+from app.services.brand_writes import delete_brand_row
+from app.services.change_feed import log_changes
+from app.services.job_handlers import DELETE_BRAND
+from app.services.pagination import ListPage, TotalParams, listing_total, paginate_listing
 
 
 router = APIRouter(
@@ -20,12 +29,37 @@ router = APIRouter(
 )
 
 
-@router.get("/", response_model=Page[BrandResponse])
-def get_brands(db: Session = Depends(get_db)) -> Page[BrandResponse]:
-    query = db.query(Brand).order_by(Brand.created_at)
+@router.get("/", response_model=ListPage[BrandResponse])
+def get_brands(
+    request: Request,
+    params: Params = Depends(),
+    total_params: TotalParams = Depends(),
+    db: Session = Depends(get_read_db),
+) -> ListPage[BrandResponse]:
     logger.info("Fetching brands")
+    version = get_version(db, BRANDS)
+    etag = make_etag(
+        BRANDS,
+        version,
+        total_params.include_total,
+        total_params.approximate_total,
+        params.page,
+        params.size,
+    )
+    if is_not_modified(request, etag):
+        logger.info("Brands page not modified")
+        return not_modified(etag)
+
+    query = db.query(Brand)
     try:
-        return paginate(db, query)
+        total = listing_total(db, query, total_params, Brand.__tablename__, version)
+        page = paginate_listing(
+            query.order_by(Brand.created_at),
+            params,
+            total,
+            transformer=lambda items: [BrandResponse.model_validate(b) for b in items],
+        )
+        return model_response(page, {"ETag": etag})
     except SQLAlchemyError as e:
         logger.error(f"Failed to fetch brands: {str(e)}")
         raise HTTPException(
@@ -37,10 +71,10 @@ def get_brands(db: Session = Depends(get_db)) -> Page[BrandResponse]:
 @router.get("/resolve", response_model=BrandResponse)
 def get_brand_id_by_name(
     name: str = Query(..., description="Query brand ID by name"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> BrandResponse:
     logger.info(f"Fetching brand with name '{name}'")
-    brand = db.query(Brand).filter(func.lower(Brand.name) == name.lower()).first()
+    brand = brand_registry.get_by_name(db, name)
     if not brand:
         logger.warning(f"Brand with name '{name}' not found")
         raise HTTPException(
@@ -60,10 +94,13 @@ def create_brand(
     brand = Brand(name=request.name)
     try:
         db.add(brand)
+        db.flush()
+        version = bump_version(db, BRANDS)
+        log_changes(db, BRAND, CREATED, [brand.id])
         db.commit()
         db.refresh(brand)
         logger.info(f"Brand with name '{request.name}' created successfully")
-        return brand
+        return brand_registry.add(brand, version)
     except SQLAlchemyError as e:
         logger.error(f"Failed to create brand: {str(e)}")
         db.rollback()
@@ -74,12 +111,28 @@ def create_brand(
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_brand(id: int, db: Session = Depends(get_db)):
+def delete_brand(
+    id: int,
+    background: bool = Query(
+        False, description="Delete the brand's vehicles in chunks in a background job"
+    ),
+    chunk_size: int = Query(None, ge=1, description="Vehicles deleted per transaction"),
+    db: Session = Depends(get_db),
+):
     logger.info(f"Deleting brand with ID {id}")
-    brand = get_brand_or_404(db, id)
+    get_brand_or_404(db, id)
+    if background:
+        params = {"brand_id": id, "chunk_size": chunk_size or settings.BRAND_DELETE_CHUNK_SIZE}
+        return accept_job(db, DELETE_BRAND, params)
+
     try:
-        db.delete(brand)
+        if delete_brand_row(db, id):
+            # The brand's vehicles go with it.
+            bump_version(db, VEHICLES)
+            log_changes(db, BRAND, DELETED, [id])
+        version = bump_version(db, BRANDS)
         db.commit()
+        brand_registry.remove(id, version)
         logger.info(f"Brand with ID {id} deleted successfully")
     except SQLAlchemyError as e:
         logger.error(f"Failed to delete brand with ID {id}: {str(e)}")
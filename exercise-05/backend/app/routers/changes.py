@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.services.change_feed import change_feed
+
+router = APIRouter(
+    prefix="/changes",
+    tags=["Changes"],
+    dependencies=[],
+    responses={403: {"description": "Not enough permissions"}},
+)
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    last_event_id: int = Header(
+        None, description="Resume after this event; sent by EventSource on reconnect"
+    ),
+    after: int = Query(None, description="Resume after this event on the first connection"),
+) -> StreamingResponse:
+    return StreamingResponse(
+        change_feed.subscribe(
+            last_event_id if last_event_id is not None else after,
+            request.is_disconnected,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
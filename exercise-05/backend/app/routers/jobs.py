@@ -0,0 +1,114 @@
+import os
+import shutil
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.responses import model_response
+from app.db.database import get_db
+from app.models.job import FINISHED, SUCCEEDED, Job
+from app.schemas.job import JobCreate, JobResponse
+from app.services.job_handlers import IMPORT, RESULT_MEDIA_TYPES, UPLOAD_EXTENSION, job_runner
+from app.services.jobs import cancel_job, new_job_id, submit_job
+from app.services.vehicle_import import detect_format
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"],
+    dependencies=[],
+    responses={403: {"description": "Not enough permissions"}},
+)
+
+
+def to_job_response(job: Job) -> JobResponse:
+    response = JobResponse.model_validate(job)
+    if job.status == SUCCEEDED and job.result_path:
+        response.result_url = f"{settings.API_PREFIX}/jobs/{job.id}/result"
+    return response
+
+
+def accept_job(db: Session, job_type: str, params: dict, id: str = None) -> Response:
+    """Queue a job, wake the runner and answer ``202`` pointing at the
+    job's status."""
+    job = submit_job(db, job_type, params, id)
+    job_runner.wake()
+    logger.info(f"Queued {job_type} job {job.id}")
+    return model_response(
+        to_job_response(job),
+        {"Location": f"{settings.API_PREFIX}/jobs/{job.id}"},
+        status.HTTP_202_ACCEPTED,
+    )
+
+
+def get_job_or_404(db: Session, id: str) -> Job:
+    job = db.get(Job, id)
+    if job is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_job(request: JobCreate, db: Session = Depends(get_db)) -> JobResponse:
+    params = request.model_dump(exclude={"type"}).get("params", {})
+    return accept_job(db, request.type, params)
+
+
+@router.post("/import", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_import_job(
+    file: UploadFile = File(..., description="CSV or NDJSON file of vehicles"),
+    import_format: str = Query(
+        None,
+        alias="format",
+        pattern="^(ndjson|csv)$",
+        description="File format, detected from the file name when omitted",
+    ),
+    chunk_size: int = Query(None, ge=1, description="Rows validated and inserted per batch"),
+    db: Session = Depends(get_db),
+) -> JobResponse:
+    import_format = import_format or detect_format(file.filename or "")
+    if import_format is None:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            detail="Unknown file format, use format=csv or format=ndjson",
+        )
+
+    id = new_job_id()
+    os.makedirs(settings.JOBS_DIR, exist_ok=True)
+    with open(os.path.join(settings.JOBS_DIR, f"{id}.{UPLOAD_EXTENSION}"), "wb") as f:
+        shutil.copyfileobj(file.file, f)
+    params = {
+        "filename": file.filename,
+        "format": import_format,
+        "chunk_size": chunk_size or settings.IMPORT_CHUNK_SIZE,
+    }
+    return accept_job(db, IMPORT, params, id)
+
+
+@router.get("/{id}", response_model=JobResponse)
+def get_job(id: str, db: Session = Depends(get_db)) -> JobResponse:
+    return to_job_response(get_job_or_404(db, id))
+
+
+@router.get("/{id}/result")
+def get_job_result(id: str, db: Session = Depends(get_db)) -> FileResponse:
+    job = get_job_or_404(db, id)
+    if job.status != SUCCEEDED or not job.result_path or not os.path.exists(job.result_path):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Job result not available")
+    extension = job.result_path.rsplit(".", 1)[-1]
+    return FileResponse(
+        job.result_path,
+        media_type=RESULT_MEDIA_TYPES.get(extension, "application/octet-stream"),
+        filename=f"{job.type}-{job.id}.{extension}",
+    )
+
+
+@router.post("/{id}/cancel", response_model=JobResponse)
+def cancel(id: str, db: Session = Depends(get_db)) -> JobResponse:
+    job = get_job_or_404(db, id)
+    if job.status in FINISHED:
+        raise HTTPException(status.HTTP_409_CONFLICT, detail=f"Job already {job.status}")
+    logger.info(f"Cancelling job {id}")
+    return to_job_response(cancel_job(db, job))
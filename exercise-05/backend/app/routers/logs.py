@@ -1,4 +1,13 @@
-from fastapi import APIRouter, HTTPException, status
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.log_store import query_logs
+from app.core.log_tail import LineFilter, follow_log, tail_lines
+from app.core.logger import ring_buffer
 
 router = APIRouter(
     prefix="/logs",
@@ -8,12 +17,51 @@ router = APIRouter(
 )
 
 
+LEVEL_QUERY = "^(?i:debug|info|warning|error|critical)$"
+
+
 @router.get("")
-async def read_logs(lines: int = 100):
+async def read_logs(
+    lines: int = Query(100, ge=1, description="Number of lines from the end"),
+    source: str = Query(
+        "memory",
+        pattern="^(memory|file)$",
+        description="Serve from this process's in-memory buffer or from the log file",
+    ),
+    since: datetime = Query(None, description="Oldest record to return; naive values are server local time"),
+    until: datetime = Query(None, description="Newest record to return; naive values are server local time"),
+    level: str = Query(None, pattern=LEVEL_QUERY, description="Minimum level to return"),
+):
+    if since or until or level:
+        logs = await run_in_threadpool(
+            query_logs,
+            settings.LOG_FILE,
+            since.timestamp() if since else None,
+            until.timestamp() if until else None,
+            level,
+            lines,
+        )
+        return {"logs": logs}
+
+    # The buffer only holds this worker's recent records, so larger requests
+    # go to the file.
+    if source == "memory" and lines <= ring_buffer.capacity:
+        return {"logs": "".join(f"{line}\n" for line in ring_buffer.tail(lines))}
     try:
-        with open("app.log", "r") as log_file:
-            all_lines = log_file.readlines()
-            logs = "".join(all_lines[-lines:])
+        logs = await run_in_threadpool(tail_lines, settings.LOG_FILE, lines)
         return {"logs": logs}
     except FileNotFoundError:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Log file not found")
+
+
+@router.get("/stream")
+async def stream_logs(
+    request: Request,
+    level: str = Query(None, pattern=LEVEL_QUERY, description="Minimum level to send"),
+    contains: str = Query(None, description="Only send lines containing this text"),
+) -> StreamingResponse:
+    return StreamingResponse(
+        follow_log(settings.LOG_FILE, LineFilter(level, contains), request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
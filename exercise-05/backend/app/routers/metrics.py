@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import registry
+
+router = APIRouter(
+    tags=["Metrics"],
+    dependencies=[],
+    responses={403: {"description": "Not enough permissions"}},
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.logger import logger
+from app.db.database import get_db, get_read_db
+from app.services.brand_registry import brand_registry
+from app.services.vehicle_stats import (
+    BRAND,
+    DECADE,
+    SOLD,
+    count_recent,
+    get_counts,
+    rebuild_stats,
+)
+
+router = APIRouter(
+    prefix="/vehicles/stats",
+    tags=["Stats"],
+    dependencies=[],
+    responses={403: {"description": "Not enough permissions"}},
+)
+
+
+@router.get("/summary")
+def get_summary(db: Session = Depends(get_read_db)) -> dict:
+    counts = get_counts(db, SOLD)
+    sold, unsold = counts.get("true", 0), counts.get("false", 0)
+    return {"total": sold + unsold, "sold": sold, "unsold": unsold}
+
+
+@router.get("/unsold")
+def get_unsold_count(db: Session = Depends(get_read_db)) -> dict:
+    return {"unsold": get_counts(db, SOLD).get("false", 0)}
+
+
+@router.get("/decades")
+def get_decade_counts(db: Session = Depends(get_read_db)) -> list:
+    counts = get_counts(db, DECADE)
+    return [
+        {"decade": int(decade), "count": counts[decade]}
+        for decade in sorted(counts, key=int)
+    ]
+
+
+@router.get("/brands")
+def get_brand_counts(db: Session = Depends(get_read_db)) -> list:
+    items = []
+    for brand_id, count in get_counts(db, BRAND).items():
+        brand = brand_registry.get(db, int(brand_id))
+        items.append(
+            {
+                "brand_id": int(brand_id),
+                "brand_name": brand.name if brand else None,
+                "count": count,
+            }
+        )
+    return sorted(items, key=lambda i: i["count"], reverse=True)
+
+
+@router.get("/recent")
+def get_recent_count(
+    days: int = Query(7, ge=1, le=366, description="Number of days to look back"),
+    db: Session = Depends(get_read_db),
+) -> dict:
+    per_day = count_recent(db, days)
+    return {"days": days, "count": sum(per_day.values()), "per_day": per_day}
+
+
+@router.post("/rebuild")
+def rebuild(db: Session = Depends(get_db)) -> dict:
+    """Rebuild the stats within the request; submit a ``rebuild_stats`` job
+    to run it in the background instead."""
+    logger.info("Rebuilding vehicle stats")
+    return {"groups": rebuild_stats(db)}
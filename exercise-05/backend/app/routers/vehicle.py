@@ -1,19 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import io
+from typing import List
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from fastapi_pagination.ext.sqlalchemy import paginate
-from fastapi_pagination import Page
+from fastapi_pagination import Page, Params
+from sqlalchemy import Select, select
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
+from app.core.cache import make_cache_key, vehicle_cache
+from app.core.conditional import is_not_modified, make_etag, not_modified, set_validators
+from app.core.config import settings
 from app.core.logger import logger
-from app.db.database import get_db
+from app.core.responses import model_response
+from app.db.database import get_db, get_read_db
+from app.db.versions import VEHICLES, bump_version, get_version
+from app.models.change import CREATED, DELETED, UPDATED, VEHICLE
 from app.models.vehicle import Vehicle
-from app.models.brand import Brand
+from app.models.vehicle_archive import VehicleArchive
+from app.schemas.brand import BrandResponse
 from app.schemas.vehicle import (
     VehicleResponse,
     VehicleCreate,
     VehicleUpdate,
     VehiclePatch,
+    VehicleBulkPatch,
+    BulkResponse,
+    ImportResult,
 )
+from app.services.brand_registry import brand_registry
+from app.services.change_feed import log_changes
+from app.services.pagination import ListPage, TotalParams, listing_total, paginate_listing
+from app.services.vehicle_archive import reads_archive, shared_columns, with_archive
+from app.services.vehicle_bulk import (
+    bulk_create_vehicles,
+    bulk_delete_vehicles,
+    bulk_patch_vehicles,
+    to_bulk_response,
+)
+from app.services.vehicle_export import MEDIA_TYPES, export_statement, stream_export
+from app.services.vehicle_import import detect_format, import_vehicles
+from app.services.vehicle_search import search_statement, search_terms
+from app.services.vehicle_stats import new_vehicle_state, record_change
+from app.services.vehicle_writes import VEHICLE_COLUMNS, delete_vehicle_row, update_vehicle_row
 
 
 router = APIRouter(
@@ -24,41 +65,307 @@ router = APIRouter(
 )
 
 
-@router.get("/", response_model=Page[VehicleResponse])
+@router.get("/", response_model=ListPage[VehicleResponse])
 def get_vehicles(
+    request: Request,
     year: int = Query(None, description="Query vehicle by year"),
     brand_id: int = Query(None, description="Query vehicle by brand ID"),
     color: str = Query(None, description="Query vehicle by color"),
     is_sold: bool = Query(None, description="Query vehicle by sold status"),
-    db: Session = Depends(get_db),
-) -> Page[VehicleResponse]:
+    include_archived: bool = Query(
+        False, description="Include archived vehicles; always true with is_sold=true"
+    ),
+    params: Params = Depends(),
+    total_params: TotalParams = Depends(),
+    db: Session = Depends(get_read_db),
+) -> ListPage[VehicleResponse]:
     logger.info("Starting to fetch all vehicles")
-    query = db.query(Vehicle)
     if brand_id is not None:
-        brand = get_brand_or_404(db, brand_id)
-        if brand:
-            query = query.filter(Vehicle.brand_id == brand_id)
+        get_brand_or_404(db, brand_id)
+
+    # Every vehicle write bumps the version, so an unchanged version and
+    # query mean an unchanged page and the rows need not be read at all.
+    version = get_version(db, VEHICLES)
+    filters = (year, brand_id, color, is_sold)
+    archived = reads_archive(is_sold, include_archived)
+    total_mode = (total_params.include_total, total_params.approximate_total)
+    etag = make_etag(
+        VEHICLES, version, *filters, archived, *total_mode, params.page, params.size
+    )
+    if is_not_modified(request, etag):
+        logger.info("Vehicles page not modified")
+        return not_modified(etag)
+
+    cache_key = None
+    if vehicle_cache.enabled:
+        cache_key = make_cache_key(
+            version, *filters, archived, *total_mode, params.page, params.size
+        )
+        cached = vehicle_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Vehicles page served from cache")
+            return Response(
+                cached,
+                media_type="application/json",
+                headers={"X-Cache": "HIT", "ETag": etag},
+            )
+
+    if archived:
+        query, count_query = archive_listing(db, filters, params)
+    else:
+        count_query = filter_vehicles(db.query(Vehicle), *filters)
+        query = count_query.order_by(Vehicle.created_at, Vehicle.id)
+    # The archive flag counts as a filter, which keeps the statistics
+    # estimate of the vehicles table for the hot listing only.
+    total = listing_total(
+        db,
+        count_query,
+        total_params,
+        Vehicle.__tablename__,
+        version,
+        (*filters, archived or None),
+    )
+    page = paginate_listing(
+        query,
+        params,
+        total,
+        transformer=lambda items: [to_vehicle_response(db, v) for v in items],
+    )
+    logger.info("Pagination query executed successfully")
+    if cache_key is None:
+        return model_response(page, {"ETag": etag})
+
+    body = page.model_dump_json()
+    vehicle_cache.set(cache_key, body)
+    return Response(
+        body, media_type="application/json", headers={"X-Cache": "MISS", "ETag": etag}
+    )
+
+
+def filter_vehicles(query, year, brand_id, color, is_sold, model=Vehicle):
+    if brand_id is not None:
+        query = query.filter(model.brand_id == brand_id)
     if year is not None:
-        query = query.filter(Vehicle.year == year)
+        query = query.filter(model.year == year)
     if color is not None:
-        query = query.filter(Vehicle.color == color)
+        query = query.filter(model.color == color)
     if is_sold is not None:
-        query  = query.filter(Vehicle.is_sold == is_sold)
+        query = query.filter(model.is_sold == is_sold)
+    return query
 
-    query = query.order_by(Vehicle.created_at)
-    logger.info("Pagination query executed successfully")
-    return paginate(db, query)
+
+def archive_listing(db: Session, filters: tuple, params: Params):
+    """Queries for a page of vehicles and archived vehicles matching
+    ``filters``, in listing order, and for their total."""
+    hot, cold = (
+        filter_vehicles(select(*shared_columns(model)), *filters, model=model)
+        for model in (Vehicle, VehicleArchive)
+    )
+    raw_params = params.to_raw_params()
+    rows = with_archive(hot, cold, raw_params.offset + raw_params.limit)
+    return (
+        db.query(rows).order_by(rows.c.created_at, rows.c.id),
+        db.query(with_archive(hot, cold)),
+    )
+
+
+def export_query(year, brand_id, color, is_sold, include_archived=False) -> Select:
+    """Export statement for the filters, over the archive too when they
+    ask for sold or archived vehicles."""
+    filters = (year, brand_id, color, is_sold)
+    statement = filter_vehicles(export_statement(), *filters)
+    if not reads_archive(is_sold, include_archived):
+        return statement
+    cold = filter_vehicles(export_statement(VehicleArchive), *filters, model=VehicleArchive)
+    rows = with_archive(statement.order_by(None), cold.order_by(None))
+    return select(rows).order_by(rows.c.created_at, rows.c.id)
+
+
+@router.get("/search", response_model=Page[VehicleResponse])
+def search_vehicles(
+    q: str = Query(..., min_length=1, description="Words to match in model or description"),
+    year: int = Query(None, description="Query vehicle by year"),
+    brand_id: int = Query(None, description="Query vehicle by brand ID"),
+    color: str = Query(None, description="Query vehicle by color"),
+    is_sold: bool = Query(None, description="Query vehicle by sold status"),
+    include_archived: bool = Query(
+        False, description="Include archived vehicles; always true with is_sold=true"
+    ),
+    params: Params = Depends(),
+    db: Session = Depends(get_db),
+) -> Page[VehicleResponse]:
+    logger.info(f"Searching vehicles for '{q}'")
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            detail="Search query must contain letters or digits",
+        )
+    if brand_id is not None:
+        get_brand_or_404(db, brand_id)
+
+    # Archived vehicles are searched like the listing reads them.
+    models = [Vehicle]
+    if reads_archive(is_sold, include_archived):
+        models.append(VehicleArchive)
+    statements = [
+        filter_vehicles(
+            search_statement(db, terms, model), year, brand_id, color, is_sold, model=model
+        )
+        for model in models
+    ]
+    rows = with_archive(*statements) if len(statements) > 1 else statements[0].subquery()
+    query = db.query(rows).order_by(rows.c.rank, rows.c.created_at, rows.c.id)
+    page = paginate(
+        db,
+        query,
+        params,
+        transformer=lambda items: [to_vehicle_response(db, v) for v in items],
+    )
+    return model_response(page)
+
+
+@router.get("/export")
+def export_vehicles(
+    export_format: str = Query(
+        "ndjson", alias="format", pattern="^(ndjson|csv)$", description="Export format"
+    ),
+    year: int = Query(None, description="Query vehicle by year"),
+    brand_id: int = Query(None, description="Query vehicle by brand ID"),
+    color: str = Query(None, description="Query vehicle by color"),
+    is_sold: bool = Query(None, description="Query vehicle by sold status"),
+    include_archived: bool = Query(
+        False, description="Include archived vehicles; always true with is_sold=true"
+    ),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    logger.info(f"Starting vehicle export as {export_format}")
+    if brand_id is not None:
+        get_brand_or_404(db, brand_id)
+
+    statement = export_query(year, brand_id, color, is_sold, include_archived)
+    return StreamingResponse(
+        stream_export(db.get_bind(), statement, export_format, settings.EXPORT_YIELD_PER),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename=vehicles.{export_format}"
+        },
+    )
+
+
+@router.post("/import", response_model=ImportResult)
+def import_vehicles_file(
+    file: UploadFile = File(..., description="CSV or NDJSON file of vehicles"),
+    import_format: str = Query(
+        None,
+        alias="format",
+        pattern="^(ndjson|csv)$",
+        description="File format, detected from the file name when omitted",
+    ),
+    chunk_size: int = Query(None, ge=1, description="Rows validated and inserted per batch"),
+    db: Session = Depends(get_db),
+) -> ImportResult:
+    import_format = import_format or detect_format(file.filename or "")
+    if import_format is None:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            detail="Unknown file format, use format=csv or format=ndjson",
+        )
+
+    logger.info(f"Starting vehicle import from '{file.filename}' as {import_format}")
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return import_vehicles(
+            db, stream, import_format, chunk_size or settings.IMPORT_CHUNK_SIZE
+        )
+    finally:
+        stream.detach()
+
+
+@router.get("/cache/stats")
+def get_vehicle_cache_stats() -> dict:
+    return vehicle_cache.stats()
+
+
+def run_bulk(db: Session, operation, items, batch_size: int) -> BulkResponse:
+    try:
+        results = operation(db, items, batch_size or settings.BULK_BATCH_SIZE)
+        bump_version(db, VEHICLES)
+        for action in (CREATED, UPDATED, DELETED):
+            log_changes(db, VEHICLE, action, [r.id for r in results if r.status == action])
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Bulk operation failed: {str(e)}", exc_info=True)
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    response = to_bulk_response(results)
+    logger.info(
+        f"Bulk operation finished: {response.succeeded} succeeded, {response.failed} failed"
+    )
+    return response
+
+
+@router.post("/bulk", response_model=BulkResponse)
+def create_vehicles_bulk(
+    request: List[VehicleCreate],
+    batch_size: int = Query(None, ge=1, description="Rows per INSERT statement"),
+    db: Session = Depends(get_db),
+) -> BulkResponse:
+    logger.info(f"Starting bulk creation of {len(request)} vehicles")
+    return run_bulk(db, bulk_create_vehicles, request, batch_size)
+
+
+@router.patch("/bulk", response_model=BulkResponse)
+def patch_vehicles_bulk(
+    request: List[VehicleBulkPatch],
+    batch_size: int = Query(None, ge=1, description="Rows per UPDATE batch"),
+    db: Session = Depends(get_db),
+) -> BulkResponse:
+    logger.info(f"Starting bulk patch of {len(request)} vehicles")
+    return run_bulk(db, bulk_patch_vehicles, request, batch_size)
+
+
+@router.delete("/bulk", response_model=BulkResponse)
+def delete_vehicles_bulk(
+    ids: List[int] = Body(..., description="IDs of the vehicles to delete"),
+    batch_size: int = Query(None, ge=1, description="IDs per DELETE statement"),
+    db: Session = Depends(get_db),
+) -> BulkResponse:
+    logger.info(f"Starting bulk deletion of {len(ids)} vehicles")
+    return run_bulk(db, bulk_delete_vehicles, ids, batch_size)
 
 
 @router.get("/{id}", response_model=VehicleResponse)
-def get_vehicle(id: int, db: Session = Depends(get_db)) -> VehicleResponse:
+def get_vehicle(
+    id: int, request: Request, response: Response, db: Session = Depends(get_read_db)
+) -> VehicleResponse:
     vehicle = get_vehicle_or_404(db, id)
+    etag = vehicle_etag(vehicle)
+    if is_not_modified(request, etag, vehicle.updated_at):
+        logger.info(f"Vehicle with ID {id} not modified")
+        return not_modified(etag, vehicle.updated_at)
+    set_validators(response, etag, vehicle.updated_at)
     logger.info(f"Vehicle with ID {id} fetched successfully")
-    return vehicle
+    return to_vehicle_response(db, vehicle)
+
+
+def vehicle_etag(vehicle: Vehicle) -> str:
+    # updated_at only has second precision on SQLite, so the column values
+    # are part of the tag too.
+    return make_etag(
+        vehicle.id,
+        vehicle.updated_at,
+        vehicle.model,
+        vehicle.brand_id,
+        vehicle.color,
+        vehicle.year,
+        vehicle.description,
+        vehicle.is_sold,
+    )
 
 
-def get_brand_or_404(db: Session, id: int) -> Brand:
-    brand = db.query(Brand).filter(Brand.id == id).first()
+def get_brand_or_404(db: Session, id: int) -> BrandResponse:
+    brand = brand_registry.get(db, id)
     if not brand:
         logger.warning(f"Brand with ID {id} not found")
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Brand not found")
@@ -66,12 +373,29 @@ def get_brand_or_404(db: Session, id: int) -> Brand:
     return brand
 
 
+def to_vehicle_response(db: Session, vehicle: Vehicle) -> VehicleResponse:
+    """Build the response with the brand taken from the registry instead of
+    lazy loading ``vehicle.brand``."""
+    return VehicleResponse(
+        id=vehicle.id,
+        model=vehicle.model,
+        brand_id=vehicle.brand_id,
+        color=vehicle.color,
+        year=vehicle.year,
+        description=vehicle.description,
+        is_sold=vehicle.is_sold,
+        created_at=vehicle.created_at,
+        updated_at=vehicle.updated_at,
+        brand=brand_registry.get(db, vehicle.brand_id),
+    )
+
+
 @router.post("/", response_model=VehicleResponse)
 def create_vehicle(
     request: VehicleCreate, db: Session = Depends(get_db)
 ) -> VehicleResponse:
     logger.info("Starting vehicle creation")
-    brand = get_brand_or_404(db, request.brand_id)
+    get_brand_or_404(db, request.brand_id)
 
     vehicle = Vehicle(
         model=request.model,
@@ -83,11 +407,14 @@ def create_vehicle(
     )
     try:
         db.add(vehicle)
+        db.flush()
+        record_change(db, None, new_vehicle_state(request.model_dump()))
+        bump_version(db, VEHICLES)
+        log_changes(db, VEHICLE, CREATED, [vehicle.id])
         db.commit()
         db.refresh(vehicle)
-        _ = vehicle.brand
         logger.info(f"Vehicle with ID {vehicle.id} created successfully")
-        return vehicle
+        return to_vehicle_response(db, vehicle)
     except SQLAlchemyError as e:
         db.rollback()
         logger.error(f"Failed to create vehicle: {str(e)}", exc_info=True)
@@ -97,61 +424,79 @@ def create_vehicle(
 def get_vehicle_or_404(db: Session, id: int) -> Vehicle:
     vehicle = db.query(Vehicle).filter(Vehicle.id == id).first()
     if not vehicle:
-        logger.warning(f"Vehicle with ID:{id} not found")
-        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Vehicle not found")
+        # Sold vehicles may have moved to the archive.
+        vehicle = db.query(VehicleArchive).filter(VehicleArchive.id == id).first()
+    if not vehicle:
+        raise vehicle_not_found(id)
     logger.info(f"Vehicle with ID {id} fetched successfully")
     return vehicle
 
 
+def vehicle_not_found(id: int) -> HTTPException:
+    logger.warning(f"Vehicle with ID:{id} not found")
+    return HTTPException(status.HTTP_404_NOT_FOUND, detail="Vehicle not found")
+
+
 @router.put("/{id}", response_model=VehicleResponse)
 def update_vehicle(
     request: VehicleUpdate, id: int, db: Session = Depends(get_db)
 ) -> VehicleResponse:
-    vehicle = get_vehicle_or_404(db, id)
-
-    for attr, value in request.model_dump().items():
-        setattr(vehicle, attr, value)
-
-    try:
-        db.commit()
-        db.refresh(vehicle)
-        _ = vehicle.brand
-        logger.info(f"Vehicle with ID {id} updated successfully")
-        return vehicle
-    except SQLAlchemyError as e:
-        db.rollback()
-        logger.error(f"Error while updating vehicle with ID {id}: {str(e)}", exc_info=True)
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    return write_vehicle(db, id, request.model_dump(), "updated")
 
 
 @router.patch("/{id}", response_model=VehicleResponse)
 def patch_vehicle(
     request: VehiclePatch, id: int, db: Session = Depends(get_db)
 ) -> VehicleResponse:
-    vehicle = get_vehicle_or_404(db, id)
+    return write_vehicle(db, id, request.model_dump(exclude_unset=True), "patched")
+
 
-    for key, value in request.model_dump(exclude_unset=True).items():
-        setattr(vehicle, key, value)
+def write_vehicle(db: Session, id: int, values: dict, action: str) -> VehicleResponse:
+    """Update the row in one statement and answer from what it returned."""
     try:
-        db.commit()
-        db.refresh(vehicle)
-        _ = vehicle.brand
-        logger.info(f"Vehicle with ID {id} patched successfully")
-        return vehicle
+        if values:
+            vehicle = update_vehicle_row(db, id, values)
+        else:
+            vehicle = db.execute(
+                select(*VEHICLE_COLUMNS).where(Vehicle.id == id)
+            ).first()
+        if vehicle is not None and values:
+            bump_version(db, VEHICLES)
+            log_changes(db, VEHICLE, UPDATED, [id])
+            db.commit()
+    except IntegrityError:
+        # The only constraint a vehicle update can break is the brand's
+        # foreign key.
+        db.rollback()
+        logger.warning(f"Brand with ID {values.get('brand_id')} not found")
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Brand not found")
     except SQLAlchemyError as e:
         db.rollback()
         logger.error(f"Error while updating vehicle with ID {id}: {str(e)}", exc_info=True)
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    if vehicle is None:
+        if db.get(VehicleArchive, id) is not None:
+            logger.warning(f"Vehicle with ID {id} is archived")
+            raise HTTPException(
+                status.HTTP_409_CONFLICT, detail="Archived vehicles cannot be modified"
+            )
+        raise vehicle_not_found(id)
+    logger.info(f"Vehicle with ID {id} {action} successfully")
+    return to_vehicle_response(db, vehicle)
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_vehicle(id: int, db: Session = Depends(get_db)):
-    vehicle = get_vehicle_or_404(db, id)
     try:
-        db.delete(vehicle)
-        db.commit()
-        logger.info(f"Vehicle with ID {id} deleted successfully")
+        deleted = delete_vehicle_row(db, id)
+        if deleted:
+            bump_version(db, VEHICLES)
+            log_changes(db, VEHICLE, DELETED, [id])
+            db.commit()
     except SQLAlchemyError as e:
         db.rollback()
         logger.error(f"Error while deleting vehicle with ID {id}: {str(e)}", exc_info=True)
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    if not deleted:
+        raise vehicle_not_found(id)
+    logger.info(f"Vehicle with ID {id} deleted successfully")
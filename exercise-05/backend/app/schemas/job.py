@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Annotated, Literal, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ExportJobParams(BaseModel):
+    format: str = Field("ndjson", pattern="^(ndjson|csv)$")
+    year: Optional[int] = None
+    brand_id: Optional[int] = None
+    color: Optional[str] = None
+    is_sold: Optional[bool] = None
+    include_archived: bool = False
+
+
+class ExportJobCreate(BaseModel):
+    type: Literal["export"]
+    params: ExportJobParams = ExportJobParams()
+
+
+class RebuildStatsJobCreate(BaseModel):
+    type: Literal["rebuild_stats"]
+
+
+class ArchiveJobParams(BaseModel):
+    # ARCHIVE_AFTER_DAYS when omitted.
+    older_than_days: Optional[float] = Field(None, ge=0)
+
+
+class ArchiveJobCreate(BaseModel):
+    type: Literal["archive_vehicles"]
+    params: ArchiveJobParams = ArchiveJobParams()
+
+
+# Imports upload a file and are submitted through POST /jobs/import.
+JobCreate = Annotated[
+    Union[ExportJobCreate, RebuildStatsJobCreate, ArchiveJobCreate],
+    Field(discriminator="type"),
+]
+
+
+class JobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    type: str
+    status: str
+    params: dict
+    progress: int
+    total: Optional[int] = None
+    result: Optional[dict] = None
+    result_url: Optional[str] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
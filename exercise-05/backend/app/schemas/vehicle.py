@@ -43,3 +43,35 @@ class VehiclePatch(BaseModel):
     description: Optional[str] = None
     is_sold: Optional[bool] = None
     brand_id: Optional[int] = None
+
+
+class VehicleBulkPatch(VehiclePatch):
+    id: int
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    status: str
+    detail: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+class ImportRowError(BaseModel):
+    row: int
+    detail: str
+
+
+class ImportResult(BaseModel):
+    format: str
+    rows: int
+    imported: int
+    failed: int
+    seconds: float
+    rows_per_second: float
+    errors: List[ImportRowError]
@@ -1,4 +1,9 @@
-from app.db.database import SessionLocal, engine, Base, create_tables
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.logger import logger
+from app.db.database import SessionLocal, create_tables
+from app.db.versions import BRANDS, bump_version
 from app.models.brand import Brand
 
 vehicle_brands = [
@@ -55,13 +60,25 @@ vehicle_brands = [
 ]
 
 
-def seed_brands():
+def seed_brands() -> int:
+    """Insert the brands that are missing with one query and one
+    multi-row insert. Returns the number of brands added."""
     session = SessionLocal()
-    for name in vehicle_brands:
-        if not session.query(Brand).filter_by(name=name).first():
-            session.add(Brand(name=name))
-    session.commit()
-    session.close()
+    try:
+        existing = set(session.execute(select(Brand.name)).scalars())
+        missing = [name for name in vehicle_brands if name not in existing]
+        if not missing:
+            return 0
+        dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+        # Another worker seeding at the same time is not an error.
+        statement = dialect.insert(Brand).values([{"name": name} for name in missing])
+        inserted = session.execute(statement.on_conflict_do_nothing()).rowcount
+        bump_version(session, BRANDS)
+        session.commit()
+        logger.info(f"Seeded {inserted} brands")
+        return inserted
+    finally:
+        session.close()
 
 
 if __name__ == "__main__":
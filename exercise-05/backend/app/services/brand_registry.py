@@ -0,0 +1,135 @@
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.db.database import SessionLocal
+from app.db.versions import BRANDS, get_version
+from app.models.brand import Brand
+from app.schemas.brand import BrandResponse
+
+
+class BrandRegistry:
+    """In-process copy of the brands table keyed by id and lower-cased name.
+
+    Writes made through this worker update the registry directly. Writes made
+    by other workers are picked up by comparing the ``brands`` version counter
+    at most once every ``ttl`` seconds. Ids and names the database does not
+    have are remembered too, until the next version bump.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, BrandResponse] = {}
+        self._by_name: Dict[str, BrandResponse] = {}
+        self._missing_ids: Set[int] = set()
+        self._missing_names: Set[str] = set()
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    def load(self, db: Session) -> None:
+        version = get_version(db, BRANDS)
+        brands = [BrandResponse.model_validate(b) for b in db.query(Brand).all()]
+        with self._lock:
+            self._by_id = {b.id: b for b in brands}
+            self._by_name = {b.name.lower(): b for b in brands}
+            self._missing_ids = set()
+            self._missing_names = set()
+            self._version = version
+            self._checked_at = time.monotonic()
+        logger.info(f"Brand registry loaded with {len(brands)} brands")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_id = {}
+            self._by_name = {}
+            self._missing_ids = set()
+            self._missing_names = set()
+            self._version = None
+            self._checked_at = 0.0
+
+    def get(self, db: Session, id: int) -> Optional[BrandResponse]:
+        self._sync(db)
+        brand = self._by_id.get(id)
+        if brand is None and id not in self._missing_ids:
+            row = db.query(Brand).filter(Brand.id == id).first()
+            brand = self._remember(row)
+            if brand is None:
+                with self._lock:
+                    if id not in self._by_id:
+                        self._missing_ids.add(id)
+        return brand
+
+    def get_by_name(self, db: Session, name: str) -> Optional[BrandResponse]:
+        self._sync(db)
+        # The same lower() as the database, so both paths agree on a match.
+        key = name.lower()
+        brand = self._by_name.get(key)
+        if brand is None and key not in self._missing_names:
+            row = db.query(Brand).filter(func.lower(Brand.name) == key).first()
+            brand = self._remember(row)
+            if brand is None:
+                with self._lock:
+                    if key not in self._by_name:
+                        self._missing_names.add(key)
+        return brand
+
+    def add(self, brand: Brand, version: Optional[int] = None) -> BrandResponse:
+        snapshot = BrandResponse.model_validate(brand)
+        with self._lock:
+            self._by_id[snapshot.id] = snapshot
+            self._by_name[snapshot.name.lower()] = snapshot
+            self._missing_ids.discard(snapshot.id)
+            self._missing_names.discard(snapshot.name.lower())
+            self._advance(version)
+        return snapshot
+
+    def remove(self, id: int, version: Optional[int] = None) -> None:
+        with self._lock:
+            brand = self._by_id.pop(id, None)
+            if brand is not None:
+                self._by_name.pop(brand.name.lower(), None)
+            self._advance(version)
+
+    def _remember(self, row: Optional[Brand]) -> Optional[BrandResponse]:
+        if row is None:
+            return None
+        snapshot = BrandResponse.model_validate(row)
+        with self._lock:
+            self._by_id[snapshot.id] = snapshot
+            self._by_name[snapshot.name.lower()] = snapshot
+        return snapshot
+
+    def _advance(self, version: Optional[int]) -> None:
+        # Only follow our own bump; a gap means another worker wrote in
+        # between and the next sync has to reload.
+        if version is not None and self._version is not None:
+            if version == self._version + 1:
+                self._version = version
+
+    def _sync(self, db: Session) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.ttl:
+            return
+        version = get_version(db, BRANDS)
+        if version != self._version:
+            logger.info("Brand registry is stale, reloading")
+            self.load(db)
+        else:
+            self._checked_at = now
+
+
+brand_registry = BrandRegistry(ttl=settings.BRAND_REGISTRY_TTL)
+
+
+def load_brand_registry():
+    session = SessionLocal()
+    try:
+        brand_registry.load(session)
+    finally:
+        session.close()
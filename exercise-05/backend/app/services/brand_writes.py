@@ -0,0 +1,108 @@
+from typing import Callable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.logger import logger
+from app.db.versions import BRANDS, VEHICLES, bump_version
+from app.models.brand import Brand
+from app.models.change import BRAND, DELETED, VEHICLE
+from app.models.vehicle import Vehicle
+from app.models.vehicle_archive import VehicleArchive
+from app.services.brand_registry import brand_registry
+from app.services.change_feed import log_changes
+from app.services.vehicle_bulk import STATE_COLUMNS
+from app.services.vehicle_stats import StatsDelta, aggregate
+
+
+def delete_brand_row(db: Session, id: int) -> bool:
+    """Delete brand ``id`` with one ``DELETE``; the database removes its
+    vehicles and archived vehicles through ``ON DELETE CASCADE``.
+
+    vehicle_stats and the change log cannot see the cascaded rows, so their
+    counters are aggregated per group and their ids read beforehand, in the
+    same transaction. The brand row is locked first so no vehicle can be
+    added to it in between.
+    """
+    locked = db.execute(select(Brand.id).where(Brand.id == id).with_for_update()).first()
+    if locked is None:
+        return False
+    vehicle_ids = [
+        vehicle_id
+        for model in (Vehicle, VehicleArchive)
+        for vehicle_id in db.execute(select(model.id).where(model.brand_id == id)).scalars()
+    ]
+    delta = StatsDelta()
+    delta.counts.subtract(aggregate(db, Vehicle.brand_id == id))
+    delta.counts.subtract(
+        aggregate(db, VehicleArchive.brand_id == id, model=VehicleArchive)
+    )
+    deleted = db.execute(
+        delete(Brand)
+        .where(Brand.id == id)
+        .returning(Brand.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if deleted is None:
+        return False
+    delta.apply(db)
+    log_changes(db, VEHICLE, DELETED, vehicle_ids)
+    return True
+
+
+def delete_vehicle_chunk(db: Session, brand_id: int, size: int, model=Vehicle) -> int:
+    """Delete up to ``size`` rows of ``brand_id`` from ``model``, vehicles or
+    the archive, and return how many went."""
+    ids = select(model.id).where(model.brand_id == brand_id).limit(size)
+    rows = db.execute(
+        delete(model)
+        .where(model.id.in_(ids.scalar_subquery()))
+        .returning(*(getattr(model, column.key) for column in STATE_COLUMNS))
+        .execution_options(synchronize_session=False)
+    ).all()
+    delta = StatsDelta()
+    for row in rows:
+        delta.remove(row._asdict())
+    delta.apply(db)
+    log_changes(db, VEHICLE, DELETED, [row.id for row in rows])
+    return len(rows)
+
+
+def delete_brand_in_chunks(
+    bind: Engine,
+    id: int,
+    chunk_size: int,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Delete brand ``id`` a chunk of vehicles per transaction, so no
+    statement holds its locks for long, then the brand itself; return how
+    many vehicles went.
+
+    Runs as a job. ``progress`` is called with the vehicles deleted so far
+    after each chunk. Vehicles added to the brand meanwhile are removed by
+    the final cascade.
+    """
+    deleted = 0
+    for model in (Vehicle, VehicleArchive):
+        while True:
+            with Session(bind) as db:
+                count = delete_vehicle_chunk(db, id, chunk_size, model)
+                if count:
+                    bump_version(db, VEHICLES)
+                db.commit()
+            deleted += count
+            if count < chunk_size:
+                break
+            if progress is not None:
+                progress(deleted)
+
+    with Session(bind) as db:
+        if delete_brand_row(db, id):
+            bump_version(db, VEHICLES)
+            log_changes(db, BRAND, DELETED, [id])
+        version = bump_version(db, BRANDS)
+        db.commit()
+    brand_registry.remove(id, version)
+    logger.info(f"Brand with ID {id} deleted with {deleted} vehicles in chunks")
+    return deleted
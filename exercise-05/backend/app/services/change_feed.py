@@ -0,0 +1,275 @@
+import asyncio
+import json
+import time
+from collections import deque
+from contextlib import suppress
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.db.database import SessionLocal
+from app.models.change import Change
+
+# An event id and its text on the wire.
+Event = Tuple[int, str]
+
+
+def log_changes(db: Session, entity: str, action: str, ids: Iterable[int]) -> None:
+    """Record changes of ``entity`` in the caller's transaction; subscribers
+    see them once it commits."""
+    rows = [{"entity": entity, "action": action, "entity_id": id} for id in ids]
+    if rows:
+        db.execute(insert(Change), rows)
+        db.info["changes"] = True
+
+
+def purge_changes(db: Session, cutoff: datetime) -> int:
+    """Delete changes logged before ``cutoff``.
+
+    The newest change always stays: a resuming client whose last event is
+    older than the oldest change left has missed some, and SQLite would
+    otherwise hand out the id of a deleted newest row again.
+    """
+    deleted = db.execute(
+        delete(Change)
+        .where(
+            Change.created_at < cutoff,
+            Change.id < select(func.max(Change.id)).scalar_subquery(),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if deleted:
+        logger.info(f"Purged {deleted} changes logged before {cutoff}")
+    return deleted
+
+
+def format_event(change) -> str:
+    data = json.dumps(
+        {"entity": change.entity, "action": change.action, "id": change.entity_id}
+    )
+    return f"id: {change.id}\nevent: change\ndata: {data}\n\n"
+
+
+def format_reset(id: int) -> str:
+    return f"id: {id}\nevent: reset\ndata: {{}}\n\n"
+
+
+class ChangeFeed:
+    """Fans the ``changes`` table out to this process's stream subscribers.
+
+    While anyone is subscribed, one task polls the table every
+    ``poll_seconds`` for changes after the last one it published, and at
+    once when a session of this process commits a change. The newest
+    ``buffer_size`` events are kept formatted in memory and every subscriber
+    reads from there; subscribers that fall further behind, or resume from
+    an older ``Last-Event-ID``, read their backlog from the table.
+
+    Ids are assigned before commit, so on Postgres a lower id can commit
+    after a higher one. The poller waits at such a gap for up to
+    ``gap_seconds`` before taking it for a rolled back transaction, so
+    events always go out in id order.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        poll_seconds: float = 1.0,
+        buffer_size: int = 1000,
+        gap_seconds: float = 5.0,
+        heartbeat: float = 15.0,
+        batch_size: int = 1000,
+    ):
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self.gap_seconds = gap_seconds
+        self.heartbeat = heartbeat
+        self.batch_size = batch_size
+        self.head = 0
+        self.buffer: deque = deque(maxlen=buffer_size)
+        # Every event after this id is in the buffer.
+        self._floor = 0
+        self._gap_since: Optional[float] = None
+        self._subscribers = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._published: Optional[asyncio.Event] = None
+
+    def notify(self) -> None:
+        """Poll now. Safe to call from any thread."""
+        loop, wake = self._loop, self._wake
+        if loop is None or wake is None:
+            return
+        with suppress(RuntimeError):  # The loop closed meanwhile.
+            loop.call_soon_threadsafe(wake.set)
+
+    async def subscribe(
+        self,
+        last_event_id: Optional[int],
+        is_disconnected: Callable[[], Awaitable[bool]],
+    ) -> AsyncIterator[str]:
+        """Yield server-sent events for changes after ``last_event_id``, or
+        from now on without one.
+
+        A ``reset`` event replaces changes that can no longer be replayed
+        because they were purged; clients should refetch what they show.
+        """
+        self._subscribers += 1
+        try:
+            await self._start()
+            cursor = self.head
+            if last_event_id is not None:
+                oldest = await run_in_threadpool(self._oldest_id)
+                if last_event_id > self.head or (
+                    oldest is not None and last_event_id < oldest - 1
+                ):
+                    yield format_reset(cursor)
+                else:
+                    cursor = last_event_id
+            last_sent = time.monotonic()
+            while not await is_disconnected():
+                published = self._published
+                if cursor < self.head:
+                    events = self._buffered(cursor)
+                    if events is None:
+                        rows = await run_in_threadpool(self._read, cursor, self.head)
+                        events = [(row.id, format_event(row)) for row in rows]
+                    if not events:
+                        cursor = self.head
+                        continue
+                    cursor = events[-1][0]
+                    last_sent = time.monotonic()
+                    yield "".join(text for _, text in events)
+                    continue
+                # Wake up regularly to notice a disconnect.
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(published.wait(), min(1.0, self.heartbeat))
+                if time.monotonic() - last_sent >= self.heartbeat:
+                    last_sent = time.monotonic()
+                    yield ": keep-alive\n\n"
+        finally:
+            self._subscribers -= 1
+            if not self._subscribers:
+                await self._stop()
+
+    async def poll(self) -> int:
+        """Publish the committed changes after the last published one; return
+        how many were published."""
+        rows = await run_in_threadpool(self._read, self.head, None)
+        events = self._in_order(rows, time.monotonic())
+        for event in events:
+            if len(self.buffer) == self.buffer.maxlen:
+                self._floor = self.buffer[0][0]
+            self.buffer.append(event)
+        if events:
+            self.head = events[-1][0]
+            published, self._published = self._published, asyncio.Event()
+            published.set()
+        if len(rows) == self.batch_size:
+            self._wake.set()
+        return len(events)
+
+    def _in_order(self, rows: List[Change], now: float) -> List[Event]:
+        events = []
+        expected = self.head + 1
+        for row in rows:
+            if row.id == expected:
+                self._gap_since = None
+            else:
+                if self._gap_since is None:
+                    self._gap_since = now
+                if now - self._gap_since < self.gap_seconds:
+                    break
+                self._gap_since = None
+            events.append((row.id, format_event(row)))
+            expected = row.id + 1
+        return events
+
+    def _buffered(self, cursor: int) -> Optional[List[Event]]:
+        if cursor < self._floor:
+            return None
+        events = []
+        for event in reversed(self.buffer):
+            if event[0] <= cursor:
+                break
+            events.append(event)
+        events.reverse()
+        return events
+
+    async def _start(self) -> None:
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._ready = asyncio.Event()
+            self._published = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self._task.done():
+            raise RuntimeError("Change feed failed to start")
+
+    async def _stop(self) -> None:
+        task, self._task = self._task, None
+        self._loop = self._wake = None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError, Exception):
+                await task
+
+    async def _run(self) -> None:
+        try:
+            self.head = self._floor = await run_in_threadpool(self._latest_id)
+            self.buffer.clear()
+            self._gap_since = None
+        finally:
+            self._ready.set()
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            self._wake.clear()
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Change feed poll failed: {str(e)}", exc_info=True)
+
+    def _read(self, after: int, until: Optional[int]) -> List[Change]:
+        statement = select(Change).where(Change.id > after)
+        if until is not None:
+            statement = statement.where(Change.id <= until)
+        with self.session_factory() as db:
+            return list(
+                db.execute(statement.order_by(Change.id).limit(self.batch_size)).scalars()
+            )
+
+    def _latest_id(self) -> int:
+        with self.session_factory() as db:
+            return db.execute(select(func.max(Change.id))).scalar() or 0
+
+    def _oldest_id(self) -> Optional[int]:
+        with self.session_factory() as db:
+            return db.execute(select(func.min(Change.id))).scalar()
+
+
+def publish_after_commit(feed: ChangeFeed) -> None:
+    """Wake ``feed`` whenever a session commits logged changes."""
+
+    @event.listens_for(Session, "after_commit")
+    def _after_commit(session):
+        if session.info.pop("changes", False):
+            feed.notify()
+
+    @event.listens_for(Session, "after_rollback")
+    def _after_rollback(session):
+        session.info.pop("changes", None)
+
+
+change_feed = ChangeFeed(
+    SessionLocal, settings.CHANGES_POLL_SECONDS, settings.CHANGES_BUFFER_SIZE
+)
+publish_after_commit(change_feed)
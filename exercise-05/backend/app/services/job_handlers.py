@@ -0,0 +1,141 @@
+import os
+from datetime import timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.routers.vehicle import export_query
+from app.services.brand_writes import delete_brand_in_chunks
+from app.services.change_feed import purge_changes
+from app.services.jobs import JobContext, JobRunner, JobType, utcnow
+from app.services.vehicle_archive import archive_sold_vehicles, count_archivable
+from app.services.vehicle_export import MEDIA_TYPES, stream_export
+from app.services.vehicle_import import import_vehicles
+from app.services.vehicle_stats import rebuild_stats
+
+EXPORT = "export"
+IMPORT = "import"
+REBUILD_STATS = "rebuild_stats"
+DELETE_BRAND = "delete_brand"
+ARCHIVE_VEHICLES = "archive_vehicles"
+PURGE_CHANGES = "purge_changes"
+
+# Uploaded imports wait next to the results as <job id>.upload.
+UPLOAD_EXTENSION = "upload"
+
+
+def run_export(context: JobContext) -> dict:
+    params = context.params
+    export_format = params.get("format", "ndjson")
+    statement = export_query(
+        params.get("year"),
+        params.get("brand_id"),
+        params.get("color"),
+        params.get("is_sold"),
+        params.get("include_archived", False),
+    )
+    with Session(context.bind) as db:
+        total = db.execute(
+            select(func.count()).select_from(statement.order_by(None).subquery())
+        ).scalar()
+    context.progress(0, total)
+
+    rows = 0
+
+    def progress(exported: int) -> None:
+        nonlocal rows
+        rows = exported
+        context.progress(exported)
+
+    with open(context.result_file(export_format), "w", encoding="utf-8", newline="") as f:
+        for chunk in stream_export(
+            context.bind, statement, export_format, settings.EXPORT_YIELD_PER, progress
+        ):
+            f.write(chunk)
+    return {"format": export_format, "rows": rows}
+
+
+def run_import(context: JobContext) -> dict:
+    """Import an uploaded file. Chunks committed before a cancel or a crash
+    stay imported, so an interrupted import is failed, not rerun."""
+    params = context.params
+    upload = context.file(UPLOAD_EXTENSION)
+    try:
+        with Session(context.bind) as db, open(
+            upload, encoding="utf-8-sig", newline=""
+        ) as stream:
+            result = import_vehicles(
+                db, stream, params["format"], params["chunk_size"], context.progress
+            )
+    finally:
+        os.remove(upload)
+    context.progress(result.rows, result.rows)
+    with open(context.result_file("json"), "w", encoding="utf-8") as f:
+        f.write(result.model_dump_json())
+    return result.model_dump(exclude={"errors"})
+
+
+def run_rebuild_stats(context: JobContext) -> dict:
+    with Session(context.bind) as db:
+        return {"groups": rebuild_stats(db)}
+
+
+def run_delete_brand(context: JobContext) -> dict:
+    deleted = delete_brand_in_chunks(
+        context.bind,
+        context.params["brand_id"],
+        context.params["chunk_size"],
+        context.progress,
+    )
+    return {"vehicles": deleted}
+
+
+def run_archive_vehicles(context: JobContext) -> dict:
+    days = context.params.get("older_than_days")
+    if days is None:
+        days = settings.ARCHIVE_AFTER_DAYS
+    cutoff = utcnow() - timedelta(days=days)
+    with Session(context.bind) as db:
+        context.progress(0, count_archivable(db, cutoff))
+    archived = archive_sold_vehicles(
+        context.bind, cutoff, settings.ARCHIVE_CHUNK_SIZE, context.progress
+    )
+    return {"vehicles": archived}
+
+
+def run_purge_changes(context: JobContext) -> dict:
+    cutoff = utcnow() - timedelta(hours=settings.CHANGES_RETENTION_HOURS)
+    with Session(context.bind) as db:
+        return {"changes": purge_changes(db, cutoff)}
+
+
+JOB_TYPES = {
+    EXPORT: JobType(run_export),
+    IMPORT: JobType(run_import, restartable=False),
+    REBUILD_STATS: JobType(run_rebuild_stats),
+    DELETE_BRAND: JobType(run_delete_brand),
+    ARCHIVE_VEHICLES: JobType(run_archive_vehicles),
+    PURGE_CHANGES: JobType(run_purge_changes),
+}
+
+# Seconds between scheduled runs; 0 leaves a type to be submitted by hand.
+SCHEDULES = {
+    ARCHIVE_VEHICLES: settings.ARCHIVE_INTERVAL_SECONDS,
+    PURGE_CHANGES: settings.CHANGES_PURGE_INTERVAL_SECONDS,
+}
+
+RESULT_MEDIA_TYPES = {**MEDIA_TYPES, "json": "application/json"}
+
+job_runner = JobRunner(
+    SessionLocal,
+    JOB_TYPES,
+    settings.JOBS_CONCURRENCY,
+    settings.JOBS_WORKERS,
+    settings.JOBS_DIR,
+    settings.JOBS_POLL_SECONDS,
+    settings.JOBS_STALE_SECONDS,
+    settings.JOBS_RETENTION_DAYS,
+    {job_type: interval for job_type, interval in SCHEDULES.items() if interval},
+)
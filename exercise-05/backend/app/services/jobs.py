@@ -0,0 +1,393 @@
+import glob
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import Session, aliased, sessionmaker
+
+from app.core.logger import logger
+from app.db.routing import BACKGROUND
+from app.models.job import (
+    CANCELLED,
+    FAILED,
+    FINISHED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    Job,
+)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobType(NamedTuple):
+    """How to run one kind of job. Jobs that are safe to run again from the
+    start are ``restartable``: when their worker dies they are queued again
+    instead of failed."""
+
+    handler: Callable[["JobContext"], Optional[dict]]
+    restartable: bool = True
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobContext:
+    """What a running job sees: its parameters, the database, a place for
+    its result file and a way to report progress."""
+
+    def __init__(self, runner: "JobRunner", job_id: str, params: dict):
+        self.runner = runner
+        self.id = job_id
+        self.params = params
+        self.bind = runner.session_factory.kw["bind"]
+        self.result_path: Optional[str] = None
+
+    def file(self, extension: str) -> str:
+        """Path of one of the job's files, removed with the job."""
+        return os.path.join(self.runner.directory, f"{self.id}.{extension}")
+
+    def result_file(self, extension: str) -> str:
+        """Path the job writes its result to; the runner offers it for
+        download once the job succeeded."""
+        self.result_path = self.file(extension)
+        return self.result_path
+
+    def progress(self, done: int, total: Optional[int] = None) -> None:
+        """Record progress and raise ``JobCancelled`` when a cancel was
+        requested; jobs call it between units of work they can stop after."""
+        values = {"progress": done, "heartbeat_at": utcnow()}
+        if total is not None:
+            values["total"] = total
+        with self.runner.session() as db:
+            cancel = db.execute(
+                update(Job)
+                .where(Job.id == self.id)
+                .values(**values)
+                .returning(Job.cancel_requested)
+            ).scalar()
+            db.commit()
+        if cancel:
+            raise JobCancelled()
+
+
+class JobRunner:
+    """Runs jobs from the ``jobs`` table on a thread pool.
+
+    Every process runs its own runner; they coordinate through the table
+    only. A job is claimed with one ``UPDATE`` that also checks the per-type
+    limit against the jobs already running, and the runner refreshes the
+    heartbeat of its running jobs while it polls. Running jobs whose
+    heartbeat is older than ``stale_seconds`` belonged to a runner that
+    died: restartable ones are queued again, the others fail.
+
+    ``schedules`` maps job types to an interval in seconds; such a type is
+    queued with default parameters when no job of it was submitted within
+    the interval.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        job_types: Dict[str, JobType],
+        limits: Dict[str, int],
+        workers: int,
+        directory: str,
+        poll_seconds: float = 1.0,
+        stale_seconds: float = 60.0,
+        retention_days: float = 7.0,
+        schedules: Optional[Dict[str, float]] = None,
+    ):
+        self.session_factory = session_factory
+        self.job_types = job_types
+        self.limits = limits
+        self.workers = workers
+        self.directory = directory
+        self.poll_seconds = poll_seconds
+        self.stale_seconds = stale_seconds
+        self.retention_days = retention_days
+        self.schedules = schedules or {}
+        self.worker_id = uuid.uuid4().hex
+        self._active = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="job")
+        self._thread = threading.Thread(target=self._loop, name="job-runner", daemon=True)
+        self._thread.start()
+        logger.info(f"Job runner started with {self.workers} workers")
+
+    def stop(self) -> None:
+        """Stop claiming jobs. Jobs still running are abandoned and picked
+        up again by the next runner once their heartbeat is stale."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def wake(self) -> None:
+        """Look for work now instead of at the next poll."""
+        self._wake.set()
+
+    def session(self) -> Session:
+        """A session of the runner's own, flagged so its commits do not pin
+        clients to the primary."""
+        return self.session_factory(info={BACKGROUND: True})
+
+    def _loop(self) -> None:
+        last_maintenance = 0.0
+        while not self._stop.is_set():
+            try:
+                now = utcnow().timestamp()
+                if now - last_maintenance >= self.stale_seconds / 2:
+                    self.reap_stale()
+                    self.purge_finished()
+                    self.submit_scheduled()
+                    last_maintenance = now
+                self.heartbeat()
+                while self._active < self.workers:
+                    claimed = self.claim()
+                    if claimed is None:
+                        break
+                    with self._lock:
+                        self._active += 1
+                    self._executor.submit(self._run_claimed, *claimed)
+            except Exception as e:
+                logger.error(f"Job runner poll failed: {str(e)}", exc_info=True)
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def claim(self) -> Optional[Tuple[str, str]]:
+        """Mark the oldest queued job whose type is under its limit as
+        running by this runner; return its id and type."""
+        running = aliased(Job)
+        under_limit = [
+            and_(
+                Job.type == job_type,
+                select(func.count())
+                .select_from(running)
+                .where(running.type == job_type, running.status == RUNNING)
+                .scalar_subquery()
+                < self.limits.get(job_type, 1),
+            )
+            for job_type in self.job_types
+        ]
+        candidate = (
+            select(Job.id)
+            .where(Job.status == QUEUED, or_(*under_limit))
+            .order_by(Job.created_at, Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        now = utcnow()
+        with self.session() as db:
+            row = db.execute(
+                update(Job)
+                .where(Job.id == candidate, Job.status == QUEUED)
+                .values(
+                    status=RUNNING,
+                    worker=self.worker_id,
+                    started_at=now,
+                    heartbeat_at=now,
+                )
+                .returning(Job.id, Job.type)
+                .execution_options(synchronize_session=False)
+            ).first()
+            db.commit()
+        return tuple(row) if row is not None else None
+
+    def run_next(self) -> bool:
+        """Claim and run one job in the calling thread; return whether there
+        was one. The polling loop does the same on the pool."""
+        claimed = self.claim()
+        if claimed is None:
+            return False
+        with self._lock:
+            self._active += 1
+        self._run_claimed(*claimed)
+        return True
+
+    def _run_claimed(self, job_id: str, job_type: str) -> None:
+        try:
+            self._run(job_id, job_type)
+        finally:
+            with self._lock:
+                self._active -= 1
+            self.wake()
+
+    def _run(self, job_id: str, job_type: str) -> None:
+        with self.session() as db:
+            params = db.execute(select(Job.params).where(Job.id == job_id)).scalar()
+        context = JobContext(self, job_id, params or {})
+        logger.info(f"Running {job_type} job {job_id}")
+        try:
+            context.progress(0)
+            result = self.job_types[job_type].handler(context)
+        except JobCancelled:
+            self._discard(context.result_path)
+            self._finish(job_id, CANCELLED)
+            logger.info(f"Job {job_id} cancelled")
+        except Exception as e:
+            self._discard(context.result_path)
+            self._finish(job_id, FAILED, error=str(e))
+            logger.error(f"Job {job_id} failed: {str(e)}", exc_info=True)
+        else:
+            self._finish(job_id, SUCCEEDED, result=result, result_path=context.result_path)
+            logger.info(f"Job {job_id} succeeded")
+
+    def _finish(self, job_id: str, status: str, **values) -> None:
+        with self.session() as db:
+            db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.worker == self.worker_id)
+                .values(status=status, finished_at=utcnow(), **values)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    def heartbeat(self) -> None:
+        if not self._active:
+            return
+        with self.session() as db:
+            db.execute(
+                update(Job)
+                .where(Job.worker == self.worker_id, Job.status == RUNNING)
+                .values(heartbeat_at=utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    def reap_stale(self) -> int:
+        """Requeue or fail running jobs whose runner stopped beating."""
+        stale = utcnow() - timedelta(seconds=self.stale_seconds)
+        restartable = [name for name, job_type in self.job_types.items() if job_type.restartable]
+        with self.session() as db:
+            criteria = (Job.status == RUNNING, Job.heartbeat_at < stale)
+            requeued = db.execute(
+                update(Job)
+                .where(*criteria, Job.type.in_(restartable))
+                .values(status=QUEUED, worker=None, progress=0)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            failed = db.execute(
+                update(Job)
+                .where(*criteria)
+                .values(
+                    status=FAILED,
+                    finished_at=utcnow(),
+                    error="Interrupted by a restart before it finished",
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        if requeued or failed:
+            logger.warning(f"Requeued {requeued} and failed {failed} interrupted jobs")
+        return requeued + failed
+
+    def submit_scheduled(self) -> int:
+        """Queue the scheduled job types that are due; return how many
+        were queued.
+
+        Runners in other processes check the same table, so a type is
+        queued about once per interval; when two runners race, the type's
+        concurrency limit runs the jobs one after the other.
+        """
+        queued = 0
+        with self.session() as db:
+            for job_type, interval in self.schedules.items():
+                since = utcnow() - timedelta(seconds=interval)
+                recent = db.execute(
+                    select(Job.id)
+                    .where(Job.type == job_type, Job.created_at >= since)
+                    .limit(1)
+                ).first()
+                if recent is None:
+                    job = submit_job(db, job_type, {})
+                    logger.info(f"Queued scheduled {job_type} job {job.id}")
+                    queued += 1
+        return queued
+
+    def purge_finished(self) -> int:
+        """Delete jobs that finished more than ``retention_days`` ago, with
+        their files."""
+        cutoff = utcnow() - timedelta(days=self.retention_days)
+        with self.session() as db:
+            ids = db.execute(
+                delete(Job)
+                .where(Job.status.in_(FINISHED), Job.finished_at < cutoff)
+                .returning(Job.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+            db.commit()
+        for id in ids:
+            for path in glob.glob(os.path.join(self.directory, f"{id}.*")):
+                self._discard(path)
+        return len(ids)
+
+    @staticmethod
+    def _discard(path: Optional[str]) -> None:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+def submit_job(db: Session, job_type: str, params: dict, id: Optional[str] = None) -> Job:
+    # Set here rather than by the database, whose clock may only have
+    # second resolution, so jobs are claimed in submission order.
+    job = Job(
+        id=id or new_job_id(),
+        type=job_type,
+        status=QUEUED,
+        params=params,
+        created_at=utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def cancel_job(db: Session, job: Job) -> Job:
+    """Cancel a queued job at once; ask a running one to stop at its next
+    progress report."""
+    if job.status == QUEUED:
+        db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == QUEUED)
+            .values(status=CANCELLED, finished_at=utcnow())
+            .execution_options(synchronize_session=False)
+        )
+    if job.status in (QUEUED, RUNNING):
+        # Also covers a job claimed between the read and the update above.
+        db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == RUNNING)
+            .values(cancel_requested=True)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    db.refresh(job)
+    return job
@@ -0,0 +1,72 @@
+from typing import Callable, Optional, Sequence, TypeVar
+
+from fastapi import Query as QueryParam
+from fastapi_pagination import Page, Params
+from fastapi_pagination.customization import CustomizedPage, UseName, UseOptionalFields
+from pydantic import BaseModel
+from sqlalchemy.orm import Query, Session
+
+from app.core.cache import count_cache, make_cache_key
+from app.db.counts import approximate_count, exact_count
+
+T = TypeVar("T")
+
+# ``total`` and ``pages`` are null when the total was not requested.
+ListPage = CustomizedPage[Page[T], UseName("ListPage"), UseOptionalFields()]
+
+
+class TotalParams(BaseModel):
+    include_total: bool = QueryParam(
+        True, description="Count the matching rows; false skips the COUNT query"
+    )
+    approximate_total: bool = QueryParam(
+        False,
+        description="Estimate the total of an unfiltered listing from the database statistics",
+    )
+
+
+def listing_total(
+    db: Session,
+    query: Query,
+    total_params: TotalParams,
+    table: str,
+    version: int,
+    filters: Sequence = (),
+) -> Optional[int]:
+    """Total for a listing of ``table`` filtered by ``filters``.
+
+    Exact totals are cached under the table version, which every write
+    bumps, so pages of the same result set share one ``COUNT(*)``.
+    """
+    if not total_params.include_total:
+        return None
+
+    if total_params.approximate_total and all(f is None for f in filters):
+        estimate = approximate_count(db, table)
+        if estimate is not None:
+            return estimate
+
+    key = make_cache_key(table, version, *filters)
+    if count_cache.enabled:
+        cached = count_cache.get(key)
+        if cached is not None:
+            return int(cached)
+
+    total = exact_count(query)
+    if count_cache.enabled:
+        count_cache.set(key, str(total))
+    return total
+
+
+def paginate_listing(
+    query: Query,
+    params: Params,
+    total: Optional[int],
+    transformer: Optional[Callable[[list], list]] = None,
+) -> ListPage:
+    """Read one page of ``query``; the total is computed by the caller."""
+    raw_params = params.to_raw_params()
+    items = query.limit(raw_params.limit).offset(raw_params.offset).all()
+    if transformer is not None:
+        items = transformer(items)
+    return ListPage.create(items, params, total=total)
@@ -0,0 +1,119 @@
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import Select, Subquery, delete, func, insert, select, union_all
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.logger import logger
+from app.db.versions import VEHICLES, bump_version
+from app.models.change import ARCHIVED, VEHICLE
+from app.models.vehicle import Vehicle
+from app.models.vehicle_archive import VehicleArchive
+from app.services.change_feed import log_changes
+
+# Columns of vehicles, all of which the archive has too.
+SHARED_COLUMNS = tuple(column.name for column in Vehicle.__table__.c)
+
+
+def shared_columns(model) -> tuple:
+    return tuple(model.__table__.c[name] for name in SHARED_COLUMNS)
+
+
+def reads_archive(is_sold: Optional[bool], include_archived: bool) -> bool:
+    """Whether a read filtered on ``is_sold`` needs the archive: archived
+    vehicles are all sold, so asking for sold vehicles includes them and
+    asking for unsold ones never does."""
+    return is_sold is True or (include_archived and is_sold is None)
+
+
+def with_archive(hot: Select, cold: Select, limit: Optional[int] = None) -> Subquery:
+    """The rows of ``hot``, a select on vehicles, and ``cold``, the same
+    select on the archive, as one subquery.
+
+    With ``limit``, each side is first cut to its first ``limit`` rows in
+    listing order. A page ending at row ``limit`` can only contain those,
+    and each table is then read in order through its listing index instead
+    of both being sorted together.
+    """
+    parts = [hot, cold]
+    if limit is not None:
+        parts = [
+            select(statement.order_by(model.created_at, model.id).limit(limit).subquery())
+            for statement, model in ((hot, Vehicle), (cold, VehicleArchive))
+        ]
+    return union_all(*parts).subquery("vehicles")
+
+
+def archivable(cutoff: datetime) -> tuple:
+    """Criteria of the vehicles due for the archive: sold and unchanged
+    since ``cutoff``.
+
+    Archived ids are never handed out again: vehicles is declared
+    ``AUTOINCREMENT`` on SQLite and uses a sequence on Postgres.
+    """
+    return (Vehicle.is_sold.is_(True), Vehicle.updated_at < cutoff)
+
+
+def count_archivable(db: Session, cutoff: datetime) -> int:
+    return db.execute(select(func.count()).where(*archivable(cutoff))).scalar()
+
+
+def archive_chunk(db: Session, cutoff: datetime, size: int) -> int:
+    """Move up to ``size`` vehicles due for the archive into it and return
+    how many moved.
+
+    The rows are copied with ``INSERT ... SELECT`` and deleted in the same
+    transaction, which also logs them as archived. vehicle_stats counts
+    archived vehicles as well, so it is left alone.
+    """
+    candidates = select(Vehicle.id).where(*archivable(cutoff)).order_by(Vehicle.id).limit(size)
+    if db.get_bind().dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+    ids = db.execute(candidates).scalars().all()
+    if not ids:
+        return 0
+    # The criteria are checked again: on SQLite the candidates were read
+    # before the write transaction began.
+    criteria = (Vehicle.id.in_(ids), *archivable(cutoff))
+    db.execute(
+        insert(VehicleArchive).from_select(
+            SHARED_COLUMNS, select(*shared_columns(Vehicle)).where(*criteria)
+        )
+    )
+    moved = db.execute(
+        delete(Vehicle)
+        .where(*criteria)
+        .returning(Vehicle.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    log_changes(db, VEHICLE, ARCHIVED, moved)
+    return len(moved)
+
+
+def archive_sold_vehicles(
+    bind: Engine,
+    cutoff: datetime,
+    chunk_size: int,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Archive every sold vehicle unchanged since ``cutoff``, a chunk per
+    transaction, and return how many moved.
+
+    Runs as a job. ``progress`` is called with the vehicles archived so far
+    after each chunk.
+    """
+    archived = 0
+    while True:
+        with Session(bind) as db:
+            count = archive_chunk(db, cutoff, chunk_size)
+            if count:
+                bump_version(db, VEHICLES)
+            db.commit()
+        archived += count
+        if count < chunk_size:
+            break
+        if progress is not None:
+            progress(archived)
+    logger.info(f"Archived {archived} sold vehicles last changed before {cutoff}")
+    return archived
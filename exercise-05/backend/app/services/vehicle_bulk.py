@@ -0,0 +1,152 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.brand import Brand
+from app.models.vehicle import Vehicle
+from app.models.vehicle_archive import VehicleArchive
+from app.schemas.vehicle import (
+    BulkItemResult,
+    BulkResponse,
+    VehicleBulkPatch,
+    VehicleCreate,
+)
+from app.services.vehicle_stats import StatsDelta, new_vehicle_state
+
+
+STATE_COLUMNS = (
+    Vehicle.id,
+    Vehicle.brand_id,
+    Vehicle.year,
+    Vehicle.is_sold,
+    Vehicle.created_at,
+)
+
+
+def chunked(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def existing_ids(db: Session, column, ids: Iterable[int], batch_size: int) -> Set[int]:
+    """Return which of ``ids`` exist, using one ``IN`` query per batch."""
+    unique_ids = list(set(ids))
+    found: Set[int] = set()
+    for batch in chunked(unique_ids, batch_size):
+        found.update(db.execute(select(column).where(column.in_(batch))).scalars())
+    return found
+
+
+def load_states(db: Session, ids: Iterable[int], batch_size: int) -> Dict[int, dict]:
+    """Return the stats-relevant columns of the existing vehicles in ``ids``."""
+    states: Dict[int, dict] = {}
+    for batch in chunked(list(set(ids)), batch_size):
+        rows = db.execute(
+            select(*STATE_COLUMNS).where(Vehicle.id.in_(batch))
+        )
+        for row in rows:
+            state = row._asdict()
+            states[state.pop("id")] = state
+    return states
+
+
+def bulk_create_vehicles(
+    db: Session, items: List[VehicleCreate], batch_size: int
+) -> List[BulkItemResult]:
+    brand_ids = existing_ids(db, Brand.id, (i.brand_id for i in items), batch_size)
+    results: List[Optional[BulkItemResult]] = [None] * len(items)
+    rows, indexes = [], []
+    for index, item in enumerate(items):
+        if item.brand_id not in brand_ids:
+            results[index] = _error(index, None, "Brand not found")
+        else:
+            rows.append(item.model_dump())
+            indexes.append(index)
+
+    statement = insert(Vehicle).returning(Vehicle.id, sort_by_parameter_order=True)
+    for row_batch, index_batch in zip(
+        chunked(rows, batch_size), chunked(indexes, batch_size)
+    ):
+        ids = db.execute(statement, row_batch).scalars().all()
+        for index, id in zip(index_batch, ids):
+            results[index] = BulkItemResult(index=index, id=id, status="created")
+
+    delta = StatsDelta()
+    for row in rows:
+        delta.add(new_vehicle_state(row))
+    delta.apply(db)
+    return results
+
+
+def bulk_patch_vehicles(
+    db: Session, items: List[VehicleBulkPatch], batch_size: int
+) -> List[BulkItemResult]:
+    states = load_states(db, (i.id for i in items), batch_size)
+    archived = existing_ids(
+        db, VehicleArchive.id, (i.id for i in items if i.id not in states), batch_size
+    )
+    brand_ids = existing_ids(
+        db, Brand.id, (i.brand_id for i in items if i.brand_id is not None), batch_size
+    )
+    results: List[BulkItemResult] = []
+    rows = []
+    delta = StatsDelta()
+    for index, item in enumerate(items):
+        if item.id in archived:
+            results.append(_error(index, item.id, "Archived vehicles cannot be modified"))
+            continue
+        if item.id not in states:
+            results.append(_error(index, item.id, "Vehicle not found"))
+            continue
+        if item.brand_id is not None and item.brand_id not in brand_ids:
+            results.append(_error(index, item.id, "Brand not found"))
+            continue
+        values = item.model_dump(exclude_unset=True, exclude={"id"})
+        if values:
+            rows.append({"id": item.id, **values})
+            before = states[item.id]
+            states[item.id] = {**before, **values}
+            delta.change(before, states[item.id])
+        results.append(BulkItemResult(index=index, id=item.id, status="updated"))
+
+    for row_batch in chunked(rows, batch_size):
+        db.execute(update(Vehicle), row_batch)
+    delta.apply(db)
+    return results
+
+
+def bulk_delete_vehicles(
+    db: Session, ids: List[int], batch_size: int
+) -> List[BulkItemResult]:
+    deleted: Set[int] = set()
+    delta = StatsDelta()
+    # Vehicles not in the hot table may have been archived.
+    for model in (Vehicle, VehicleArchive):
+        columns = [getattr(model, column.key) for column in STATE_COLUMNS]
+        for batch in chunked(list(set(ids) - deleted), batch_size):
+            rows = db.execute(
+                delete(model).where(model.id.in_(batch)).returning(*columns)
+            )
+            for row in rows:
+                state = row._asdict()
+                deleted.add(state.pop("id"))
+                delta.remove(state)
+    delta.apply(db)
+    return [
+        BulkItemResult(index=index, id=id, status="deleted")
+        if id in deleted
+        else _error(index, id, "Vehicle not found")
+        for index, id in enumerate(ids)
+    ]
+
+
+def to_bulk_response(results: List[BulkItemResult]) -> BulkResponse:
+    failed = sum(1 for r in results if r.status == "error")
+    return BulkResponse(
+        succeeded=len(results) - failed, failed=failed, results=results
+    )
+
+
+def _error(index: int, id: Optional[int], detail: str) -> BulkItemResult:
+    return BulkItemResult(index=index, id=id, status="error", detail=detail)
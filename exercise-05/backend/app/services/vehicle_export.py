@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import Select, select
+from sqlalchemy.engine import Engine
+
+from app.core.logger import logger
+from app.models.brand import Brand
+from app.models.vehicle import Vehicle
+
+EXPORT_COLUMNS = [
+    "id",
+    "model",
+    "brand_id",
+    "brand_name",
+    "color",
+    "year",
+    "description",
+    "is_sold",
+    "created_at",
+    "updated_at",
+]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_statement(model=Vehicle) -> Select:
+    """Export rows of ``model``, vehicles or the archive, in listing order.
+    Vehicles without a brand are kept, with an empty brand like in the
+    listing."""
+    return (
+        select(
+            model.id,
+            model.model,
+            model.brand_id,
+            Brand.name.label("brand_name"),
+            model.color,
+            model.year,
+            model.description,
+            model.is_sold,
+            model.created_at,
+            model.updated_at,
+        )
+        .outerjoin(Brand, Brand.id == model.brand_id)
+        .order_by(model.created_at, model.id)
+    )
+
+
+def _to_ndjson(rows) -> str:
+    lines = []
+    for row in rows:
+        item = row._asdict()
+        brand_name = item.pop("brand_name")
+        item["brand"] = (
+            None if item["brand_id"] is None else {"id": item["brand_id"], "name": brand_name}
+        )
+        lines.append(json.dumps(item, default=_isoformat))
+    return "\n".join(lines) + "\n"
+
+
+def _to_csv(rows, header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(
+        [_isoformat(value) if hasattr(value, "isoformat") else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def stream_export(
+    bind: Engine,
+    statement: Select,
+    export_format: str,
+    yield_per: int,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Iterator[str]:
+    """Yield the export in chunks of ``yield_per`` rows.
+
+    Rows are fetched through a server-side cursor on its own connection, so
+    memory stays flat regardless of table size and the request session can be
+    closed while the response is still streaming. ``progress`` is called
+    with the rows exported so far after each chunk.
+    """
+    exported = 0
+    with bind.connect() as conn:
+        result = conn.execution_options(
+            stream_results=True, yield_per=yield_per
+        ).execute(statement)
+        if export_format == "csv":
+            yield _to_csv([], header=True)
+        for rows in result.partitions():
+            exported += len(rows)
+            if export_format == "csv":
+                yield _to_csv(rows, header=False)
+            else:
+                yield _to_ndjson(rows)
+            if progress is not None:
+                progress(exported)
+    logger.info(f"Exported {exported} vehicles as {export_format}")
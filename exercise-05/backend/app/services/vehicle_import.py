@@ -0,0 +1,287 @@
+import csv
+import io
+import json
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NotRequired,
+    Optional,
+    TextIO,
+    Tuple,
+    TypedDict,
+)
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.db.versions import VEHICLES, bump_version
+from app.models.brand import Brand
+from app.models.change import CREATED, VEHICLE
+from app.models.vehicle import Vehicle
+from app.schemas.vehicle import ImportResult, ImportRowError, VehicleCreate
+from app.services.change_feed import log_changes
+from app.services.vehicle_bulk import existing_ids
+from app.services.vehicle_stats import StatsDelta, new_vehicle_state
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+COLUMNS = ["model", "brand_id", "color", "year", "description", "is_sold"]
+
+
+class VehicleRow(TypedDict):
+    """Same fields and coercion rules as ``VehicleCreate``, validated into
+    plain dicts so a whole chunk is checked in one call."""
+
+    model: str
+    brand_id: int
+    color: str
+    year: int
+    description: NotRequired[Optional[str]]
+    is_sold: NotRequired[Optional[bool]]
+
+
+chunk_adapter = TypeAdapter(List[VehicleRow])
+
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+def detect_format(filename: str) -> Optional[str]:
+    for extension, import_format in FORMATS.items():
+        if filename.lower().endswith(extension):
+            return import_format
+    return None
+
+
+def iter_records(stream: TextIO, import_format: str) -> Iterator[Record]:
+    """Yield ``(row number, record, parse error)`` without reading the whole
+    stream into memory."""
+    if import_format == "csv":
+        for row, record in enumerate(csv.DictReader(stream), start=1):
+            # Empty cells fall back to the schema defaults.
+            yield row, {k: v for k, v in record.items() if v != ""}, None
+        return
+
+    row = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield row, None, "Expected a JSON object"
+            continue
+        yield row, record, None
+
+
+class VehicleImporter:
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: int,
+        progress: Optional[Callable[[int], None]] = None,
+    ):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[ImportRowError] = []
+        self._brand_names: Dict[str, int] = {}
+        self._use_copy = db.get_bind().dialect.name == "postgresql"
+
+    def run(self, stream: TextIO, import_format: str) -> ImportResult:
+        started = time.perf_counter()
+        chunk: List[Record] = []
+        for record in iter_records(stream, import_format):
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+                if self.progress is not None:
+                    self.progress(self.rows)
+        if chunk:
+            self._import_chunk(chunk)
+
+        seconds = time.perf_counter() - started
+        result = ImportResult(
+            format=import_format,
+            rows=self.rows,
+            imported=self.imported,
+            failed=self.failed,
+            seconds=round(seconds, 3),
+            rows_per_second=round(self.rows / seconds, 1) if seconds else 0.0,
+            errors=self.errors,
+        )
+        logger.info(
+            f"Imported {result.imported}/{result.rows} vehicles "
+            f"({result.rows_per_second} rows/s, {result.failed} failed)"
+        )
+        return result
+
+    def _import_chunk(self, chunk: List[Record]) -> None:
+        self.rows += len(chunk)
+        parsed = []
+        for row, record, error in chunk:
+            if error is not None:
+                self._fail(row, error)
+            else:
+                parsed.append((row, record))
+
+        parsed = self._resolve_brands(parsed)
+        valid = self._validate(parsed)
+        if not valid:
+            return
+        try:
+            rows = [values for _, values in valid]
+            ids = self._insert(rows)
+            delta = StatsDelta()
+            for values in rows:
+                delta.add(new_vehicle_state(values))
+            delta.apply(self.db)
+            bump_version(self.db, VEHICLES)
+            log_changes(self.db, VEHICLE, CREATED, ids)
+            self.db.commit()
+            self.imported += len(valid)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Failed to import chunk: {str(e)}")
+            for row, _ in valid:
+                self._fail(row, f"Database error: {str(e)}")
+
+    def _resolve_brands(self, parsed: List[Tuple[int, dict]]) -> List[Tuple[int, dict]]:
+        """Turn ``brand_name`` columns into ids with one query per chunk and
+        drop rows whose brand does not exist."""
+        missing = {
+            record["brand_name"].lower()
+            for _, record in parsed
+            if "brand_id" not in record and record.get("brand_name")
+        } - self._brand_names.keys()
+        if missing:
+            rows = self.db.execute(
+                select(Brand.id, func.lower(Brand.name)).where(
+                    func.lower(Brand.name).in_(missing)
+                )
+            )
+            self._brand_names.update({name: id for id, name in rows})
+
+        resolved = []
+        for row, record in parsed:
+            if "brand_id" not in record and record.get("brand_name"):
+                brand_id = self._brand_names.get(record["brand_name"].lower())
+                if brand_id is None:
+                    self._fail(row, f"Brand '{record['brand_name']}' not found")
+                    continue
+                record["brand_id"] = brand_id
+            resolved.append((row, record))
+
+        given_ids = []
+        for _, record in resolved:
+            try:
+                given_ids.append(int(record["brand_id"]))
+            except (KeyError, TypeError, ValueError):
+                pass
+        known = existing_ids(self.db, Brand.id, given_ids, self.chunk_size)
+        valid = []
+        for row, record in resolved:
+            try:
+                brand_id = int(record["brand_id"])
+            except (KeyError, TypeError, ValueError):
+                # Left for schema validation to report.
+                valid.append((row, record))
+                continue
+            if brand_id not in known:
+                self._fail(row, "Brand not found")
+            else:
+                valid.append((row, record))
+        return valid
+
+    def _validate(self, parsed: List[Tuple[int, dict]]) -> List[Tuple[int, dict]]:
+        try:
+            rows = chunk_adapter.validate_python([record for _, record in parsed])
+            return [
+                (row, _with_defaults(values))
+                for (row, _), values in zip(parsed, rows)
+            ]
+        except ValidationError:
+            pass
+
+        # Slow path: validate row by row to report each failure.
+        valid = []
+        for row, record in parsed:
+            try:
+                vehicle = VehicleCreate.model_validate(record)
+            except ValidationError as e:
+                self._fail(row, _describe(e))
+                continue
+            valid.append((row, vehicle.model_dump()))
+        return valid
+
+    def _insert(self, rows: List[dict]) -> List[int]:
+        """Insert ``rows`` and return their ids in order."""
+        if self._use_copy:
+            return self._copy(rows)
+        return self.db.execute(
+            insert(Vehicle).returning(Vehicle.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+
+    def _copy(self, rows: List[dict]) -> List[int]:
+        # COPY cannot return the ids, so they are drawn from the sequence
+        # first and copied in with the rows.
+        ids = self.db.execute(
+            text(
+                "SELECT nextval(pg_get_serial_sequence('vehicles', 'id')) "
+                "FROM generate_series(1, :n)"
+            ),
+            {"n": len(rows)},
+        ).scalars().all()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows([id, *(row[c] for c in COLUMNS)] for id, row in zip(ids, rows))
+        buffer.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        cursor.copy_expert(
+            f"COPY vehicles (id, {', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+        return ids
+
+    def _fail(self, row: int, detail: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append(ImportRowError(row=row, detail=detail))
+
+
+def _with_defaults(values: dict) -> dict:
+    values.setdefault("description", None)
+    values.setdefault("is_sold", False)
+    return values
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+def import_vehicles(
+    db: Session,
+    stream: TextIO,
+    import_format: str,
+    chunk_size: int,
+    progress: Optional[Callable[[int], None]] = None,
+) -> ImportResult:
+    """Import the stream chunk by chunk; ``progress`` is called with the
+    rows read so far after each committed chunk."""
+    return VehicleImporter(db, chunk_size, progress).run(stream, import_format)
@@ -0,0 +1,34 @@
+import re
+from typing import List
+
+from sqlalchemy import Select, column, func, literal_column, select, table
+from sqlalchemy.orm import Session
+
+from app.db.search import search_vector
+from app.models.vehicle import Vehicle
+from app.services.vehicle_archive import shared_columns
+
+
+def search_terms(q: str) -> List[str]:
+    return re.findall(r"\w+", q.lower())
+
+
+def search_statement(db: Session, terms: List[str], model=Vehicle) -> Select:
+    """Rows of ``model`` whose model or description contain every term as a
+    prefix, with a ``rank`` column that sorts better matches first."""
+    name = model.__tablename__
+    if db.get_bind().dialect.name == "postgresql":
+        vector = literal_column(search_vector(name))
+        tsquery = func.to_tsquery("simple", " & ".join(f"{t}:*" for t in terms))
+        return select(
+            *shared_columns(model), (-func.ts_rank_cd(vector, tsquery)).label("rank")
+        ).where(vector.op("@@")(tsquery))
+
+    fts = table(f"{name}_fts", column("rowid"), column("rank"))
+    match = " ".join(f'"{t}"*' for t in terms)
+    return (
+        select(*shared_columns(model), fts.c.rank.label("rank"))
+        .join(fts, fts.c.rowid == model.id)
+        .where(literal_column(f"{name}_fts").match(match))
+    )
+
@@ -0,0 +1,153 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.logger import logger
+from app.models.stats import VehicleStat
+from app.models.vehicle import Vehicle
+from app.models.vehicle_archive import VehicleArchive
+
+BRAND = "brand"
+DECADE = "decade"
+DAY = "day"
+SOLD = "sold"
+
+VehicleState = Dict[str, object]
+
+
+def vehicle_state(vehicle: Vehicle) -> VehicleState:
+    return {
+        "brand_id": vehicle.brand_id,
+        "year": vehicle.year,
+        "is_sold": vehicle.is_sold,
+        "created_at": vehicle.created_at,
+    }
+
+
+def new_vehicle_state(values: dict) -> VehicleState:
+    """State of a vehicle that is about to be inserted; ``created_at`` is
+    assigned by the database, so today's date stands in for it."""
+    return {
+        "brand_id": values["brand_id"],
+        "year": values["year"],
+        "is_sold": values.get("is_sold"),
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def _keys(state: VehicleState) -> List[tuple]:
+    keys = [(SOLD, str(bool(state["is_sold"])).lower())]
+    if state["brand_id"] is not None:
+        keys.append((BRAND, str(state["brand_id"])))
+    if state["year"] is not None:
+        keys.append((DECADE, str(state["year"] // 10 * 10)))
+    if state["created_at"] is not None:
+        keys.append((DAY, state["created_at"].date().isoformat()))
+    return keys
+
+
+class StatsDelta:
+    """Counter changes collected during a request and written in the same
+    transaction as the vehicle rows they describe."""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+
+    def add(self, state: Optional[VehicleState]) -> None:
+        if state is not None:
+            self.counts.update(_keys(state))
+
+    def remove(self, state: Optional[VehicleState]) -> None:
+        if state is not None:
+            self.counts.subtract(_keys(state))
+
+    def change(self, before: Optional[VehicleState], after: Optional[VehicleState]) -> None:
+        self.remove(before)
+        self.add(after)
+
+    def apply(self, db: Session) -> None:
+        rows = [
+            {"dimension": dimension, "key": key, "count": count}
+            for (dimension, key), count in self.counts.items()
+            if count
+        ]
+        if not rows:
+            return
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(VehicleStat)
+        statement = statement.on_conflict_do_update(
+            index_elements=[VehicleStat.dimension, VehicleStat.key],
+            set_={"count": VehicleStat.count + statement.excluded.count},
+        )
+        db.execute(statement, rows)
+        self.counts.clear()
+
+
+def record_change(
+    db: Session, before: Optional[VehicleState], after: Optional[VehicleState]
+) -> None:
+    delta = StatsDelta()
+    delta.change(before, after)
+    delta.apply(db)
+
+
+def aggregate(db: Session, *criteria, model=Vehicle) -> Counter:
+    """Count rows of ``model``, vehicles or the archive, matching
+    ``criteria`` per group with GROUP BY queries."""
+    groups = {
+        BRAND: model.brand_id,
+        SOLD: func.coalesce(model.is_sold, False),
+        DECADE: model.year // 10 * 10,
+        DAY: func.date(model.created_at),
+    }
+    counts: Counter = Counter()
+    for dimension, column in groups.items():
+        rows = db.execute(
+            select(column, func.count())
+            .where(column.is_not(None), *criteria)
+            .group_by(column)
+        )
+        for key, count in rows:
+            if dimension == SOLD:
+                key = str(bool(key)).lower()
+            counts[(dimension, str(key))] = count
+    return counts
+
+
+def rebuild_stats(db: Session) -> int:
+    """Recompute every counter from the vehicles and archive tables."""
+    counts = aggregate(db) + aggregate(db, model=VehicleArchive)
+    db.execute(delete(VehicleStat))
+    delta = StatsDelta()
+    delta.counts.update(counts)
+    delta.apply(db)
+    db.commit()
+    logger.info(f"Vehicle stats rebuilt with {len(counts)} groups")
+    return len(counts)
+
+
+def get_counts(db: Session, dimension: str) -> Dict[str, int]:
+    rows = db.execute(
+        select(VehicleStat.key, VehicleStat.count).where(
+            VehicleStat.dimension == dimension, VehicleStat.count > 0
+        )
+    )
+    return dict(rows.all())
+
+
+def count_recent(db: Session, days: int) -> Dict[str, int]:
+    since = (datetime.now(timezone.utc).date() - timedelta(days=days - 1)).isoformat()
+    rows = db.execute(
+        select(VehicleStat.key, VehicleStat.count)
+        .where(
+            VehicleStat.dimension == DAY,
+            VehicleStat.key >= since,
+            VehicleStat.count > 0,
+        )
+        .order_by(VehicleStat.key)
+    )
+    return dict(rows.all())
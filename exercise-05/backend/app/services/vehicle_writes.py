@@ -0,0 +1,76 @@
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.models.vehicle import Vehicle
+from app.models.vehicle_archive import VehicleArchive
+from app.services.vehicle_bulk import STATE_COLUMNS
+from app.services.vehicle_stats import record_change
+
+# Columns whose change moves a vehicle between vehicle_stats groups;
+# created_at never changes after the insert.
+STATS_FIELDS = {"brand_id", "year", "is_sold"}
+
+VEHICLE_COLUMNS = tuple(Vehicle.__table__.c)
+
+
+def update_vehicle_row(db: Session, id: int, values: dict) -> Optional[Row]:
+    """Apply ``values`` to vehicle ``id`` with one ``UPDATE ... RETURNING``
+    and return the updated row, or ``None`` when there is no such vehicle.
+
+    When a stats column changes, the old values are needed as well. Postgres
+    returns them from the same statement through a self-join on the locked
+    row; SQLite cannot return joined columns, so it reads them by primary
+    key first, which costs no network round trip there.
+    """
+    statement = update(Vehicle).values(**values).execution_options(synchronize_session=False)
+    if not STATS_FIELDS & values.keys():
+        return db.execute(
+            statement.where(Vehicle.id == id).returning(*VEHICLE_COLUMNS)
+        ).first()
+
+    if db.get_bind().dialect.name == "postgresql":
+        old = select(*STATE_COLUMNS).where(Vehicle.id == id).with_for_update().subquery("old")
+        row = db.execute(
+            statement.where(Vehicle.id == old.c.id).returning(
+                *VEHICLE_COLUMNS,
+                *(old.c[name].label(f"old_{name}") for name in STATS_FIELDS),
+            )
+        ).first()
+        if row is None:
+            return None
+        before = {name: getattr(row, f"old_{name}") for name in STATS_FIELDS}
+    else:
+        before = db.execute(select(*STATE_COLUMNS).where(Vehicle.id == id)).first()
+        if before is None:
+            return None
+        before = before._asdict()
+        row = db.execute(statement.where(Vehicle.id == id).returning(*VEHICLE_COLUMNS)).first()
+
+    before["created_at"] = row.created_at
+    after = {name: getattr(row, name) for name in (*STATS_FIELDS, "created_at")}
+    record_change(db, before, after)
+    return row
+
+
+def delete_vehicle_row(db: Session, id: int) -> bool:
+    """Delete vehicle ``id`` with one ``DELETE ... RETURNING``; the returned
+    columns are what vehicle_stats needs to forget it. A vehicle that is
+    not in the hot table may have been archived and is deleted from there."""
+    for model in (Vehicle, VehicleArchive):
+        row = db.execute(
+            delete(model)
+            .where(model.id == id)
+            .returning(*(getattr(model, column.key) for column in STATE_COLUMNS))
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row is not None:
+            break
+    else:
+        return False
+    state = row._asdict()
+    state.pop("id")
+    record_change(db, state, None)
+    return True
@@ -5,15 +5,26 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
-from app.db.database import get_db, Base
+from app.core.cache import count_cache, vehicle_cache
+from app.core.config import settings
+from app.db.database import get_db, get_read_db, Base
+from app.db.constraints import enable_foreign_keys
+from app.db.instrumentation import instrument_engine
+from app.db.journal import enable_wal
 from app.models.brand import Brand
 from app.models.vehicle import Vehicle
+from app.services.brand_registry import brand_registry
+from app.services.job_handlers import JOB_TYPES
+from app.services.jobs import JobRunner
 
 # Test database setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
+instrument_engine(engine)
+enable_foreign_keys(engine)
+enable_wal(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -26,6 +37,7 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 client = TestClient(app)
 
 
@@ -33,6 +45,9 @@ client = TestClient(app)
 def db_session():
     """Create a fresh database for each test"""
     Base.metadata.create_all(bind=engine)
+    brand_registry.clear()
+    vehicle_cache.clear()
+    count_cache.clear()
     db = TestingSessionLocal()
     try:
         yield db
@@ -41,6 +56,14 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def job_runner(db_session, tmp_path, monkeypatch):
+    """Job runner on the test database; tests run queued jobs with
+    ``run_next()`` instead of starting its threads."""
+    monkeypatch.setattr(settings, "JOBS_DIR", str(tmp_path))
+    return JobRunner(TestingSessionLocal, JOB_TYPES, settings.JOBS_CONCURRENCY, 1, str(tmp_path))
+
+
 @pytest.fixture
 def sample_brand(db_session):
     """Create a sample brand for testing"""
@@ -104,6 +127,7 @@ def multiple_vehicles(db_session, sample_brand):
 def cleanup_test_db():
     """Clean up test database after all tests"""
     yield  # Run all tests first
-    db_path = "./test.db"
-    if os.path.exists(db_path):
-        os.remove(db_path)
\ No newline at end of file
+    engine.dispose()
+    for db_path in ("./test.db", "./test.db-wal", "./test.db-shm"):
+        if os.path.exists(db_path):
+            os.remove(db_path)
\ No newline at end of file
@@ -0,0 +1,207 @@
+import asyncio
+import threading
+
+import httpx
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.responses import PlainTextResponse
+
+from app.core.admission import QUEUE_FULL, TIMEOUT, AdmissionController
+from app.core.metrics import admission_queue_depth, admission_rejections, registry
+from app.core.middleware import AdmissionMiddleware, RateLimitMiddleware
+from app.core.rate_limit import MemoryRateLimitBackend, SQLiteRateLimitBackend, refill
+from app.main import app
+
+
+def blocking_app(release: asyncio.Event):
+    """ASGI app whose GETs wait for ``release``; other methods answer at once."""
+
+    async def app(scope, receive, send):
+        if scope["method"] == "GET":
+            await release.wait()
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    return app
+
+
+def http_client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def wait_until(condition):
+    while not condition():
+        await asyncio.sleep(0.001)
+
+
+class TestAdmissionMiddleware:
+    def test_sheds_requests_beyond_the_queue(self):
+        """Test one request runs, one waits and the next is rejected at once"""
+        registry.clear()
+        controller = AdmissionController(1, 1, queue_size=1, timeout=5.0)
+
+        async def run():
+            release = asyncio.Event()
+            app = AdmissionMiddleware(blocking_app(release), controller, retry_after=3)
+            async with http_client(app) as http:
+                first = asyncio.create_task(http.get("/a"))
+                second = asyncio.create_task(http.get("/a"))
+                await wait_until(lambda: controller.read.queued == 1)
+                assert admission_queue_depth.snapshot() == {"read": 1}
+                third = await http.get("/a")
+                release.set()
+                return await first, await second, third
+
+        first, second, third = asyncio.run(run())
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert third.status_code == 503
+        assert third.headers["Retry-After"] == "3"
+        assert admission_rejections.snapshot() == {f"read\0{QUEUE_FULL}": 1}
+        assert controller.read.active == 0
+        assert admission_queue_depth.snapshot() == {"read": 0}
+
+    def test_queued_request_times_out(self):
+        """Test a request that waits longer than the deadline gets a 503"""
+        registry.clear()
+        controller = AdmissionController(1, 1, queue_size=1, timeout=0.05)
+
+        async def run():
+            release = asyncio.Event()
+            app = AdmissionMiddleware(blocking_app(release), controller)
+            async with http_client(app) as http:
+                first = asyncio.create_task(http.get("/a"))
+                await wait_until(lambda: controller.read.active == 1)
+                second = await http.get("/a")
+                release.set()
+                return await first, second
+
+        first, second = asyncio.run(run())
+
+        assert first.status_code == 200
+        assert second.status_code == 503
+        assert admission_rejections.snapshot() == {f"read\0{TIMEOUT}": 1}
+        assert controller.read.active == 0
+
+    def test_writes_have_their_own_limit(self):
+        """Test saturated reads do not hold up writes"""
+        controller = AdmissionController(1, 1, queue_size=0, timeout=5.0)
+
+        async def run():
+            release = asyncio.Event()
+            app = AdmissionMiddleware(blocking_app(release), controller)
+            async with http_client(app) as http:
+                read = asyncio.create_task(http.get("/a"))
+                await wait_until(lambda: controller.read.active == 1)
+                write = await http.post("/a")
+                release.set()
+                return await read, write
+
+        read, write = asyncio.run(run())
+
+        assert read.status_code == 200
+        assert write.status_code == 200
+
+
+class TestAdmissionController:
+    def test_route_limits_and_exempt_paths(self):
+        """Test the longest matching route wins and exempt paths are not limited"""
+        controller = AdmissionController(
+            4,
+            2,
+            queue_size=8,
+            timeout=1.0,
+            route_limits={"/api/vehicles": 3, "POST /api/vehicles/import": 1},
+            exempt=["/metrics"],
+        )
+
+        assert controller.limit_for("POST", "/api/vehicles/import").limit == 1
+        assert controller.limit_for("GET", "/api/vehicles/import").limit == 3
+        assert controller.limit_for("GET", "/api/brands/") is controller.read
+        assert controller.limit_for("DELETE", "/api/brands/1") is controller.write
+        assert controller.limit_for("GET", "/metrics") is None
+
+
+class TestRateLimit:
+    def test_refill(self):
+        """Test a bucket refills at the rate and never beyond the burst"""
+        assert refill(0.0, 0.5, rate=2.0, burst=5) == (0.0, 0.0)
+        assert refill(0.0, 100.0, rate=2.0, burst=5) == (4.0, 0.0)
+        assert refill(0.5, 0.0, rate=2.0, burst=5) == (0.5, 0.25)
+
+    def test_middleware_rejects_after_burst(self):
+        """Test a client gets 429 once its burst is used, others are unaffected"""
+        backend = MemoryRateLimitBackend(rate=0.01, burst=2, max_keys=100)
+        app = RateLimitMiddleware(blocking_app(asyncio.Event()), backend, "X-API-Key")
+
+        async def run():
+            async with http_client(app) as http:
+                first = [await http.post("/a", headers={"X-API-Key": "a"}) for _ in range(3)]
+                other = await http.post("/a", headers={"X-API-Key": "b"})
+                return first, other
+
+        first, other = asyncio.run(run())
+
+        assert [r.status_code for r in first] == [200, 200, 429]
+        assert first[2].headers["Retry-After"] == "100"
+        assert other.status_code == 200
+
+    def test_rejections_carry_cors_headers(self):
+        """Test CORS wraps the rate limiter so browsers can read a 429 and
+        its Retry-After"""
+        cors = app.user_middleware[0]
+        assert cors.cls is CORSMiddleware
+        backend = MemoryRateLimitBackend(rate=0.01, burst=1, max_keys=100)
+        stack = CORSMiddleware(
+            RateLimitMiddleware(blocking_app(asyncio.Event()), backend),
+            **{**cors.kwargs, "allow_origins": ["http://front"]},
+        )
+
+        async def run():
+            async with http_client(stack) as http:
+                return [await http.post("/a", headers={"Origin": "http://front"}) for _ in range(2)]
+
+        responses = asyncio.run(run())
+
+        assert responses[1].status_code == 429
+        assert responses[1].headers["Access-Control-Allow-Origin"] == "http://front"
+        assert "Retry-After" in responses[1].headers["Access-Control-Expose-Headers"]
+
+    def test_blocking_backend_runs_off_the_event_loop(self):
+        """Test a backend that waits on a lock does not hold up the loop"""
+        threads = []
+
+        class Backend:
+            blocking = True
+
+            def take(self, key):
+                threads.append(threading.get_ident())
+                return 0.0
+
+        app = RateLimitMiddleware(blocking_app(asyncio.Event()), Backend())
+
+        async def run():
+            async with http_client(app) as http:
+                return await http.post("/a")
+
+        assert asyncio.run(run()).status_code == 200
+        assert threads and threads[0] != threading.get_ident()
+
+    def test_memory_backend_is_bounded(self):
+        """Test the least recently seen buckets are dropped"""
+        backend = MemoryRateLimitBackend(rate=0.01, burst=1, max_keys=2)
+        for key in ("a", "b", "c"):
+            assert backend.take(key) == 0
+
+        assert backend.take("a") == 0
+        assert backend.take("c") > 0
+
+    def test_sqlite_backend_is_shared(self, tmp_path):
+        """Test workers using the same file draw from the same bucket"""
+        path = str(tmp_path / "ratelimit.db")
+        worker1 = SQLiteRateLimitBackend(path, rate=0.01, burst=2)
+        worker2 = SQLiteRateLimitBackend(path, rate=0.01, burst=2)
+
+        assert worker1.take("client") == 0
+        assert worker2.take("client") == 0
+        assert worker1.take("client") > 0
+        assert worker2.take("other") == 0
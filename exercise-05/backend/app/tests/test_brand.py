@@ -1,14 +1,16 @@
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch, MagicMock
+from sqlalchemy import event
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.main import app
 from app.db.database import get_db
 from app.models.brand import Brand
+from app.models.vehicle import Vehicle
 from app.schemas.brand import BrandCreate
 
-from app.tests.conftest import client, override_get_db
+from app.tests.conftest import client, engine, override_get_db
 
 
 class TestGetBrands:
@@ -31,7 +33,7 @@ class TestGetBrands:
         data = response.json()
         assert data["items"] == []
 
-    @patch("app.routers.brand.paginate")
+    @patch("app.routers.brand.paginate_listing")
     def test_get_brands_database_error(self, mock_paginate, db_session):
         """Test database error handling"""
         from sqlalchemy.exc import SQLAlchemyError
@@ -144,6 +146,45 @@ class TestDeleteBrand:
         deleted_brand = db_session.query(Brand).filter(Brand.id == brand_id).first()
         assert deleted_brand is None
 
+    def test_delete_brand_is_one_statement(self, db_session, multiple_vehicles):
+        """Test the database cascades the delete instead of the ORM"""
+        brand_id = multiple_vehicles[0].brand_id
+        deletes = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("DELETE"):
+                deletes.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.delete(f"/api/brands/{brand_id}")
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert response.status_code == 204
+        assert len(deletes) == 1
+        assert deletes[0].startswith("DELETE FROM brands")
+        assert db_session.query(Vehicle).count() == 0
+
+    def test_delete_brand_in_background_chunks(self, db_session, multiple_vehicles, job_runner):
+        """Test the background mode deletes vehicles a chunk at a time in a job"""
+        brand_id = multiple_vehicles[0].brand_id
+        response = client.delete(f"/api/brands/{brand_id}?background=true&chunk_size=2")
+
+        assert response.status_code == 202
+        job = response.json()
+        assert job["type"] == "delete_brand"
+        assert response.headers["Location"] == f"/api/jobs/{job['id']}"
+        assert job_runner.run_next()
+
+        job = client.get(f"/api/jobs/{job['id']}").json()
+        assert job["status"] == "succeeded"
+        assert job["result"] == {"vehicles": 5}
+        assert db_session.query(Vehicle).count() == 0
+        assert db_session.query(Brand).count() == 0
+        assert client.get("/api/vehicles/stats/summary").json()["total"] == 0
+        assert client.get("/api/brands/resolve?name=Toyota").status_code == 404
+
     def test_delete_brand_not_found(self, db_session):
         """Test deleting non-existent brand"""
         response = client.delete("/api/brands/999")
@@ -158,7 +199,6 @@ class TestDeleteBrand:
         # Create a mock session whose commit raises an error
         mock_session = MagicMock()
         mock_session.commit.side_effect = SQLAlchemyError("Database error")
-        mock_session.delete.return_value = None
         mock_session.rollback.return_value = None
 
         # Override the dependency to return our mock session
@@ -182,7 +222,7 @@ class TestDeleteBrand:
                 )
 
                 # Verify the mock was called correctly
-                mock_session.delete.assert_called_once()
+                mock_session.delete.assert_not_called()
                 mock_session.commit.assert_called_once()
                 mock_session.rollback.assert_called_once()
             finally:
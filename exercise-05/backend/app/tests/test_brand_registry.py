@@ -0,0 +1,111 @@
+from sqlalchemy import event
+
+from app.db.versions import BRANDS, bump_version, get_version
+from app.models.brand import Brand
+from app.services.brand_registry import BrandRegistry, brand_registry
+
+from app.tests.conftest import client, engine
+
+
+def count_queries(fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+class TestBrandRegistry:
+    def test_lookup_by_id_and_name(self, db_session, sample_brand):
+        """Test registry lookups by id and lower-cased name"""
+        registry = BrandRegistry(ttl=60)
+        registry.load(db_session)
+
+        assert registry.get(db_session, sample_brand.id).name == "Toyota"
+        assert registry.get_by_name(db_session, "tOYOTA").id == sample_brand.id
+        assert registry.get(db_session, 999) is None
+
+    def test_loaded_registry_does_not_query(self, db_session, sample_brand):
+        """Test lookups are served from memory once loaded"""
+        registry = BrandRegistry(ttl=60)
+        registry.load(db_session)
+
+        statements = count_queries(
+            lambda: registry.get_by_name(db_session, "Toyota")
+        )
+
+        assert statements == []
+
+    def test_miss_falls_back_to_database(self, db_session):
+        """Test brands inserted elsewhere are found and remembered"""
+        registry = BrandRegistry(ttl=60)
+        registry.load(db_session)
+        brand = Brand(name="Honda")
+        db_session.add(brand)
+        db_session.commit()
+
+        assert registry.get(db_session, brand.id).name == "Honda"
+        assert count_queries(lambda: registry.get(db_session, brand.id)) == []
+
+    def test_misses_are_remembered_until_version_bump(self, db_session, sample_brand):
+        """Test unknown ids and names query once, until brands change"""
+        registry = BrandRegistry(ttl=0)
+        registry.load(db_session)
+        assert registry.get(db_session, 999) is None
+        assert registry.get_by_name(db_session, "Honda") is None
+
+        statements = count_queries(
+            lambda: (registry.get(db_session, 999), registry.get_by_name(db_session, "honda"))
+        )
+        db_session.add(Brand(id=999, name="Honda"))
+        bump_version(db_session, BRANDS)
+        db_session.commit()
+
+        assert [s for s in statements if "FROM brands" in s] == []
+        assert registry.get(db_session, 999).name == "Honda"
+        assert registry.get_by_name(db_session, "HONDA").id == 999
+
+    def test_version_change_reloads(self, db_session, sample_brand):
+        """Test a version bump from another worker invalidates the registry"""
+        registry = BrandRegistry(ttl=0)
+        registry.load(db_session)
+
+        db_session.delete(sample_brand)
+        bump_version(db_session, BRANDS)
+        db_session.commit()
+
+        assert registry.get_by_name(db_session, "Toyota") is None
+
+
+class TestBrandRegistryWriteThrough:
+    def test_create_brand_updates_registry(self, db_session):
+        """Test creating a brand adds it to the registry and bumps the version"""
+        response = client.post("/api/brands/", json={"name": "Kia"})
+
+        assert response.status_code == 200
+        assert brand_registry.get_by_name(db_session, "kia").id == response.json()["id"]
+        assert get_version(db_session, BRANDS) == 1
+
+    def test_created_brand_is_no_longer_missing(self, db_session):
+        """Test a brand created through this worker replaces a remembered miss"""
+        assert brand_registry.get_by_name(db_session, "Kia") is None
+
+        response = client.post("/api/brands/", json={"name": "Kia"})
+
+        assert brand_registry.get_by_name(db_session, "kia").id == response.json()["id"]
+
+    def test_delete_brand_updates_registry(self, db_session, sample_brand):
+        """Test deleting a brand removes it from the registry"""
+        brand_id = sample_brand.id
+        assert brand_registry.get(db_session, brand_id) is not None
+
+        response = client.delete(f"/api/brands/{brand_id}")
+
+        assert response.status_code == 204
+        assert client.get("/api/brands/resolve?name=Toyota").status_code == 404
@@ -0,0 +1,95 @@
+import time
+
+from app.core.cache import MemoryCacheBackend, ResponseCache, SQLiteCacheBackend, vehicle_cache
+
+from app.tests.conftest import client
+
+
+class TestMemoryCacheBackend:
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first"""
+        backend = MemoryCacheBackend(ttl=60, max_entries=2)
+        backend.set("a", "1")
+        backend.set("b", "2")
+        backend.get("a")
+        backend.set("c", "3")
+
+        assert backend.get("a") == "1"
+        assert backend.get("b") is None
+        assert backend.evictions == 1
+
+    def test_ttl_expiry(self):
+        """Test expired entries are not returned"""
+        backend = MemoryCacheBackend(ttl=0.01, max_entries=10)
+        backend.set("a", "1")
+        time.sleep(0.02)
+
+        assert backend.get("a") is None
+
+
+class TestSQLiteCacheBackend:
+    def test_shared_store(self, tmp_path):
+        """Test two backends on the same file see each other's entries"""
+        path = str(tmp_path / "cache.db")
+        first = SQLiteCacheBackend(path, ttl=60, max_entries=2)
+        second = SQLiteCacheBackend(path, ttl=60, max_entries=2)
+        first.set("a", "1")
+
+        assert second.get("a") == "1"
+
+    def test_lru_eviction(self, tmp_path):
+        """Test entry count stays within bounds"""
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.db"), ttl=60, max_entries=2)
+        for key in ("a", "b", "c"):
+            backend.set(key, key)
+
+        assert len(backend) == 2
+        assert backend.get("a") is None
+
+    def test_hit_miss_metrics(self, tmp_path):
+        """Test the cache wrapper counts hits and misses"""
+        cache = ResponseCache(
+            "test", SQLiteCacheBackend(str(tmp_path / "cache.db"), ttl=60, max_entries=2)
+        )
+        cache.get("a")
+        cache.set("a", "1")
+        cache.get("a")
+
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+
+class TestVehicleListCache:
+    def test_repeated_listing_is_served_from_cache(self, db_session, sample_vehicle):
+        """Test the second identical request is a cache hit"""
+        first = client.get("/api/vehicles/?color=Blue")
+        second = client.get("/api/vehicles/?color=Blue")
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert first.json() == second.json()
+        assert vehicle_cache.stats()["hits"] == 1
+
+    def test_page_params_are_part_of_key(self, db_session, sample_vehicle):
+        """Test different page sizes do not share an entry"""
+        client.get("/api/vehicles/?size=10")
+        response = client.get("/api/vehicles/?size=20")
+
+        assert response.headers["X-Cache"] == "MISS"
+
+    def test_write_invalidates_cache(self, db_session, sample_vehicle):
+        """Test a patch bumps the generation so stale pages are not served"""
+        client.get("/api/vehicles/")
+        client.patch(f"/api/vehicles/{sample_vehicle.id}", json={"color": "Green"})
+        response = client.get("/api/vehicles/")
+
+        assert response.headers["X-Cache"] == "MISS"
+        assert response.json()["items"][0]["color"] == "Green"
+
+    def test_cache_stats_endpoint(self, db_session):
+        """Test cache metrics are exposed"""
+        client.get("/api/vehicles/")
+        response = client.get("/api/vehicles/cache/stats")
+
+        assert response.status_code == 200
+        assert response.json()["misses"] == 1
@@ -0,0 +1,218 @@
+import asyncio
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import delete, select, update
+
+from app.models.change import Change
+from app.models.vehicle import Vehicle
+from app.services.brand_writes import delete_brand_in_chunks
+from app.services.change_feed import ChangeFeed, purge_changes
+from app.services.jobs import utcnow
+from app.services.vehicle_archive import archive_sold_vehicles
+
+from app.tests.conftest import TestingSessionLocal, client, engine
+
+
+def logged(db_session):
+    rows = db_session.execute(
+        select(Change.entity, Change.action, Change.entity_id).order_by(Change.id)
+    )
+    return [tuple(row) for row in rows]
+
+
+def create_vehicle(brand_id):
+    response = client.post(
+        "/api/vehicles/",
+        json={"model": "Corolla", "brand_id": brand_id, "color": "Red", "year": 2021},
+    )
+    return response.json()["id"]
+
+
+def parse(events):
+    """(event id, event type, data) of each event in a stream chunk."""
+    parsed = []
+    for block in events.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        parsed.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+async def _false():
+    return False
+
+
+class TestChangeLog:
+    def test_writes_are_logged(self, db_session, sample_brand):
+        """Test every vehicle and brand write logs what changed"""
+        id = create_vehicle(sample_brand.id)
+        client.patch(f"/api/vehicles/{id}", json={"color": "Blue"})
+        client.delete(f"/api/vehicles/{id}")
+        brand = client.post("/api/brands/", json={"name": "Honda"}).json()["id"]
+        client.delete(f"/api/brands/{brand}")
+
+        assert logged(db_session) == [
+            ("vehicle", "created", id),
+            ("vehicle", "updated", id),
+            ("vehicle", "deleted", id),
+            ("brand", "created", brand),
+            ("brand", "deleted", brand),
+        ]
+
+    def test_failed_writes_are_not_logged(self, db_session, sample_brand):
+        """Test writes that change nothing log nothing"""
+        client.patch("/api/vehicles/999", json={"color": "Blue"})
+        client.delete("/api/vehicles/999")
+
+        assert logged(db_session) == []
+
+    def test_bulk_writes_log_each_vehicle(self, db_session, sample_brand):
+        """Test bulk endpoints log the vehicles that succeeded"""
+        payload = [
+            {"model": "Corolla", "brand_id": sample_brand.id, "color": "Red", "year": 2021}
+            for _ in range(2)
+        ]
+        ids = [r["id"] for r in client.post("/api/vehicles/bulk", json=payload).json()["results"]]
+        client.request("DELETE", "/api/vehicles/bulk", json=[ids[0], 999])
+
+        assert logged(db_session) == [
+            ("vehicle", "created", ids[0]),
+            ("vehicle", "created", ids[1]),
+            ("vehicle", "deleted", ids[0]),
+        ]
+
+    def test_import_logs_each_vehicle(self, db_session, sample_brand):
+        """Test imports log every vehicle they created, chunk by chunk"""
+        content = "\n".join(
+            json.dumps({"model": "Civic", "brand_id": sample_brand.id, "color": "Red", "year": 2020})
+            for _ in range(3)
+        )
+        client.post(
+            "/api/vehicles/import?chunk_size=2",
+            files={"file": ("vehicles.ndjson", content)},
+        )
+
+        ids = db_session.execute(select(Vehicle.id).order_by(Vehicle.id)).scalars().all()
+        assert logged(db_session) == [("vehicle", "created", id) for id in ids]
+        assert len(ids) == 3
+
+    def test_brand_delete_logs_cascaded_vehicles(self, db_session, sample_brand):
+        """Test deleting a brand logs the vehicles that went with it"""
+        ids = [create_vehicle(sample_brand.id) for _ in range(2)]
+        db_session.execute(delete(Change))
+        db_session.commit()
+
+        client.delete(f"/api/brands/{sample_brand.id}")
+
+        assert logged(db_session) == [
+            *(("vehicle", "deleted", id) for id in ids),
+            ("brand", "deleted", sample_brand.id),
+        ]
+
+    def test_chunked_brand_delete_logs_each_chunk(self, db_session, sample_brand):
+        """Test background brand deletes log vehicles as their chunks commit"""
+        ids = [create_vehicle(sample_brand.id) for _ in range(3)]
+        db_session.execute(delete(Change))
+        db_session.commit()
+
+        delete_brand_in_chunks(engine, sample_brand.id, chunk_size=2)
+
+        assert logged(db_session) == [
+            *(("vehicle", "deleted", id) for id in ids),
+            ("brand", "deleted", sample_brand.id),
+        ]
+
+    def test_archival_logs_archived_vehicles(self, db_session, sample_brand):
+        """Test vehicles moved to the archive are logged as archived"""
+        sold = create_vehicle(sample_brand.id)
+        client.patch(f"/api/vehicles/{sold}", json={"is_sold": True})
+        create_vehicle(sample_brand.id)
+        db_session.execute(update(Vehicle).values(updated_at=utcnow() - timedelta(days=200)))
+        db_session.execute(delete(Change))
+        db_session.commit()
+
+        archive_sold_vehicles(engine, utcnow() - timedelta(days=90), 1000)
+
+        assert logged(db_session) == [("vehicle", "archived", sold)]
+
+    def test_purge_keeps_newest_change(self, db_session, sample_brand):
+        """Test old changes are purged except the newest one"""
+        create_vehicle(sample_brand.id)
+        last = create_vehicle(sample_brand.id)
+        db_session.execute(update(Change).values(created_at=utcnow() - timedelta(days=2)))
+        db_session.commit()
+
+        assert purge_changes(db_session, utcnow() - timedelta(hours=24)) == 1
+
+        assert logged(db_session) == [("vehicle", "created", last)]
+
+
+class TestChangeFeed:
+    def test_streams_new_changes(self, db_session, sample_brand):
+        """Test subscribers receive changes committed after they connect"""
+        create_vehicle(sample_brand.id)
+        feed = ChangeFeed(TestingSessionLocal, poll_seconds=0.01)
+
+        async def run():
+            stream = feed.subscribe(None, _false)
+            first = asyncio.create_task(stream.__anext__())
+            await asyncio.sleep(0.05)
+            id = await asyncio.to_thread(create_vehicle, sample_brand.id)
+            event = await first
+            await stream.aclose()
+            return id, event
+
+        id, event = asyncio.run(run())
+
+        assert parse(event) == [
+            (2, "change", {"entity": "vehicle", "action": "created", "id": id})
+        ]
+        assert feed._task is None
+
+    def test_resumes_after_last_event_id(self, db_session, sample_brand):
+        """Test a reconnecting subscriber gets the changes it missed"""
+        ids = [create_vehicle(sample_brand.id) for _ in range(3)]
+        feed = ChangeFeed(TestingSessionLocal, poll_seconds=0.01)
+
+        async def run():
+            stream = feed.subscribe(1, _false)
+            event = await stream.__anext__()
+            await stream.aclose()
+            return event
+
+        assert [data["id"] for _, _, data in parse(asyncio.run(run()))] == ids[1:]
+
+    def test_purged_last_event_id_resets(self, db_session, sample_brand):
+        """Test resuming from a purged event asks the client to start over"""
+        for _ in range(3):
+            create_vehicle(sample_brand.id)
+        db_session.execute(update(Change).values(created_at=utcnow() - timedelta(days=2)))
+        db_session.commit()
+        purge_changes(db_session, utcnow())
+        feed = ChangeFeed(TestingSessionLocal, poll_seconds=0.01)
+
+        async def run():
+            stream = feed.subscribe(1, _false)
+            event = await stream.__anext__()
+            await stream.aclose()
+            return event
+
+        assert parse(asyncio.run(run())) == [(3, "reset", {})]
+
+    def test_waits_at_gaps_before_skipping_them(self):
+        """Test events after an id that may still commit are held back"""
+        feed = ChangeFeed(TestingSessionLocal, gap_seconds=5)
+        rows = [
+            SimpleNamespace(id=id, entity="vehicle", action="created", entity_id=id)
+            for id in (1, 3)
+        ]
+
+        assert [id for id, _ in feed._in_order(rows, now=100)] == [1]
+        feed.head = 1
+        assert [id for id, _ in feed._in_order(rows[1:], now=103)] == []
+        assert [id for id, _ in feed._in_order(rows[1:], now=106)] == [3]
+
+    def test_stream_endpoint_validates_last_event_id(self):
+        """Test a malformed resume position is rejected"""
+        assert client.get("/api/changes/stream?after=abc").status_code == 422
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+
+from app.tests.conftest import client
+
+
+class TestVehicleConditionalGet:
+    def test_etag_and_if_none_match(self, sample_vehicle):
+        """Test a matching ETag returns 304 without a body"""
+        response = client.get(f"/api/vehicles/{sample_vehicle.id}")
+        etag = response.headers["ETag"]
+        assert etag.startswith('"') and "Last-Modified" in response.headers
+
+        cached = client.get(
+            f"/api/vehicles/{sample_vehicle.id}", headers={"If-None-Match": f'"other", W/{etag}'}
+        )
+
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["ETag"] == etag
+
+    def test_etag_changes_after_write(self, sample_vehicle):
+        """Test a patched vehicle no longer matches the old ETag"""
+        etag = client.get(f"/api/vehicles/{sample_vehicle.id}").headers["ETag"]
+        client.patch(f"/api/vehicles/{sample_vehicle.id}", json={"color": "Green"})
+
+        response = client.get(f"/api/vehicles/{sample_vehicle.id}", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["color"] == "Green"
+        assert response.headers["ETag"] != etag
+
+    def test_if_modified_since(self, sample_vehicle):
+        """Test If-Modified-Since compares against updated_at"""
+        last_modified = client.get(f"/api/vehicles/{sample_vehicle.id}").headers["Last-Modified"]
+        earlier = format_datetime(
+            parsedate_to_datetime(last_modified) - timedelta(seconds=1), usegmt=True
+        )
+
+        assert client.get(
+            f"/api/vehicles/{sample_vehicle.id}", headers={"If-Modified-Since": last_modified}
+        ).status_code == 304
+        assert client.get(
+            f"/api/vehicles/{sample_vehicle.id}", headers={"If-Modified-Since": earlier}
+        ).status_code == 200
+
+    def test_if_none_match_takes_precedence(self, sample_vehicle):
+        """Test If-Modified-Since is ignored when If-None-Match is sent"""
+        last_modified = client.get(f"/api/vehicles/{sample_vehicle.id}").headers["Last-Modified"]
+
+        response = client.get(
+            f"/api/vehicles/{sample_vehicle.id}",
+            headers={"If-None-Match": '"stale"', "If-Modified-Since": last_modified},
+        )
+
+        assert response.status_code == 200
+
+
+class TestListConditionalGet:
+    def test_vehicle_list_skips_row_query(self, multiple_vehicles):
+        """Test a matching list ETag answers 304 with only the version lookup"""
+        client.get("/api/vehicles/?size=2")
+        etag = client.get("/api/vehicles/?size=2").headers["ETag"]
+
+        response = client.get("/api/vehicles/?size=2", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert 'desc="1 queries"' in response.headers["Server-Timing"]
+
+    def test_vehicle_list_etag_depends_on_query_and_writes(self, multiple_vehicles, sample_brand):
+        """Test different parameters or a new vehicle change the list ETag"""
+        etag = client.get("/api/vehicles/?size=2").headers["ETag"]
+        assert client.get("/api/vehicles/?size=3").headers["ETag"] != etag
+        assert client.get("/api/vehicles/?size=2&color=Red").headers["ETag"] != etag
+
+        client.post(
+            "/api/vehicles/",
+            json={"model": "Yaris", "brand_id": sample_brand.id, "color": "Red", "year": 2020},
+        )
+        response = client.get("/api/vehicles/?size=2", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_brand_list(self, multiple_brands):
+        """Test the brand list honours If-None-Match until a brand is added"""
+        etag = client.get("/api/brands/").headers["ETag"]
+
+        assert client.get("/api/brands/", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get("/api/brands/", headers={"If-None-Match": "*"}).status_code == 304
+
+        client.post("/api/brands/", json={"name": "Kia"})
+
+        response = client.get("/api/brands/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["total"] == 6
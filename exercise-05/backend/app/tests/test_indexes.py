@@ -0,0 +1,240 @@
+import itertools
+
+from sqlalchemy import MetaData, create_engine, func, inspect, select, text
+
+from app.db.constraints import enable_foreign_keys
+from app.db.database import Base
+from app.db.migrations import (
+    index_names,
+    migrate_foreign_keys,
+    migrate_indexes,
+    migrate_sqlite_autoincrement,
+)
+from app.db.search import create_search_index, ensure_search_index
+from app.models.brand import Brand
+from app.models.vehicle import Vehicle
+from app.models.vehicle_archive import VehicleArchive
+from app.routers.vehicle import filter_vehicles
+from app.services.vehicle_archive import shared_columns, with_archive
+
+
+def query_plan(engine, statement):
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return " | ".join(row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+class TestIndexMigration:
+    def test_migrate_existing_tables(self, tmp_path):
+        """Test indexes are added to and removed from pre-existing tables"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_vehicles_brand_created_at"))
+            conn.execute(text("DROP INDEX ix_brands_name_lower"))
+            conn.execute(text("CREATE INDEX ix_vehicles_color ON vehicles (color)"))
+            conn.execute(
+                text(
+                    "CREATE INDEX ix_vehicles_brand_listing "
+                    "ON vehicles (brand_id, is_sold, year, created_at, id)"
+                )
+            )
+
+        migrate_indexes(engine, Base.metadata)
+
+        with engine.connect() as conn:
+            vehicles = index_names(conn, "vehicles")
+            brands = index_names(conn, "brands")
+        assert "ix_vehicles_brand_created_at" in vehicles
+        assert "ix_vehicles_color" not in vehicles
+        assert "ix_vehicles_brand_listing" not in vehicles
+        assert "ix_brands_name_lower" in brands
+
+    def test_migrate_is_idempotent(self, tmp_path):
+        """Test running the migration on an up-to-date schema is a no-op"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+        Base.metadata.create_all(engine)
+
+        migrate_indexes(engine, Base.metadata)
+        migrate_indexes(engine, Base.metadata)
+
+
+def vehicle_fk_ondelete(engine):
+    (fk,) = inspect(engine).get_foreign_keys("vehicles")
+    return fk["options"].get("ondelete")
+
+
+class TestForeignKeyMigration:
+    def test_sqlite_table_rebuild(self, tmp_path):
+        """Test vehicles created without ON DELETE CASCADE are rebuilt with it"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        enable_foreign_keys(engine)
+        old = MetaData()
+        Brand.__table__.to_metadata(old)
+        for constraint in Vehicle.__table__.to_metadata(old).foreign_key_constraints:
+            constraint.ondelete = None
+        old.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO brands (id, name) VALUES (1, 'Toyota')"))
+            conn.execute(
+                text("INSERT INTO vehicles (id, model, brand_id) VALUES (7, 'Corolla', 1)")
+            )
+        assert vehicle_fk_ondelete(engine) is None
+
+        Base.metadata.create_all(engine)
+        migrate_foreign_keys(engine, Base.metadata)
+        migrate_indexes(engine, Base.metadata)
+        ensure_search_index(engine)
+
+        assert vehicle_fk_ondelete(engine) == "CASCADE"
+        with engine.begin() as conn:
+            assert "ix_vehicles_brand_created_at" in index_names(conn, "vehicles")
+            assert conn.execute(text("SELECT id, model FROM vehicles")).all() == [
+                (7, "Corolla")
+            ]
+            conn.execute(text("INSERT INTO vehicles (model, brand_id) VALUES ('Prius', 1)"))
+            matches = conn.execute(
+                text("SELECT rowid FROM vehicles_fts WHERE vehicles_fts MATCH 'prius'")
+            ).all()
+            assert len(matches) == 1
+            conn.execute(text("DELETE FROM brands WHERE id = 1"))
+            assert conn.execute(text("SELECT count(*) FROM vehicles")).scalar() == 0
+
+    def test_rebuild_keeps_search_index(self, tmp_path):
+        """Test search still follows writes after vehicles is rebuilt under
+        an existing search index"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        old = MetaData()
+        Brand.__table__.to_metadata(old)
+        for constraint in Vehicle.__table__.to_metadata(old).foreign_key_constraints:
+            constraint.ondelete = None
+        old.create_all(engine)
+        with engine.begin() as conn:
+            create_search_index(Vehicle.__table__, conn)
+            conn.execute(text("INSERT INTO brands (id, name) VALUES (1, 'Toyota')"))
+            conn.execute(
+                text("INSERT INTO vehicles (id, model, brand_id) VALUES (7, 'Corolla', 1)")
+            )
+
+        Base.metadata.create_all(engine)
+        migrate_foreign_keys(engine, Base.metadata)
+        migrate_indexes(engine, Base.metadata)
+        ensure_search_index(engine)
+
+        def search(conn, term):
+            return conn.execute(
+                text("SELECT rowid FROM vehicles_fts WHERE vehicles_fts MATCH :term"),
+                {"term": term},
+            ).scalars().all()
+
+        assert vehicle_fk_ondelete(engine) == "CASCADE"
+        with engine.begin() as conn:
+            assert search(conn, "corolla") == [7]
+            conn.execute(text("INSERT INTO vehicles (id, model, brand_id) VALUES (8, 'Prius', 1)"))
+            conn.execute(text("UPDATE vehicles SET model = 'Camry' WHERE id = 7"))
+            assert search(conn, "prius") == [8]
+            assert search(conn, "camry") == [7]
+            assert search(conn, "corolla") == []
+
+    def test_migrate_is_idempotent(self, tmp_path):
+        """Test up-to-date foreign keys are left alone"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+        Base.metadata.create_all(engine)
+
+        migrate_foreign_keys(engine, Base.metadata)
+
+        assert vehicle_fk_ondelete(engine) == "CASCADE"
+
+
+class TestAutoincrementMigration:
+    def test_rebuilt_ids_stay_above_the_archive(self, tmp_path):
+        """Test vehicles created without AUTOINCREMENT are rebuilt with it
+        and new ids skip the archived ones"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        old = MetaData()
+        Brand.__table__.to_metadata(old)
+        Vehicle.__table__.to_metadata(old).dialect_options["sqlite"]["autoincrement"] = False
+        old.create_all(engine)
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO brands (id, name) VALUES (1, 'Toyota')"))
+            conn.execute(text("INSERT INTO vehicles (id, model, brand_id) VALUES (7, 'Camry', 1)"))
+            conn.execute(
+                text("INSERT INTO vehicles_archive (id, model, brand_id) VALUES (9, 'Corolla', 1)")
+            )
+
+        migrate_sqlite_autoincrement(engine, Base.metadata)
+        migrate_sqlite_autoincrement(engine, Base.metadata)
+
+        with engine.begin() as conn:
+            sql = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE name = 'vehicles'")
+            ).scalar()
+            assert "AUTOINCREMENT" in sql
+            conn.execute(text("INSERT INTO vehicles (model, brand_id) VALUES ('Prius', 1)"))
+            ids = conn.execute(text("SELECT id FROM vehicles ORDER BY id")).scalars().all()
+        assert ids == [7, 10]
+
+
+class TestQueryPlans:
+    def test_listing_filters_use_indexes(self, tmp_path):
+        """Test filtered and unfiltered listings avoid full table scans"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'plan.db'}")
+        Base.metadata.create_all(engine)
+        cases = [
+            {},
+            {"brand_id": 1},
+            {"brand_id": 1, "is_sold": False, "year": 2020},
+            {"year": 2020},
+            {"color": "Red", "is_sold": True},
+            {"is_sold": False},
+        ]
+        for filters in cases:
+            values = {"year": None, "brand_id": None, "color": None, "is_sold": None, **filters}
+            statement = filter_vehicles(select(Vehicle), **values).order_by(
+                Vehicle.created_at, Vehicle.id
+            )
+            plan = query_plan(engine, statement)
+            assert "USING INDEX ix_vehicles_" in plan, (filters, plan)
+
+    def test_listing_filters_need_no_sort(self, tmp_path):
+        """Test every combination of filters reads a page in listing order"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'plan.db'}")
+        Base.metadata.create_all(engine)
+        names = ("brand_id", "year", "color", "is_sold")
+        sample = {"brand_id": 1, "year": 2020, "color": "Red", "is_sold": True}
+        for size in range(len(names) + 1):
+            for filters in itertools.combinations(names, size):
+                values = {name: sample[name] if name in filters else None for name in names}
+                for model in (Vehicle, VehicleArchive):
+                    statement = (
+                        filter_vehicles(select(model), **values, model=model)
+                        .order_by(model.created_at, model.id)
+                        .limit(20)
+                    )
+                    plan = query_plan(engine, statement)
+                    assert "TEMP B-TREE" not in plan, (model, filters, plan)
+
+    def test_archive_listing_uses_both_indexes(self, tmp_path):
+        """Test a page of vehicles and archived vehicles reads each table
+        through its listing index"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'plan.db'}")
+        Base.metadata.create_all(engine)
+        for filters in ({}, {"brand_id": 1}, {"year": 2020, "is_sold": True}, {"color": "Red"}):
+            values = {"year": None, "brand_id": None, "color": None, "is_sold": None, **filters}
+            hot, cold = (
+                filter_vehicles(select(*shared_columns(model)), **values, model=model)
+                for model in (Vehicle, VehicleArchive)
+            )
+            rows = with_archive(hot, cold, 20)
+            plan = query_plan(engine, select(rows).order_by(rows.c.created_at, rows.c.id))
+            assert "vehicles USING INDEX ix_vehicles_" in plan, (filters, plan)
+            assert "vehicles_archive USING INDEX ix_vehicles_archive_" in plan, (filters, plan)
+
+    def test_resolve_uses_lower_name_index(self, tmp_path):
+        """Test the case-insensitive brand lookup uses the functional index"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'plan.db'}")
+        Base.metadata.create_all(engine)
+        statement = select(Brand).where(func.lower(Brand.name) == "toyota")
+
+        assert "ix_brands_name_lower" in query_plan(engine, statement)
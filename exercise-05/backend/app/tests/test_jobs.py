@@ -0,0 +1,173 @@
+import json
+import os
+from datetime import timedelta
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.models.job import Job
+from app.services.job_handlers import JOB_TYPES
+from app.services.jobs import JobRunner, JobType, submit_job, utcnow
+
+from app.tests.conftest import TestingSessionLocal, client
+
+
+def submit(payload):
+    response = client.post("/api/jobs/", json=payload)
+    assert response.status_code == 202
+    return response.json()["id"]
+
+
+def get_job(id):
+    return client.get(f"/api/jobs/{id}").json()
+
+
+class TestJobEndpoints:
+    def test_export_job(self, multiple_vehicles, job_runner):
+        """Test an export runs in a job and its file can be downloaded"""
+        response = client.post(
+            "/api/jobs/", json={"type": "export", "params": {"format": "csv", "is_sold": True}}
+        )
+
+        assert response.status_code == 202
+        id = response.json()["id"]
+        assert response.headers["Location"] == f"/api/jobs/{id}"
+        assert get_job(id)["status"] == "queued"
+
+        assert job_runner.run_next()
+
+        job = get_job(id)
+        assert job["status"] == "succeeded"
+        assert job["result"] == {"format": "csv", "rows": 2}
+        assert (job["progress"], job["total"]) == (2, 2)
+        download = client.get(job["result_url"])
+        assert download.status_code == 200
+        assert download.headers["content-type"].startswith("text/csv")
+        lines = download.text.splitlines()
+        assert lines[0].startswith("id,model")
+        assert len(lines) == 3
+
+    def test_import_job(self, sample_brand, job_runner):
+        """Test an uploaded file is imported by a job that reports its errors"""
+        rows = [
+            {"model": "Corolla", "brand_id": sample_brand.id, "color": "Red", "year": 2020},
+            {"model": "Civic", "brand_name": "Nope", "color": "Blue", "year": 2021},
+        ]
+        content = "\n".join(json.dumps(row) for row in rows)
+        response = client.post(
+            "/api/jobs/import", files={"file": ("vehicles.ndjson", content)}
+        )
+        assert response.status_code == 202
+        id = response.json()["id"]
+
+        assert job_runner.run_next()
+
+        job = get_job(id)
+        assert job["status"] == "succeeded"
+        assert job["result"]["imported"] == 1
+        assert job["result"]["failed"] == 1
+        assert not os.path.exists(os.path.join(settings.JOBS_DIR, f"{id}.upload"))
+        errors = client.get(job["result_url"]).json()["errors"]
+        assert errors == [{"row": 2, "detail": "Brand 'Nope' not found"}]
+
+    def test_rebuild_stats_job(self, multiple_vehicles, job_runner):
+        """Test the stats rebuild runs as a job"""
+        id = submit({"type": "rebuild_stats"})
+
+        assert job_runner.run_next()
+
+        job = get_job(id)
+        assert job["status"] == "succeeded"
+        assert job["result_url"] is None
+        assert client.get("/api/vehicles/stats/summary").json()["total"] == 5
+
+    def test_unknown_type_is_rejected(self, db_session):
+        """Test imports and unknown types cannot be submitted as JSON"""
+        assert client.post("/api/jobs/", json={"type": "import"}).status_code == 422
+        assert client.post("/api/jobs/", json={"type": "nope"}).status_code == 422
+
+    def test_missing_job_and_result(self, job_runner):
+        """Test unknown jobs and unfinished results are 404"""
+        assert client.get("/api/jobs/nope").status_code == 404
+        id = submit({"type": "rebuild_stats"})
+        assert client.get(f"/api/jobs/{id}/result").status_code == 404
+
+
+class TestCancellation:
+    def test_cancel_queued_job(self, job_runner):
+        """Test a queued job is cancelled at once and never runs"""
+        id = submit({"type": "rebuild_stats"})
+
+        response = client.post(f"/api/jobs/{id}/cancel")
+
+        assert response.json()["status"] == "cancelled"
+        assert not job_runner.run_next()
+        assert client.post(f"/api/jobs/{id}/cancel").status_code == 409
+
+    def test_cancel_running_job(self, db_session, tmp_path):
+        """Test a running job stops at its next progress report"""
+
+        def handler(context):
+            with open(context.result_file("json"), "w") as f:
+                f.write("{}")
+            response = client.post(f"/api/jobs/{context.id}/cancel")
+            assert response.json()["cancel_requested"]
+            context.progress(1)
+            raise AssertionError("not cancelled")
+
+        runner = JobRunner(TestingSessionLocal, {"slow": JobType(handler)}, {}, 1, str(tmp_path))
+        id = submit_job(db_session, "slow", {}).id
+
+        assert runner.run_next()
+
+        assert get_job(id)["status"] == "cancelled"
+        assert os.listdir(tmp_path) == []
+
+
+class TestRunner:
+    def test_concurrency_limit_per_type(self, job_runner):
+        """Test a type at its limit is skipped while other types still run"""
+        job_runner.limits = {"export": 1, "rebuild_stats": 1}
+        first = submit({"type": "export"})
+        submit({"type": "export"})
+        rebuild = submit({"type": "rebuild_stats"})
+
+        assert job_runner.claim() == (first, "export")
+        assert job_runner.claim() == (rebuild, "rebuild_stats")
+        assert job_runner.claim() is None
+
+    def test_interrupted_jobs_are_requeued_or_failed(self, db_session, job_runner):
+        """Test jobs of a dead runner are queued again unless they cannot rerun"""
+        export = submit({"type": "export"})
+        imported = submit_job(db_session, "import", {"format": "csv", "chunk_size": 10}).id
+        job_runner.claim()
+        job_runner.claim()
+        db_session.execute(
+            update(Job).values(heartbeat_at=utcnow() - timedelta(seconds=600))
+        )
+        db_session.commit()
+
+        assert job_runner.reap_stale() == 2
+
+        assert get_job(export)["status"] == "queued"
+        failed = get_job(imported)
+        assert failed["status"] == "failed"
+        assert "restart" in failed["error"]
+
+    def test_purge_finished_jobs(self, db_session, job_runner):
+        """Test old finished jobs are deleted with their files"""
+        id = submit({"type": "rebuild_stats"})
+        client.post(f"/api/jobs/{id}/cancel")
+        path = os.path.join(job_runner.directory, f"{id}.upload")
+        open(path, "w").close()
+        db_session.execute(update(Job).values(finished_at=utcnow() - timedelta(days=30)))
+        db_session.commit()
+
+        assert job_runner.purge_finished() == 1
+
+        assert client.get(f"/api/jobs/{id}").status_code == 404
+        assert not os.path.exists(path)
+
+    def test_job_types(self):
+        """Test every job type has a concurrency limit by default"""
+        assert set(JOB_TYPES) <= set(settings.JOBS_CONCURRENCY)
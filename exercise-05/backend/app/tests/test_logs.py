@@ -0,0 +1,305 @@
+import asyncio
+import json
+import logging
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.log_store import (
+    IndexedRotatingFileHandler,
+    list_segments,
+    query_logs,
+    read_index,
+)
+from app.core.log_tail import LineFilter, follow_log, tail_lines
+from app.core.logger import (
+    TEXT_FORMAT,
+    JsonFormatter,
+    RingBufferHandler,
+    logger,
+    ring_buffer,
+)
+
+from app.tests.conftest import client
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    path = tmp_path / "app.log"
+    path.write_text(
+        "".join(f"[2025-01-01 00:00:{i:02d}] INFO in main: line {i}\n" for i in range(50))
+    )
+    monkeypatch.setattr(settings, "LOG_FILE", str(path))
+    return path
+
+
+class TestTailLines:
+    @pytest.mark.parametrize("block_size", [1, 7, 64, 8192])
+    def test_tail_matches_readlines(self, log_file, block_size):
+        """Test the backwards tail returns the same lines as readlines"""
+        expected = log_file.read_text().splitlines(keepends=True)
+        for lines in (1, 3, 49, 50, 500):
+            assert tail_lines(str(log_file), lines, block_size) == "".join(expected[-lines:])
+
+    def test_tail_without_trailing_newline(self, tmp_path):
+        """Test a final line still being written is included"""
+        path = tmp_path / "partial.log"
+        path.write_text("a\nb\nc")
+
+        assert tail_lines(str(path), 2) == "b\nc"
+
+
+class TestReadLogsEndpoint:
+    def test_read_logs(self, log_file):
+        """Test the endpoint returns the last lines"""
+        response = client.get("/api/logs?lines=2&source=file")
+
+        assert response.status_code == 200
+        assert response.json()["logs"].splitlines() == [
+            "[2025-01-01 00:00:48] INFO in main: line 48",
+            "[2025-01-01 00:00:49] INFO in main: line 49",
+        ]
+
+    def test_read_logs_missing_file(self, tmp_path, monkeypatch):
+        """Test a missing log file returns 404"""
+        monkeypatch.setattr(settings, "LOG_FILE", str(tmp_path / "missing.log"))
+
+        assert client.get("/api/logs?source=file").status_code == 404
+
+    def test_read_logs_from_memory(self, tmp_path, monkeypatch):
+        """Test the default source serves the ring buffer without the file"""
+        monkeypatch.setattr(settings, "LOG_FILE", str(tmp_path / "missing.log"))
+        logger.info("served from memory")
+
+        deadline = time.monotonic() + 2
+        while "served from memory" not in client.get("/api/logs?lines=5").json()["logs"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    def test_larger_than_buffer_reads_file(self, log_file):
+        """Test requests beyond the buffer capacity fall back to the file"""
+        response = client.get(f"/api/logs?lines={ring_buffer.capacity + 1}")
+
+        assert response.json()["logs"].count("INFO in main") == 50
+
+    def test_stream_rejects_unknown_level(self):
+        """Test the level filter is validated"""
+        assert client.get("/api/logs/stream?level=verbose").status_code == 422
+
+
+class TestStructuredLogging:
+    def test_ring_buffer_is_bounded(self):
+        """Test the buffer keeps only the most recent records"""
+        handler = RingBufferHandler(3)
+        for i in range(5):
+            handler.handle(logging.makeLogRecord({"msg": f"line {i}"}))
+
+        assert handler.tail(10) == ["line 2", "line 3", "line 4"]
+        assert handler.tail(1) == ["line 4"]
+
+    def test_json_formatter(self):
+        """Test JSON records carry the level, message and request id"""
+        record = logging.makeLogRecord(
+            {"msg": "hello %s", "args": ("world",), "levelname": "INFO", "request_id": "abc"}
+        )
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["level"] == "INFO"
+        assert entry["message"] == "hello world"
+        assert entry["request_id"] == "abc"
+        assert LineFilter("info")(JsonFormatter().format(record))
+        assert not LineFilter("error")(JsonFormatter().format(record))
+
+    def test_request_id_header(self):
+        """Test a request id is generated, or echoed when sent"""
+        assert client.get("/api/logs?lines=1").headers["X-Request-ID"]
+        response = client.get("/api/logs?lines=1", headers={"X-Request-ID": "req-1"})
+
+        assert response.headers["X-Request-ID"] == "req-1"
+
+    def test_request_id_reaches_records(self, db_session, monkeypatch):
+        """Test records logged by a sync route carry the request id"""
+        monkeypatch.setattr(ring_buffer, "formatter", JsonFormatter())
+        client.get("/api/brands/resolve?name=traced", headers={"X-Request-ID": "req-trace"})
+        logger.info("outside any request")
+
+        deadline = time.monotonic() + 2
+        while "outside any request" not in "".join(ring_buffer.tail(5)):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        entries = [json.loads(line) for line in ring_buffer.tail(5) if line.startswith("{")]
+        traced = [e for e in entries if "'traced'" in e["message"]]
+        assert traced and all(e["request_id"] == "req-trace" for e in traced)
+        assert entries[-1]["request_id"] is None
+
+
+START = 1_700_000_000.0
+
+
+def write_records(handler, count, step=1.0, level=logging.INFO):
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    for i in range(count):
+        record = logging.makeLogRecord(
+            {"msg": f"record {i:04d}", "levelno": level, "levelname": logging.getLevelName(level)}
+        )
+        record.created = START + i * step
+        record.msecs = 0
+        handler.handle(record)
+    handler.close()
+
+
+class TestLogStore:
+    def test_rotates_by_size_and_indexes(self, tmp_path):
+        """Test segments are closed at the size limit with a sparse index"""
+        path = str(tmp_path / "app.log")
+        handler = IndexedRotatingFileHandler(path, max_bytes=2000, index_interval=500)
+        write_records(handler, 200)
+
+        segments = list_segments(path)
+        assert len(segments) > 3
+        assert [s.start for s in segments] == sorted(s.start for s in segments)
+        for segment in segments:
+            entries = read_index(segment.path + ".idx")
+            assert entries[0][1] == 0
+            assert 3 <= len(entries) <= 6
+
+    def test_rotates_by_age_and_prunes(self, tmp_path):
+        """Test segments close after the interval and old ones are removed"""
+        path = str(tmp_path / "app.log")
+        handler = IndexedRotatingFileHandler(path, interval=10, backup_count=2)
+        write_records(handler, 50)
+
+        segments = list_segments(path)
+        assert len(segments) == 3
+        assert query_logs(path, limit=1000).count("record") == 30
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_query_window(self, tmp_path, compress):
+        """Test a time window returns exactly the records inside it"""
+        path = str(tmp_path / "app.log")
+        handler = IndexedRotatingFileHandler(
+            path, max_bytes=3000, compress=compress, index_interval=300
+        )
+        write_records(handler, 300)
+        if compress:
+            assert all(s.compressed for s in list_segments(path)[:-1])
+
+        logs = query_logs(path, since=START + 100, until=START + 104.5, limit=1000)
+
+        assert [line.rsplit(": ", 1)[1] for line in logs.splitlines()] == [
+            f"record {i:04d}" for i in range(100, 105)
+        ]
+
+    def test_query_level_and_limit(self, tmp_path):
+        """Test the level filter and limit keep the newest matching lines"""
+        path = str(tmp_path / "app.log")
+        handler = IndexedRotatingFileHandler(path)
+        write_records(handler, 5)
+        handler = IndexedRotatingFileHandler(path)
+        write_records(handler, 5, level=logging.ERROR)
+
+        logs = query_logs(path, level="error", limit=2)
+
+        assert logs.count("ERROR") == 2
+        assert "INFO" not in logs
+
+    def test_endpoint_window(self, tmp_path, monkeypatch):
+        """Test /api/logs forwards since/until/level to the store"""
+        path = tmp_path / "app.log"
+        write_records(IndexedRotatingFileHandler(str(path), max_bytes=1000), 60)
+        monkeypatch.setattr(settings, "LOG_FILE", str(path))
+
+        response = client.get(
+            "/api/logs",
+            params={"since": START + 10, "until": START + 12, "level": "info"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["logs"].count("record") == 3
+
+
+class TestLineFilter:
+    def test_level_and_substring(self):
+        """Test lines are kept by minimum level and text"""
+        line_filter = LineFilter("warning", "brand")
+        lines = [
+            "[t] INFO in brand: brand fetched",
+            "[t] WARNING in brand: brand missing",
+            "[t] ERROR in vehicle: vehicle failed",
+            "Traceback mentioning brand",
+        ]
+
+        assert [line for line in lines if line_filter(line)] == [
+            "[t] WARNING in brand: brand missing",
+            "Traceback mentioning brand",
+        ]
+
+    def test_continuation_lines_inherit_level(self):
+        """Test traceback lines follow the level of their record"""
+        line_filter = LineFilter("error")
+
+        assert line_filter("[t] ERROR in vehicle: failed")
+        assert line_filter("Traceback (most recent call last):")
+        assert not line_filter("[t] INFO in vehicle: ok")
+        assert not line_filter("  continuation of info")
+
+
+class TestFollowLog:
+    def test_follow_appended_lines(self, tmp_path):
+        """Test only lines appended after connecting are streamed, filtered"""
+        path = tmp_path / "app.log"
+        path.write_text("[t] ERROR in old: before connecting\n")
+
+        async def run():
+            events = []
+            stream = follow_log(
+                str(path), LineFilter("warning"), lambda: _false(), poll_interval=0.01
+            )
+
+            async def writer():
+                await asyncio.sleep(0.05)
+                with open(path, "a") as f:
+                    f.write("[t] INFO in new: skipped\n[t] ERROR in new: kept\n[t] WARN")
+                    f.flush()
+                    await asyncio.sleep(0.05)
+                    f.write("ING in new: completed later\n")
+
+            task = asyncio.create_task(writer())
+            async for event in stream:
+                events.append(event)
+                if len("".join(events).split("\n\n")) > 2:
+                    break
+            await task
+            await stream.aclose()
+            return "".join(events)
+
+        assert asyncio.run(run()) == (
+            "data: [t] ERROR in new: kept\n\n"
+            "data: [t] WARNING in new: completed later\n\n"
+        )
+
+    def test_follow_reopens_replaced_file(self, tmp_path):
+        """Test the stream continues from the start of a rotated file"""
+        path = tmp_path / "app.log"
+        path.write_text("old\n")
+
+        async def run():
+            stream = follow_log(str(path), LineFilter(), lambda: _false(), poll_interval=0.01)
+
+            async def rotate():
+                await asyncio.sleep(0.05)
+                path.rename(tmp_path / "app.log.1")
+                path.write_text("fresh\n")
+
+            task = asyncio.create_task(rotate())
+            event = await stream.__anext__()
+            await task
+            await stream.aclose()
+            return event
+
+        assert asyncio.run(run()) == "data: fresh\n\n"
+
+
+async def _false():
+    return False
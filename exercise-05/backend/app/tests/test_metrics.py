@@ -0,0 +1,159 @@
+import json
+import os
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.metrics import Metric, MetricsRegistry, registry
+from app.db import instrumentation
+
+from app.tests.conftest import client, engine
+
+
+def worker_registry(directory=None):
+    worker = MetricsRegistry(str(directory) if directory else None)
+    requests = worker.counter("requests_total", "Requests", ("route",))
+    in_flight = worker.gauge("in_flight", "In flight")
+    latency = worker.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    return worker, requests, in_flight, latency
+
+
+class TestRegistry:
+    def test_render_histogram(self):
+        """Test histogram buckets are cumulative with sum and count"""
+        worker, _, _, latency = worker_registry()
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(("/a",), value)
+
+        text = worker.render()
+
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="1"} 3' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in text
+        assert 'latency_seconds_sum{route="/a"} 3.65' in text
+        assert 'latency_seconds_count{route="/a"} 4' in text
+
+    def test_metric_types_must_implement_samples(self):
+        """Test a metric type missing snapshot or clear cannot be created"""
+
+        class Incomplete(Metric):
+            def clear(self):
+                pass
+
+        with pytest.raises(TypeError):
+            Incomplete("incomplete", "Incomplete")
+
+    def test_label_values_are_escaped(self):
+        """Test quotes, backslashes and newlines in labels are escaped"""
+        worker, requests, _, _ = worker_registry()
+        requests.inc(('say "hi"\\\n',))
+
+        assert 'requests_total{route="say \\"hi\\"\\\\\\n"} 1' in worker.render()
+
+    def test_shared_directory_merges_workers(self, tmp_path):
+        """Test snapshots of all workers are summed, dropping gauges of dead ones"""
+        worker, requests, in_flight, latency = worker_registry(tmp_path)
+        requests.inc(("/a",), 2)
+        in_flight.inc()
+        latency.observe(("/a",), 0.5)
+
+        other, other_requests, other_in_flight, other_latency = worker_registry()
+        other_requests.inc(("/a",), 3)
+        other_in_flight.inc(amount=5)
+        other_latency.observe(("/a",), 0.05)
+        snapshot = json.dumps(other.snapshot())
+        (tmp_path / f"{os.getppid()}.json").write_text(snapshot)
+        (tmp_path / "999999999.json").write_text(snapshot)
+
+        text = worker.render()
+
+        assert 'requests_total{route="/a"} 8' in text
+        assert "in_flight 6" in text
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in text
+        assert 'latency_seconds_count{route="/a"} 3' in text
+
+
+class TestMetricsEndpoint:
+    def test_requests_are_recorded_by_route_template(self, db_session):
+        """Test the middleware labels requests with the route, not the raw path"""
+        registry.clear()
+        client.get("/api/vehicles/424242")
+        client.get("/api/vehicles/424243")
+        client.get("/no/such/path")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert (
+            'http_requests_total{method="GET",route="/api/vehicles/{id}",status="404"} 2'
+            in text
+        )
+        assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+        assert "424242" not in text
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/vehicles/{id}"} 2' in text
+        assert 'http_response_size_bytes_count{method="GET",route="/api/vehicles/{id}"} 2' in text
+        # The scrape itself is still in flight while rendering.
+        assert 'http_requests_in_progress{method="GET"} 1' in text
+
+
+class TestQueryInstrumentation:
+    def test_server_timing_counts_queries(self, sample_vehicle):
+        """Test the header reports the statements the request ran"""
+        # The first request also loads the brand registry.
+        client.get(f"/api/vehicles/{sample_vehicle.id}")
+        response = client.get(f"/api/vehicles/{sample_vehicle.id}")
+
+        timing = response.headers["Server-Timing"]
+        assert timing.startswith("db;dur=")
+        assert 'desc="1 queries"' in timing
+        assert "total;dur=" in timing
+
+    def test_database_metrics_by_route(self, sample_vehicle):
+        """Test per-request query counts are recorded under the route"""
+        client.get(f"/api/vehicles/{sample_vehicle.id}")
+        registry.clear()
+        client.get(f"/api/vehicles/{sample_vehicle.id}")
+
+        text = client.get("/metrics").text
+
+        assert (
+            'db_queries_per_request_bucket{method="GET",route="/api/vehicles/{id}",le="1"} 1'
+            in text
+        )
+        assert 'db_duration_seconds_count{method="GET",route="/api/vehicles/{id}"} 1' in text
+
+    def test_failed_statements_leave_nothing_behind(self):
+        """Test a failed statement does not leak timing state on the connection"""
+        stats = instrumentation.QueryStats()
+        token = instrumentation.query_stats_var.set(stats)
+        try:
+            with engine.connect() as conn:
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM missing_table"))
+                conn.execute(text("SELECT 1"))
+                info = dict(conn.info)
+        finally:
+            instrumentation.query_stats_var.reset(token)
+
+        assert "query_started" not in info
+        assert stats.count == 1
+
+    def test_slow_query_log(self, sample_vehicle, monkeypatch):
+        """Test statements over the threshold are logged with route and parameters"""
+        client.get(f"/api/vehicles/{sample_vehicle.id}")
+        slow_logger = MagicMock()
+        monkeypatch.setattr(instrumentation, "logger", slow_logger)
+        monkeypatch.setattr(settings, "SLOW_QUERY_MS", 1e-9)
+
+        client.get(f"/api/vehicles/{sample_vehicle.id}")
+
+        message = slow_logger.warning.call_args.args[0]
+        assert message.startswith("Slow query (")
+        assert "on /api/vehicles/{id}: SELECT vehicles.id" in message
+        assert f"params=({sample_vehicle.id}, 1, 0)" in message
@@ -0,0 +1,95 @@
+from unittest.mock import patch
+
+from sqlalchemy import text
+
+from app.db.counts import approximate_count, exact_count
+from app.models.vehicle import Vehicle
+from app.tests.conftest import client
+
+
+class TestIncludeTotal:
+    def test_vehicles_without_total(self, multiple_vehicles):
+        """Test include_total=false returns the page without counting"""
+        with patch("app.services.pagination.exact_count") as counted:
+            response = client.get("/api/vehicles/?size=3&include_total=false")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 3
+        assert data["total"] is None
+        assert data["pages"] is None
+        counted.assert_not_called()
+
+    def test_brands_without_total(self, sample_brand):
+        """Test include_total=false on the brand listing"""
+        response = client.get("/api/brands/?include_total=false")
+
+        assert response.status_code == 200
+        assert response.json()["total"] is None
+        assert response.json()["items"][0]["name"] == "Toyota"
+
+    def test_total_mode_changes_etag(self, multiple_vehicles):
+        """Test pages with and without the total are not interchangeable"""
+        with_total = client.get("/api/vehicles/?size=3")
+        response = client.get(
+            "/api/vehicles/?size=3&include_total=false",
+            headers={"If-None-Match": with_total.headers["ETag"]},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["total"] is None
+
+
+class TestCountCache:
+    def test_pages_share_the_count(self, multiple_vehicles):
+        """Test the total of a filter set is counted once across pages"""
+        with patch("app.services.pagination.exact_count", wraps=exact_count) as counted:
+            first = client.get("/api/vehicles/?size=2&page=1&is_sold=false")
+            second = client.get("/api/vehicles/?size=2&page=2&is_sold=false")
+
+        assert first.json()["total"] == second.json()["total"] == 3
+        assert counted.call_count == 1
+
+    def test_write_invalidates_the_count(self, multiple_vehicles, sample_brand):
+        """Test a vehicle write makes the next listing count again"""
+        assert client.get("/api/vehicles/?size=2").json()["total"] == 5
+        client.post(
+            "/api/vehicles/",
+            json={
+                "model": "Yaris",
+                "brand_id": sample_brand.id,
+                "color": "Gray",
+                "year": 2024,
+                "description": "New",
+                "is_sold": False,
+            },
+        )
+
+        assert client.get("/api/vehicles/?size=2&page=2").json()["total"] == 6
+
+
+class TestApproximateTotal:
+    def test_uses_statistics_when_available(self, db_session, multiple_vehicles):
+        """Test unfiltered listings take the total from sqlite_stat1"""
+        db_session.execute(text("ANALYZE"))
+        db_session.commit()
+        assert approximate_count(db_session, Vehicle.__tablename__) == 5
+
+        with patch("app.services.pagination.exact_count") as counted:
+            response = client.get("/api/vehicles/?size=2&approximate_total=true")
+
+        assert response.json()["total"] == 5
+        assert response.json()["pages"] == 3
+        counted.assert_not_called()
+
+    def test_falls_back_to_exact_count(self, db_session, multiple_vehicles):
+        """Test filtered listings, or tables without statistics, are counted"""
+        db_session.execute(text("DROP TABLE IF EXISTS sqlite_stat1"))
+        db_session.commit()
+        assert approximate_count(db_session, Vehicle.__tablename__) is None
+
+        response = client.get("/api/vehicles/?approximate_total=true")
+        filtered = client.get("/api/vehicles/?approximate_total=true&color=Red")
+
+        assert response.json()["total"] == 5
+        assert filtered.json()["total"] == 1
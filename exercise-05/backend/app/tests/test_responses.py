@@ -0,0 +1,63 @@
+import pytest
+from fastapi.datastructures import DefaultPlaceholder
+
+from app.core.config import settings
+from app.core.responses import ORJSONResponse, default_response_class
+
+from app.tests.conftest import client
+
+
+class TestCompression:
+    def test_large_response_is_gzipped(self, multiple_vehicles):
+        """Test pages over the minimum size are gzip-encoded"""
+        response = client.get("/api/vehicles/", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert len(response.json()["items"]) == 5
+
+    def test_small_response_is_not_compressed(self, sample_vehicle):
+        """Test bodies under the minimum size are sent as is"""
+        response = client.get(
+            f"/api/vehicles/{sample_vehicle.id}", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert len(response.content) < settings.COMPRESSION_MINIMUM_SIZE
+        assert "content-encoding" not in response.headers
+
+    def test_brotli_preferred_when_accepted(self, multiple_vehicles):
+        """Test brotli is used when the client and server support it"""
+        pytest.importorskip("brotli")
+
+        response = client.get("/api/vehicles/", headers={"Accept-Encoding": "gzip, br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert len(response.json()["items"]) == 5
+
+
+class TestJsonResponses:
+    def test_orjson_is_opt_in(self, monkeypatch):
+        """Test FastAPI's default is kept unless ORJSON_RESPONSES is set"""
+        assert isinstance(default_response_class(), DefaultPlaceholder)
+
+        pytest.importorskip("orjson")
+        monkeypatch.setattr(settings, "ORJSON_RESPONSES", True)
+        assert default_response_class() is ORJSONResponse
+
+    def test_orjson_response_renders(self):
+        """Test the orjson response handles non-string keys"""
+        pytest.importorskip("orjson")
+
+        assert ORJSONResponse({1: "a", "b": [True, None]}).body == b'{"1":"a","b":[true,null]}'
+
+    def test_list_matches_response_model(self, multiple_vehicles):
+        """Test the direct serialization produces the declared page shape"""
+        page = client.get("/api/vehicles/?size=2").json()
+
+        assert set(page) == {"items", "total", "page", "size", "pages"}
+        assert set(page["items"][0]) == {
+            "id", "model", "brand_id", "color", "year", "description",
+            "is_sold", "created_at", "updated_at", "brand",
+        }
+        assert set(page["items"][0]["brand"]) == {"id", "name", "created_at"}
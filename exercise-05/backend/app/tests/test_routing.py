@@ -0,0 +1,168 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.db import database
+from app.db.database import Base, get_read_db
+from app.db.routing import (
+    BACKGROUND,
+    LEAST_CONNECTIONS,
+    PIN_COOKIE,
+    ReplicaSet,
+    RequestWrites,
+    RoutingSession,
+    request_writes_var,
+)
+from app.main import app
+from app.models.brand import Brand
+from app.tests.conftest import TestingSessionLocal, client, engine as test_engine
+
+
+def make_engine(path, brand_name):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(Brand(name=brand_name))
+        db.commit()
+    return engine
+
+
+@pytest.fixture
+def databases(tmp_path):
+    primary = make_engine(tmp_path / "primary.db", "Primary")
+    replicas = [make_engine(tmp_path / f"replica{i}.db", f"Replica {i}") for i in range(2)]
+    yield primary, replicas
+    for engine in [primary, *replicas]:
+        engine.dispose()
+
+
+def brand_names(db):
+    return [name for (name,) in db.query(Brand.name).order_by(Brand.id)]
+
+
+class TestRoutingSession:
+    def test_reads_go_to_a_replica(self, databases):
+        """Test reads are served by the replica"""
+        primary, replicas = databases
+        maker = sessionmaker(class_=RoutingSession, bind=primary, replicas=ReplicaSet(replicas[:1]))
+        with maker() as db:
+            assert brand_names(db) == ["Replica 0"]
+
+    def test_writes_and_later_reads_go_to_the_primary(self, databases):
+        """Test a session reads its own writes from the primary"""
+        primary, replicas = databases
+        maker = sessionmaker(class_=RoutingSession, bind=primary, replicas=ReplicaSet(replicas[:1]))
+        with maker() as db:
+            assert brand_names(db) == ["Replica 0"]
+            db.add(Brand(name="Fresh"))
+            db.flush()
+            assert brand_names(db) == ["Primary", "Fresh"]
+
+    def test_core_update_goes_to_the_primary(self, databases):
+        """Test DML statements run on the primary"""
+        primary, replicas = databases
+        maker = sessionmaker(class_=RoutingSession, bind=primary, replicas=ReplicaSet(replicas[:1]))
+        with maker() as db:
+            db.execute(update(Brand).values(name="Renamed"))
+            db.commit()
+            assert brand_names(db) == ["Renamed"]
+
+        with sessionmaker(bind=replicas[0])() as db:
+            assert brand_names(db) == ["Replica 0"]
+
+
+class TestReplicaSelection:
+    def test_round_robin(self, databases):
+        """Test sessions take the replicas in turn"""
+        primary, replicas = databases
+        maker = sessionmaker(class_=RoutingSession, bind=primary, replicas=ReplicaSet(replicas))
+        seen = []
+        for _ in range(4):
+            with maker() as db:
+                seen.extend(brand_names(db))
+        assert seen == ["Replica 0", "Replica 1", "Replica 0", "Replica 1"]
+
+    def test_least_connections(self, databases):
+        """Test a new session goes to the replica with fewer open sessions"""
+        primary, replicas = databases
+        replica_set = ReplicaSet(replicas, LEAST_CONNECTIONS)
+        maker = sessionmaker(class_=RoutingSession, bind=primary, replicas=replica_set)
+        with maker() as first:
+            assert brand_names(first) == ["Replica 0"]
+            with maker() as second:
+                assert brand_names(second) == ["Replica 1"]
+            assert replica_set.in_use == [1, 0]
+            with maker() as third:
+                assert brand_names(third) == ["Replica 1"]
+        assert replica_set.in_use == [0, 0]
+
+
+@pytest.fixture
+def routed_app(db_session, databases, monkeypatch):
+    """Route the app's read handlers to a replica of the test database."""
+    _, replicas = databases
+    monkeypatch.setattr(database.replicas, "engines", replicas[:1])
+    monkeypatch.setattr(database.replicas, "in_use", [0])
+    monkeypatch.setattr(database.replicas, "pin_seconds", 60.0)
+    monkeypatch.setattr(
+        database,
+        "ReadSessionLocal",
+        sessionmaker(class_=RoutingSession, bind=test_engine, replicas=database.replicas),
+    )
+    monkeypatch.setattr(database, "SessionLocal", TestingSessionLocal)
+    monkeypatch.delitem(app.dependency_overrides, get_read_db)
+    client.cookies.clear()
+    yield replicas[0]
+    client.cookies.clear()
+
+
+class TestReadHandlers:
+    def test_get_endpoints_read_the_replica(self, routed_app):
+        """Test listing brands is served by the replica"""
+        response = client.get("/api/brands/")
+
+        assert [b["name"] for b in response.json()["items"]] == ["Replica 0"]
+
+    def test_write_pins_the_client_to_the_primary(self, routed_app):
+        """Test the client that wrote reads its write and others do not wait"""
+        response = client.post("/api/brands/", json={"name": "Fresh"})
+        assert response.status_code == 200
+        assert PIN_COOKIE in response.cookies
+
+        response = client.get("/api/brands/")
+        assert [b["name"] for b in response.json()["items"]] == ["Fresh"]
+
+        client.cookies.clear()
+        response = client.get("/api/brands/")
+        assert [b["name"] for b in response.json()["items"]] == ["Replica 0"]
+
+    def test_pin_expires(self, routed_app):
+        """Test replicas serve the client again once its pin is over"""
+        client.cookies.set(PIN_COOKIE, str(time.time() - 1))
+
+        response = client.get("/api/brands/")
+        assert [b["name"] for b in response.json()["items"]] == ["Replica 0"]
+
+    def test_reads_do_not_pin(self, routed_app):
+        """Test responses to requests that wrote nothing set no pin"""
+        assert PIN_COOKIE not in client.get("/api/brands/").cookies
+
+
+class TestTrackWrites:
+    def test_only_request_sessions_mark_writes(self, db_session):
+        """Test commits of background sessions do not mark the request"""
+        writes = RequestWrites()
+        token = request_writes_var.set(writes)
+        try:
+            with TestingSessionLocal(info={BACKGROUND: True}) as db:
+                db.add(Brand(name="Background"))
+                db.commit()
+            assert not writes.wrote
+            with TestingSessionLocal() as db:
+                db.add(Brand(name="Client"))
+                db.commit()
+            assert writes.wrote
+        finally:
+            request_writes_var.reset(token)
@@ -0,0 +1,80 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main, seed
+from app.core.config import settings
+from app.db.instrumentation import QueryStats, query_stats_var
+from app.db.versions import BRANDS, get_version
+from app.models.brand import Brand
+
+from app.tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def seed_session(db_session, monkeypatch):
+    monkeypatch.setattr(seed, "SessionLocal", TestingSessionLocal)
+    return db_session
+
+
+def run_counted(func):
+    stats = QueryStats()
+    token = query_stats_var.set(stats)
+    try:
+        return func(), stats.count
+    finally:
+        query_stats_var.reset(token)
+
+
+class TestSeedBrands:
+    def test_seeds_missing_brands_in_one_insert(self, seed_session):
+        """Test an empty table is filled with one select and one insert"""
+        seed_session.add(Brand(name="Toyota"))
+        seed_session.commit()
+
+        inserted, queries = run_counted(seed.seed_brands)
+
+        assert inserted == len(seed.vehicle_brands) - 1
+        assert seed_session.query(Brand).count() == len(seed.vehicle_brands)
+        # Select names, insert brands, bump the version (update, then insert).
+        assert queries == 4
+        assert get_version(seed_session, BRANDS) == 1
+
+    def test_seeded_database_costs_one_query(self, seed_session):
+        """Test a second run only reads the existing names"""
+        seed.seed_brands()
+
+        inserted, queries = run_counted(seed.seed_brands)
+
+        assert inserted == 0
+        assert queries == 1
+        assert seed_session.query(Brand).count() == len(seed.vehicle_brands)
+
+
+class TestLifespan:
+    def test_initializes_on_startup(self, monkeypatch):
+        """Test the lifespan handler runs the initialization once"""
+        initialize = MagicMock()
+        job_runner = MagicMock()
+        monkeypatch.setattr(main, "initialize", initialize)
+        monkeypatch.setattr(main, "job_runner", job_runner)
+
+        with TestClient(main.app):
+            pass
+
+        initialize.assert_called_once_with()
+        job_runner.start.assert_called_once_with()
+        job_runner.stop.assert_called_once_with()
+
+    def test_initialization_can_be_disabled(self, monkeypatch):
+        """Test INIT_ON_STARTUP=false skips the initialization"""
+        initialize = MagicMock()
+        monkeypatch.setattr(main, "initialize", initialize)
+        monkeypatch.setattr(main, "job_runner", MagicMock())
+        monkeypatch.setattr(settings, "INIT_ON_STARTUP", False)
+
+        with TestClient(main.app):
+            pass
+
+        initialize.assert_not_called()
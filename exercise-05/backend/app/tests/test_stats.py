@@ -0,0 +1,120 @@
+from app.models.stats import VehicleStat
+from app.services.vehicle_stats import aggregate, rebuild_stats
+
+from app.tests.conftest import client
+
+
+def create_vehicle(brand_id, year=2021, is_sold=False):
+    response = client.post(
+        "/api/vehicles/",
+        json={
+            "model": "Corolla",
+            "brand_id": brand_id,
+            "color": "Red",
+            "year": year,
+            "is_sold": is_sold,
+        },
+    )
+    return response.json()["id"]
+
+
+class TestStatsMaintenance:
+    def test_create_updates_counters(self, db_session, sample_brand):
+        """Test created vehicles are counted in every dimension"""
+        create_vehicle(sample_brand.id, year=2021)
+        create_vehicle(sample_brand.id, year=1999, is_sold=True)
+
+        assert client.get("/api/vehicles/stats/summary").json() == {
+            "total": 2,
+            "sold": 1,
+            "unsold": 1,
+        }
+        assert client.get("/api/vehicles/stats/unsold").json() == {"unsold": 1}
+        assert client.get("/api/vehicles/stats/decades").json() == [
+            {"decade": 1990, "count": 1},
+            {"decade": 2020, "count": 1},
+        ]
+        assert client.get("/api/vehicles/stats/brands").json() == [
+            {"brand_id": sample_brand.id, "brand_name": "Toyota", "count": 2}
+        ]
+        assert client.get("/api/vehicles/stats/recent").json()["count"] == 2
+
+    def test_patch_and_delete_move_counters(self, db_session, sample_brand):
+        """Test updates and deletes keep the counters in sync"""
+        id = create_vehicle(sample_brand.id, year=2021)
+        client.patch(f"/api/vehicles/{id}", json={"is_sold": True, "year": 2005})
+
+        assert client.get("/api/vehicles/stats/unsold").json() == {"unsold": 0}
+        assert client.get("/api/vehicles/stats/decades").json() == [
+            {"decade": 2000, "count": 1}
+        ]
+
+        client.delete(f"/api/vehicles/{id}")
+        assert client.get("/api/vehicles/stats/summary").json()["total"] == 0
+
+    def test_bulk_operations_update_counters(self, db_session, sample_brand):
+        """Test bulk writes maintain the counters"""
+        payload = [
+            {"model": "Corolla", "brand_id": sample_brand.id, "color": "Red", "year": 2021}
+            for _ in range(3)
+        ]
+        ids = [r["id"] for r in client.post("/api/vehicles/bulk", json=payload).json()["results"]]
+        client.patch("/api/vehicles/bulk", json=[{"id": ids[0], "is_sold": True}])
+        client.request("DELETE", "/api/vehicles/bulk", json=[ids[1]])
+
+        assert client.get("/api/vehicles/stats/summary").json() == {
+            "total": 2,
+            "sold": 1,
+            "unsold": 1,
+        }
+
+    def test_counters_match_base_table(self, db_session, sample_brand):
+        """Test incrementally maintained counters equal a full recount"""
+        for year in (2001, 2011, 2021):
+            create_vehicle(sample_brand.id, year=year)
+        id = create_vehicle(sample_brand.id, year=1990)
+        client.put(
+            f"/api/vehicles/{id}",
+            json={"model": "X", "brand_id": sample_brand.id, "color": "Red", "year": 2022, "is_sold": True},
+        )
+
+        maintained = {
+            (s.dimension, s.key): s.count
+            for s in db_session.query(VehicleStat)
+            if s.count
+        }
+        assert maintained == dict(aggregate(db_session))
+
+    def test_brand_delete_removes_its_vehicles(self, db_session, sample_brand):
+        """Test deleting a brand subtracts its cascaded vehicles"""
+        create_vehicle(sample_brand.id)
+        client.delete(f"/api/brands/{sample_brand.id}")
+
+        assert client.get("/api/vehicles/stats/summary").json()["total"] == 0
+        assert client.get("/api/vehicles/stats/brands").json() == []
+
+
+class TestStatsRebuild:
+    def test_rebuild_from_base_table(self, db_session, multiple_vehicles):
+        """Test the rebuild reconciles counters with existing rows"""
+        assert client.get("/api/vehicles/stats/summary").json()["total"] == 0
+
+        response = client.post("/api/vehicles/stats/rebuild")
+
+        assert response.status_code == 200
+        assert client.get("/api/vehicles/stats/summary").json() == {
+            "total": 5,
+            "sold": 2,
+            "unsold": 3,
+        }
+        assert client.get("/api/vehicles/stats/recent?days=1").json()["count"] == 5
+
+    def test_rebuild_is_idempotent(self, db_session, multiple_vehicles):
+        """Test rebuilding twice gives the same counters"""
+        first = rebuild_stats(db_session)
+        second = rebuild_stats(db_session)
+
+        assert first == second
+        assert client.get("/api/vehicles/stats/decades").json() == [
+            {"decade": 2020, "count": 5}
+        ]
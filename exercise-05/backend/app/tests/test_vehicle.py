@@ -1,15 +1,17 @@
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch, MagicMock
+from sqlalchemy import event
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.main import app
 from app.db.database import get_db
+from app.db.versions import VEHICLES, get_version
 from app.models.vehicle import Vehicle
 from app.models.brand import Brand
 from app.schemas.vehicle import VehicleCreate, VehicleUpdate, VehiclePatch
 
-from app.tests.conftest import client, override_get_db
+from app.tests.conftest import client, engine, override_get_db
 
 
 class TestGetVehicles:
@@ -264,6 +266,13 @@ class TestPatchVehicle:
         assert response.status_code == 404
         assert "Vehicle not found" in response.json()["detail"]
 
+    def test_patch_vehicle_invalid_brand(self, db_session, sample_vehicle):
+        """Test patching to an unknown brand is rejected by the foreign key"""
+        response = client.patch(f"/api/vehicles/{sample_vehicle.id}", json={"brand_id": 999})
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Brand not found"
+
     def test_patch_vehicle_database_error(self, db_session, sample_vehicle):
         """Test database error during vehicle patch"""
         mock_session = MagicMock()
@@ -390,6 +399,67 @@ class TestIntegration:
         assert len(get_after_delete_response.json()["items"]) == 0
 
 
+@pytest.fixture
+def vehicle_statements():
+    """SQL statements that touch the vehicles table, in order."""
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "vehicles " in statement and "vehicle_stats" not in statement:
+            seen.append(" ".join(statement.split()))
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(engine, "before_cursor_execute", record)
+
+
+class TestSingleStatementWrites:
+    def test_patch_is_one_update_returning(self, sample_vehicle, vehicle_statements):
+        """Test a patch writes and reads the row back in one statement"""
+        response = client.patch(f"/api/vehicles/{sample_vehicle.id}", json={"color": "Red"})
+
+        assert response.status_code == 200
+        assert response.json()["brand"]["name"] == "Toyota"
+        assert len(vehicle_statements) == 1
+        assert vehicle_statements[0].startswith("UPDATE vehicles SET color=?")
+        assert "RETURNING" in vehicle_statements[0]
+
+    def test_update_keeps_stats_in_step(self, sample_vehicle):
+        """Test a full update moves the vehicle between stats groups"""
+        update_data = {
+            "model": "Camry",
+            "brand_id": sample_vehicle.brand_id,
+            "color": "Blue",
+            "year": 1999,
+            "description": "Older",
+            "is_sold": True,
+        }
+        response = client.put(f"/api/vehicles/{sample_vehicle.id}", json=update_data)
+
+        assert response.status_code == 200
+        assert client.get("/api/vehicles/stats/decades").json() == [
+            {"decade": 1990, "count": 1}
+        ]
+        assert client.get("/api/vehicles/stats/summary").json()["sold"] == 1
+
+    def test_delete_is_one_delete_returning(self, sample_vehicle, vehicle_statements):
+        """Test a delete does not load the row first"""
+        response = client.delete(f"/api/vehicles/{sample_vehicle.id}")
+
+        assert response.status_code == 204
+        assert len(vehicle_statements) == 1
+        assert vehicle_statements[0].startswith("DELETE FROM vehicles WHERE")
+        assert client.get("/api/vehicles/stats/summary").json()["total"] == 0
+
+    def test_missing_vehicle_does_not_bump_version(self, db_session):
+        """Test a write to a missing vehicle leaves caches valid"""
+        before = get_version(db_session, VEHICLES)
+
+        assert client.patch("/api/vehicles/999", json={"color": "Red"}).status_code == 404
+        assert client.delete("/api/vehicles/999").status_code == 404
+        assert get_version(db_session, VEHICLES) == before
+
+
 # Additional fixtures and utilities
 @pytest.fixture
 def multiple_vehicles(db_session, sample_brand):
@@ -0,0 +1,252 @@
+from collections import Counter
+from datetime import timedelta
+
+from sqlalchemy import func, select, update
+
+from app.models.job import Job
+from app.models.vehicle import Vehicle
+from app.models.vehicle_archive import VehicleArchive
+from app.services.job_handlers import ARCHIVE_VEHICLES, JOB_TYPES
+from app.services.jobs import JobRunner, utcnow
+from app.services.vehicle_archive import archive_sold_vehicles
+from app.services.vehicle_stats import aggregate
+
+from app.tests.conftest import TestingSessionLocal, client, engine
+
+
+def age_vehicles(db_session, days=200):
+    db_session.execute(
+        update(Vehicle).values(updated_at=utcnow() - timedelta(days=days))
+    )
+    db_session.commit()
+
+
+def archive(db_session, days=90, chunk_size=1000):
+    return archive_sold_vehicles(engine, utcnow() - timedelta(days=days), chunk_size)
+
+
+def listing(**params):
+    response = client.get("/api/vehicles/", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def models(page):
+    return [item["model"] for item in page["items"]]
+
+
+class TestArchival:
+    def test_moves_old_sold_vehicles(self, db_session, multiple_vehicles):
+        """Test old sold vehicles move to the archive with their ids"""
+        corolla, highlander = multiple_vehicles[1].id, multiple_vehicles[4].id
+        age_vehicles(db_session)
+        counts = aggregate(db_session)
+
+        assert archive(db_session) == 2
+
+        archived = db_session.execute(
+            select(VehicleArchive.id, VehicleArchive.model).order_by(VehicleArchive.id)
+        ).all()
+        assert archived == [(corolla, "Corolla"), (highlander, "Highlander")]
+        assert db_session.get(Vehicle, corolla) is None
+        total = aggregate(db_session) + aggregate(db_session, model=VehicleArchive)
+        assert total == counts
+
+    def test_recent_sales_stay(self, db_session, multiple_vehicles):
+        """Test sold vehicles changed within the age are not archived"""
+        assert archive(db_session) == 0
+
+    def test_chunks(self, db_session, sample_brand):
+        """Test archival commits a chunk at a time until nothing is due"""
+        payload = [
+            {"model": "Corolla", "brand_id": sample_brand.id, "color": "Red", "year": 2021, "is_sold": True}
+            for _ in range(7)
+        ]
+        client.post("/api/vehicles/bulk", json=payload)
+        age_vehicles(db_session)
+
+        assert archive(db_session, chunk_size=2) == 7
+
+        assert db_session.execute(select(func.count(Vehicle.id))).scalar() == 0
+        assert db_session.execute(select(func.count(VehicleArchive.id))).scalar() == 7
+
+    def test_archived_ids_are_not_reused(self, db_session, multiple_vehicles):
+        """Test a vehicle created after the newest ones were archived or
+        deleted gets an id of its own"""
+        age_vehicles(db_session)
+        archive(db_session)
+        newest = max(v.id for v in db_session.query(Vehicle))
+        client.delete(f"/api/vehicles/{newest}")
+        brand_id = db_session.execute(select(Vehicle.brand_id)).scalars().first()
+
+        response = client.post(
+            "/api/vehicles/",
+            json={"model": "Yaris", "brand_id": brand_id, "color": "Red", "year": 2022},
+        )
+
+        archived = db_session.execute(select(func.max(VehicleArchive.id))).scalar()
+        assert response.json()["id"] > max(newest, archived)
+
+
+class TestReads:
+    def test_listing_reads_archive_for_sold_vehicles(self, db_session, multiple_vehicles):
+        """Test archived vehicles are listed only with is_sold=true or
+        include_archived"""
+        age_vehicles(db_session)
+        archive(db_session)
+
+        assert "Corolla" not in models(listing())
+        assert models(listing(is_sold=True)) == ["Corolla", "Highlander"]
+        assert listing(is_sold=True)["total"] == 2
+        assert "Corolla" not in models(listing(is_sold=False))
+        everything = listing(include_archived=True)
+        assert models(everything) == ["Camry", "Corolla", "Prius", "RAV4", "Highlander"]
+        assert everything["total"] == 5
+        assert listing(include_archived=True, color="Red")["total"] == 1
+
+    def test_listing_pages_across_both_tables(self, db_session, multiple_vehicles):
+        """Test pages of the combined listing follow the listing order"""
+        age_vehicles(db_session)
+        archive(db_session)
+
+        pages = [models(listing(include_archived=True, page=page, size=2)) for page in (1, 2, 3)]
+
+        assert pages == [["Camry", "Corolla"], ["Prius", "RAV4"], ["Highlander"]]
+
+    def test_search_reads_archive_for_sold_vehicles(self, db_session, multiple_vehicles):
+        """Test search finds archived vehicles like the listing does"""
+        age_vehicles(db_session)
+        archive(db_session)
+
+        def search(**params):
+            response = client.get("/api/vehicles/search", params=params)
+            assert response.status_code == 200
+            return response.json()
+
+        assert search(q="corolla", is_sold=True)["total"] == 1
+        assert search(q="corolla", include_archived=True)["items"][0]["brand"]["name"] == "Toyota"
+        assert search(q="corolla")["total"] == 0
+        assert search(q="corolla", is_sold=False)["total"] == 0
+
+    def test_get_vehicle_falls_back_to_archive(self, db_session, multiple_vehicles):
+        """Test an archived vehicle is still found by id"""
+        id = multiple_vehicles[1].id
+        age_vehicles(db_session)
+        archive(db_session)
+
+        response = client.get(f"/api/vehicles/{id}")
+
+        assert response.status_code == 200
+        assert response.json()["model"] == "Corolla"
+        assert response.json()["brand"]["name"] == "Toyota"
+
+    def test_export_includes_archive_for_sold_vehicles(self, db_session, multiple_vehicles):
+        """Test the export reads the archive like the listing"""
+        age_vehicles(db_session)
+        archive(db_session)
+
+        sold = client.get("/api/vehicles/export", params={"format": "csv", "is_sold": True})
+        default = client.get("/api/vehicles/export", params={"format": "csv"})
+
+        assert [line.split(",")[1] for line in sold.text.splitlines()[1:]] == [
+            "Corolla",
+            "Highlander",
+        ]
+        assert "Corolla" not in default.text
+
+
+class TestWrites:
+    def test_archived_vehicle_is_read_only_but_deletable(self, db_session, multiple_vehicles):
+        """Test updates of an archived vehicle conflict and deletes remove
+        it from the archive and the stats"""
+        id = multiple_vehicles[1].id
+        age_vehicles(db_session)
+        archive(db_session)
+        client.post("/api/vehicles/stats/rebuild")
+
+        response = client.patch(f"/api/vehicles/{id}", json={"is_sold": False})
+        assert response.status_code == 409
+
+        assert client.delete(f"/api/vehicles/{id}").status_code == 204
+        assert client.get(f"/api/vehicles/{id}").status_code == 404
+        assert client.get("/api/vehicles/stats/summary").json()["total"] == 4
+
+    def test_bulk_writes_treat_archived_vehicles_like_single_ones(
+        self, db_session, multiple_vehicles
+    ):
+        """Test bulk patches report archived vehicles and bulk deletes remove
+        them from the archive and the stats"""
+        corolla, camry = multiple_vehicles[1].id, multiple_vehicles[0].id
+        age_vehicles(db_session)
+        archive(db_session)
+        client.post("/api/vehicles/stats/rebuild")
+
+        patched = client.patch(
+            "/api/vehicles/bulk", json=[{"id": corolla, "color": "Blue"}, {"id": 999}]
+        ).json()
+        deleted = client.request(
+            "DELETE", "/api/vehicles/bulk", json=[corolla, camry, 999]
+        ).json()
+
+        assert [r["detail"] for r in patched["results"]] == [
+            "Archived vehicles cannot be modified",
+            "Vehicle not found",
+        ]
+        assert [r["status"] for r in deleted["results"]] == ["deleted", "deleted", "error"]
+        assert db_session.get(VehicleArchive, corolla) is None
+        assert client.get("/api/vehicles/stats/summary").json()["total"] == 3
+
+    def test_brand_delete_removes_archived_vehicles(self, db_session, multiple_vehicles):
+        """Test brand deletes cascade to the archive and keep the stats in step"""
+        brand_id = multiple_vehicles[0].brand_id
+        age_vehicles(db_session)
+        archive(db_session)
+        client.post("/api/vehicles/stats/rebuild")
+
+        assert client.delete(f"/api/brands/{brand_id}").status_code == 204
+
+        assert db_session.execute(select(func.count(VehicleArchive.id))).scalar() == 0
+        assert client.get("/api/vehicles/stats/summary").json()["total"] == 0
+
+    def test_rebuild_counts_archive(self, db_session, multiple_vehicles):
+        """Test the stats rebuild includes archived vehicles"""
+        age_vehicles(db_session)
+        archive(db_session)
+
+        client.post("/api/vehicles/stats/rebuild")
+
+        assert client.get("/api/vehicles/stats/summary").json() == {
+            "total": 5,
+            "sold": 2,
+            "unsold": 3,
+        }
+
+
+class TestArchiveJob:
+    def test_archive_job(self, db_session, multiple_vehicles, job_runner):
+        """Test archival runs as a job with the requested age"""
+        response = client.post(
+            "/api/jobs/", json={"type": "archive_vehicles", "params": {"older_than_days": 0}}
+        )
+        assert response.status_code == 202
+
+        assert job_runner.run_next()
+
+        job = client.get(response.headers["Location"]).json()
+        assert job["status"] == "succeeded"
+        assert job["result"] == {"vehicles": 2}
+
+    def test_scheduled_once_per_interval(self, db_session):
+        """Test a scheduled type is queued again only after its interval"""
+        runner = JobRunner(
+            TestingSessionLocal, JOB_TYPES, {}, 1, "unused", schedules={ARCHIVE_VEHICLES: 3600}
+        )
+
+        assert runner.submit_scheduled() == 1
+        assert runner.submit_scheduled() == 0
+        db_session.execute(update(Job).values(created_at=utcnow() - timedelta(hours=2)))
+        db_session.commit()
+        assert runner.submit_scheduled() == 1
+
+        types = Counter(db_session.execute(select(Job.type)).scalars())
+        assert types == {ARCHIVE_VEHICLES: 2}
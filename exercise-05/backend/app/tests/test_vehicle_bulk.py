@@ -0,0 +1,93 @@
+from app.models.vehicle import Vehicle
+
+from app.tests.conftest import client
+
+
+def vehicle_payload(brand_id, model="Corolla"):
+    return {
+        "model": model,
+        "brand_id": brand_id,
+        "color": "Red",
+        "year": 2021,
+        "description": "Compact car",
+        "is_sold": False,
+    }
+
+
+class TestBulkCreate:
+    def test_bulk_create_success(self, db_session, sample_brand):
+        """Test several vehicles are created in one request"""
+        payload = [vehicle_payload(sample_brand.id, f"Model {i}") for i in range(5)]
+        response = client.post("/api/vehicles/bulk?batch_size=2", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["succeeded"] == 5
+        assert data["failed"] == 0
+        ids = [r["id"] for r in data["results"]]
+        created = {v.id: v.model for v in db_session.query(Vehicle).all()}
+        assert [created[i] for i in ids] == [f"Model {i}" for i in range(5)]
+
+    def test_bulk_create_reports_invalid_brand(self, db_session, sample_brand):
+        """Test rows with unknown brands fail without aborting the others"""
+        payload = [vehicle_payload(sample_brand.id), vehicle_payload(999)]
+        response = client.post("/api/vehicles/bulk", json=payload)
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results[0]["status"] == "created"
+        assert results[1] == {
+            "index": 1,
+            "id": None,
+            "status": "error",
+            "detail": "Brand not found",
+        }
+        assert db_session.query(Vehicle).count() == 1
+
+    def test_bulk_create_invalid_data(self, db_session):
+        """Test schema validation still applies to every item"""
+        response = client.post("/api/vehicles/bulk", json=[{}])
+
+        assert response.status_code == 422
+
+
+class TestBulkPatch:
+    def test_bulk_patch_success(self, db_session, multiple_vehicles):
+        """Test patching several vehicles with different fields"""
+        payload = [
+            {"id": multiple_vehicles[0].id, "color": "Green"},
+            {"id": multiple_vehicles[1].id, "is_sold": False, "year": 2000},
+            {"id": 999, "color": "Green"},
+        ]
+        response = client.patch("/api/vehicles/bulk", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["succeeded"] == 2
+        assert data["results"][2]["detail"] == "Vehicle not found"
+
+        db_session.expire_all()
+        first = db_session.get(Vehicle, multiple_vehicles[0].id)
+        second = db_session.get(Vehicle, multiple_vehicles[1].id)
+        assert first.color == "Green"
+        assert (second.is_sold, second.year) == (False, 2000)
+
+    def test_bulk_patch_invalid_brand(self, db_session, sample_vehicle):
+        """Test patching to an unknown brand is rejected per item"""
+        payload = [{"id": sample_vehicle.id, "brand_id": 999}]
+        response = client.patch("/api/vehicles/bulk", json=payload)
+
+        assert response.json()["results"][0]["detail"] == "Brand not found"
+
+
+class TestBulkDelete:
+    def test_bulk_delete_success(self, db_session, multiple_vehicles):
+        """Test deleting several vehicles by id"""
+        ids = [v.id for v in multiple_vehicles[:3]] + [999]
+        response = client.request("DELETE", "/api/vehicles/bulk", json=ids)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["succeeded"] == 3
+        assert data["results"][3]["status"] == "error"
+        assert db_session.query(Vehicle).count() == 2
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+
+from app.models.vehicle import Vehicle
+
+from app.tests.conftest import client
+
+
+class TestExportVehicles:
+    def test_export_ndjson(self, db_session, multiple_vehicles):
+        """Test every vehicle is streamed as one JSON line with its brand"""
+        response = client.get("/api/vehicles/export?format=ndjson")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["model"] for r in rows] == [v.model for v in multiple_vehicles]
+        assert rows[0]["brand"]["name"] == "Toyota"
+
+    def test_export_csv_with_filters(self, db_session, multiple_vehicles):
+        """Test CSV export honours the listing filters"""
+        response = client.get("/api/vehicles/export?format=csv&is_sold=true")
+
+        assert response.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [r["model"] for r in rows] == ["Corolla", "Highlander"]
+        assert rows[0]["brand_name"] == "Toyota"
+
+    def test_export_keeps_vehicles_without_brand(self, db_session, sample_brand):
+        """Test brandless vehicles are exported with an empty brand"""
+        db_session.add(Vehicle(model="Kit car", color="Green", year=1999))
+        db_session.commit()
+
+        ndjson = client.get("/api/vehicles/export?format=ndjson")
+        rows = list(csv.DictReader(io.StringIO(client.get("/api/vehicles/export?format=csv").text)))
+
+        assert json.loads(ndjson.text)["brand"] is None
+        assert [(r["model"], r["brand_id"], r["brand_name"]) for r in rows] == [("Kit car", "", "")]
+
+    def test_export_streams_in_partitions(self, db_session, multiple_vehicles):
+        """Test a small yield_per still returns every row"""
+        from app.core.config import settings
+
+        original = settings.EXPORT_YIELD_PER
+        settings.EXPORT_YIELD_PER = 2
+        try:
+            response = client.get("/api/vehicles/export")
+        finally:
+            settings.EXPORT_YIELD_PER = original
+
+        assert len(response.text.splitlines()) == 5
+
+    def test_export_invalid_format(self, db_session):
+        """Test unsupported formats are rejected"""
+        response = client.get("/api/vehicles/export?format=xml")
+
+        assert response.status_code == 422
+
+    def test_export_nonexistent_brand(self, db_session):
+        """Test filtering by an unknown brand returns 404"""
+        response = client.get("/api/vehicles/export?brand_id=999")
+
+        assert response.status_code == 404
@@ -0,0 +1,70 @@
+import io
+import json
+
+from app.models.vehicle import Vehicle
+from app.services.vehicle_import import import_vehicles
+
+from app.tests.conftest import client
+
+
+CSV_FILE = """model,brand_id,brand_name,color,year,description,is_sold
+Corolla,,Toyota,Red,2021,Compact,false
+Camry,{brand_id},,Blue,2020,,true
+Civic,,Honda,Black,2019,,
+Prius,,toyota,White,not-a-year,,
+"""
+
+
+class TestImportVehicles:
+    def test_import_csv(self, db_session, sample_brand):
+        """Test CSV rows are imported and failures reported per row"""
+        content = CSV_FILE.format(brand_id=sample_brand.id)
+        response = client.post(
+            "/api/vehicles/import",
+            files={"file": ("vehicles.csv", content, "text/csv")},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["rows"], data["imported"], data["failed"]) == (4, 2, 2)
+        assert [e["row"] for e in data["errors"]] == [3, 4]
+        assert "Honda" in data["errors"][0]["detail"]
+        assert "year" in data["errors"][1]["detail"]
+
+        camry = db_session.query(Vehicle).filter(Vehicle.model == "Camry").one()
+        assert camry.is_sold is True
+        assert camry.description is None
+
+    def test_import_ndjson_in_chunks(self, db_session, sample_brand):
+        """Test NDJSON import with a chunk smaller than the file"""
+        lines = [
+            json.dumps({"model": f"Model {i}", "brand_id": sample_brand.id, "color": "Red", "year": 2020})
+            for i in range(5)
+        ]
+        lines.insert(2, "{not json")
+        response = client.post(
+            "/api/vehicles/import?chunk_size=2",
+            files={"file": ("vehicles.ndjson", "\n".join(lines), "application/x-ndjson")},
+        )
+
+        data = response.json()
+        assert (data["imported"], data["failed"]) == (5, 1)
+        assert data["errors"][0]["row"] == 3
+        assert data["rows_per_second"] > 0
+        assert db_session.query(Vehicle).filter(Vehicle.is_sold == False).count() == 5
+
+    def test_import_unknown_format(self, db_session):
+        """Test files without a recognizable format are rejected"""
+        response = client.post(
+            "/api/vehicles/import",
+            files={"file": ("vehicles.txt", "model\n", "text/plain")},
+        )
+
+        assert response.status_code == 400
+
+    def test_import_from_stream(self, db_session, sample_brand):
+        """Test the importer used by the CLI works on any text stream"""
+        stream = io.StringIO(CSV_FILE.format(brand_id=sample_brand.id))
+        result = import_vehicles(db_session, stream, "csv", chunk_size=1)
+
+        assert result.imported == 2
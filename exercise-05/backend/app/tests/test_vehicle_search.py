@@ -0,0 +1,84 @@
+from sqlalchemy import create_engine, text
+
+from app.db.database import Base
+from app.db.search import ensure_search_index
+from app.models.vehicle import Vehicle
+
+from app.tests.conftest import client
+
+
+def search(query):
+    response = client.get(f"/api/vehicles/search?{query}")
+    assert response.status_code == 200
+    return [item["model"] for item in response.json()["items"]]
+
+
+class TestSearchVehicles:
+    def test_search_model_prefix(self, db_session, multiple_vehicles):
+        """Test partial words match the start of model names"""
+        assert search("q=coro") == ["Corolla"]
+        assert search("q=HIGH") == ["Highlander"]
+
+    def test_search_description(self, db_session, multiple_vehicles):
+        """Test words in the description are searchable"""
+        assert sorted(search("q=suv")) == ["Highlander", "RAV4"]
+
+    def test_search_ranks_better_matches_first(self, db_session, sample_brand):
+        """Test vehicles matching the term more often rank higher"""
+        for model, description in [
+            ("Sienna", "Family van"),
+            ("Hiace", "Van van van, the cargo van"),
+        ]:
+            db_session.add(
+                Vehicle(model=model, brand_id=sample_brand.id, color="White", year=2020, description=description)
+            )
+        db_session.commit()
+
+        assert search("q=van") == ["Hiace", "Sienna"]
+
+    def test_search_all_terms_required(self, db_session, multiple_vehicles):
+        """Test every term has to match"""
+        assert search("q=large+suv") == ["Highlander"]
+
+    def test_search_with_filters_and_pagination(self, db_session, multiple_vehicles):
+        """Test search composes with the listing filters and pages"""
+        assert search("q=suv&is_sold=true") == ["Highlander"]
+        response = client.get("/api/vehicles/search?q=suv&size=1")
+        assert response.json()["total"] == 2
+        assert len(response.json()["items"]) == 1
+
+    def test_search_index_follows_writes(self, db_session, sample_vehicle):
+        """Test updates and deletes are reflected through the triggers"""
+        client.patch(f"/api/vehicles/{sample_vehicle.id}", json={"model": "Crown"})
+        assert search("q=camry") == []
+        assert search("q=crown") == ["Crown"]
+
+        client.delete(f"/api/vehicles/{sample_vehicle.id}")
+        assert search("q=crown") == []
+
+    def test_search_requires_words(self, db_session):
+        """Test queries without searchable characters are rejected"""
+        assert client.get("/api/vehicles/search?q=%25%25").status_code == 400
+        assert client.get("/api/vehicles/search").status_code == 422
+
+
+class TestSearchIndexMigration:
+    def test_ensure_backfills_existing_rows(self, tmp_path):
+        """Test the index is built for rows inserted before it existed"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE vehicles_fts"))
+            conn.execute(text("DROP TRIGGER vehicles_fts_ai"))
+            conn.execute(
+                text("INSERT INTO vehicles (model, brand_id, color, year) VALUES ('Corolla', 1, 'Red', 2020)")
+            )
+
+        ensure_search_index(engine)
+        ensure_search_index(engine)
+
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT rowid FROM vehicles_fts WHERE vehicles_fts MATCH 'corol*'")
+            ).all()
+        assert len(rows) == 1
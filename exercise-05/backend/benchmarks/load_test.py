@@ -0,0 +1,435 @@
+"""Drive the API with scripted request mixes and report throughput and
+latency percentiles per route.
+
+Runs are closed-loop: ``--concurrency`` workers each send their next
+request as soon as the previous one returns, for ``--duration`` seconds
+after a ``--warmup`` that is not measured. Every worker draws from its own
+seeded generator, so the same arguments replay the same request mix.
+
+With ``--spawn`` the driver loads a synthetic data set
+(``benchmarks/load_data.py``) into a temporary SQLite database, or into
+``--database-url``, and starts uvicorn on it, so a run needs no other
+service. Without it, the driver targets ``--base-url``.
+
+``--output`` writes the results as JSON, tagged with the git commit;
+``--compare`` prints the change against an earlier report.
+
+    python -m benchmarks.load_test --spawn --scenario mixed --duration 30
+    python -m benchmarks.load_test --base-url http://localhost:8005 --scenario read
+    python -m benchmarks.load_test --spawn --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+from sqlalchemy.engine import make_url
+
+from benchmarks.load_data import COLORS, WORDS
+
+API = "/api"
+PAGE_SIZE = 50
+
+
+@dataclass
+class Context:
+    """What the operations need to know about the data set."""
+
+    brand_ids: List[int]
+    vehicle_ids: List[int]
+    vehicles: int
+
+    @property
+    def pages(self) -> int:
+        return max(1, math.ceil(self.vehicles / PAGE_SIZE))
+
+
+Request = Tuple[str, str, Optional[dict]]
+
+
+@dataclass
+class Operation:
+    name: str
+    route: str
+    build: Callable[[random.Random, Context], Request]
+
+
+def list_filtered(rng: random.Random, ctx: Context) -> Request:
+    filters = {
+        "brand_id": rng.choice(ctx.brand_ids),
+        "year": rng.randrange(1980, 2026),
+        "color": rng.choice(COLORS),
+        "is_sold": rng.choice(["true", "false"]),
+    }
+    chosen = rng.sample(sorted(filters), rng.randrange(1, 3))
+    query = "&".join(f"{name}={filters[name]}" for name in chosen)
+    return "GET", f"{API}/vehicles/?size={PAGE_SIZE}&{query}", None
+
+
+def deep_page(rng: random.Random, ctx: Context) -> Request:
+    # The last tenth of the listing, where OFFSET has the most rows to skip.
+    page = rng.randrange(max(1, ctx.pages * 9 // 10), ctx.pages + 1)
+    return "GET", f"{API}/vehicles/?size={PAGE_SIZE}&page={page}", None
+
+
+def get_by_id(rng: random.Random, ctx: Context) -> Request:
+    return "GET", f"{API}/vehicles/{rng.choice(ctx.vehicle_ids)}", None
+
+
+def list_brands(rng: random.Random, ctx: Context) -> Request:
+    page = rng.randrange(1, max(1, math.ceil(len(ctx.brand_ids) / PAGE_SIZE)) + 1)
+    return "GET", f"{API}/brands/?size={PAGE_SIZE}&page={page}", None
+
+
+def create(rng: random.Random, ctx: Context) -> Request:
+    body = {
+        "model": f"{rng.choice(WORDS).title()} {rng.randrange(1, 500)}",
+        "brand_id": rng.choice(ctx.brand_ids),
+        "color": rng.choice(COLORS),
+        "year": rng.randrange(1980, 2026),
+        "description": " ".join(rng.sample(WORDS, 3)),
+        "is_sold": False,
+    }
+    return "POST", f"{API}/vehicles/", body
+
+
+def patch(rng: random.Random, ctx: Context) -> Request:
+    body = {"color": rng.choice(COLORS), "is_sold": rng.random() < 0.5}
+    return "PATCH", f"{API}/vehicles/{rng.choice(ctx.vehicle_ids)}", body
+
+
+OPERATIONS = {
+    op.name: op
+    for op in [
+        Operation("list_filtered", "GET /api/vehicles/", list_filtered),
+        Operation("deep_page", "GET /api/vehicles/", deep_page),
+        Operation("get_by_id", "GET /api/vehicles/{id}", get_by_id),
+        Operation("list_brands", "GET /api/brands/", list_brands),
+        Operation("create", "POST /api/vehicles/", create),
+        Operation("patch", "PATCH /api/vehicles/{id}", patch),
+    ]
+}
+
+# Operation weights per scenario.
+SCENARIOS: Dict[str, Dict[str, int]] = {
+    "read": {"list_filtered": 4, "deep_page": 1, "get_by_id": 4, "list_brands": 1},
+    "write": {"create": 1, "patch": 1},
+    "mixed": {
+        "list_filtered": 3,
+        "deep_page": 1,
+        "get_by_id": 3,
+        "list_brands": 1,
+        "create": 1,
+        "patch": 1,
+    },
+}
+
+
+@dataclass
+class Samples:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    scenario: Dict[str, int],
+    rng: random.Random,
+    ctx: Context,
+    samples: Dict[str, Samples],
+    measure_from: float,
+    deadline: float,
+) -> None:
+    names = list(scenario)
+    weights = [scenario[name] for name in names]
+    while time.perf_counter() < deadline:
+        op = OPERATIONS[rng.choices(names, weights)[0]]
+        method, url, body = op.build(rng, ctx)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, json=body)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        elapsed = time.perf_counter() - started
+
+        if started >= measure_from:
+            samples[op.name].latencies.append(elapsed)
+            if not ok:
+                samples[op.name].errors += 1
+        if op.name == "create" and ok:
+            ctx.vehicle_ids.append(response.json()["id"])
+
+
+async def discover(client: httpx.AsyncClient) -> Context:
+    """Read brand ids, the vehicle count and a sample of vehicle ids."""
+    brand_ids: List[int] = []
+    page = 1
+    while True:
+        data = (await client.get(f"{API}/brands/?size=100&page={page}")).raise_for_status().json()
+        brand_ids.extend(item["id"] for item in data["items"])
+        if page >= (data["pages"] or 0):
+            break
+        page += 1
+
+    first = (await client.get(f"{API}/vehicles/?size=100")).raise_for_status().json()
+    vehicles = first["total"]
+    vehicle_ids = [item["id"] for item in first["items"]]
+    # A few pages spread over the listing, not only the newest rows.
+    pages = max(1, math.ceil(vehicles / 100))
+    for page in sorted({1 + pages * i // 10 for i in range(10)}):
+        data = (await client.get(f"{API}/vehicles/?size=100&page={page}")).json()
+        vehicle_ids.extend(item["id"] for item in data["items"])
+    if not brand_ids or not vehicle_ids:
+        raise SystemExit("The target has no data; load it with benchmarks.load_data or use --spawn")
+    return Context(brand_ids, sorted(set(vehicle_ids)), vehicles)
+
+
+async def run(args, base_url: str) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        ctx = await discover(client)
+        samples: Dict[str, Samples] = defaultdict(Samples)
+        started = time.perf_counter()
+        measure_from = started + args.warmup
+        deadline = measure_from + args.duration
+        await asyncio.gather(
+            *(
+                worker(
+                    client,
+                    SCENARIOS[args.scenario],
+                    random.Random(args.seed + i),
+                    ctx,
+                    samples,
+                    measure_from,
+                    deadline,
+                )
+                for i in range(args.concurrency)
+            )
+        )
+        measured = time.perf_counter() - measure_from
+    return summarize(samples, measured) | {
+        "dataset": {"brands": len(ctx.brand_ids), "vehicles": ctx.vehicles},
+        "seconds": round(measured, 2),
+    }
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+def latency_summary(latencies: List[float], errors: int, seconds: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / seconds, 1) if seconds else 0.0,
+        **{
+            f"p{p}_ms": round(percentile(ordered, p) * 1000, 2)
+            for p in (50, 95, 99)
+        },
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+    }
+
+
+def summarize(samples: Dict[str, Samples], seconds: float) -> dict:
+    routes = {
+        name: {"route": OPERATIONS[name].route}
+        | latency_summary(s.latencies, s.errors, seconds)
+        for name, s in sorted(samples.items())
+    }
+    total = latency_summary(
+        [x for s in samples.values() for x in s.latencies],
+        sum(s.errors for s in samples.values()),
+        seconds,
+    )
+    return {"routes": routes, "total": total}
+
+
+def git_commit() -> dict:
+    def git(*args) -> str:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=False
+        ).stdout.strip()
+
+    return {"commit": git("rev-parse", "--short", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def spawned_server(args) -> Iterator[Tuple[str, str]]:
+    """Load the data set and serve it with uvicorn for the duration of the run."""
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    database_url = args.database_url or f"sqlite:///{workdir}/load.db"
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "LOG_FILE": os.path.join(workdir, "app.log"),
+        "INIT_ON_STARTUP": "true",
+        # Scheduled jobs would change the data set mid-run: archival moves
+        # sold vehicles out of the listing, so runs are not comparable.
+        "ARCHIVE_INTERVAL_SECONDS": "0",
+        "CHANGES_PURGE_INTERVAL_SECONDS": "0",
+    }
+    for assignment in args.env:
+        name, _, value = assignment.partition("=")
+        env[name] = value
+
+    subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.load_data",
+            "--brands", str(args.brands),
+            "--vehicles", str(args.vehicles),
+            "--seed", str(args.seed),
+        ],
+        env=env,
+        check=True,
+    )
+    port = free_port()
+    server_log = open(os.path.join(workdir, "server.log"), "wb")
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--workers", str(args.workers),
+            "--log-level", "warning",
+            "--no-access-log",
+        ],
+        env=env,
+        stdout=server_log,
+        stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base_url, server)
+        yield base_url, database_url
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        server_log.close()
+
+
+def wait_ready(base_url: str, server: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"Server exited with status {server.returncode}, see its server.log")
+        try:
+            if httpx.get(f"{base_url}{API}/brands/?size=1", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("Server did not become ready")
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{report['scenario']} x{report['concurrency']} for {report['seconds']}s on "
+        f"{report['dataset']['vehicles']} vehicles / {report['dataset']['brands']} brands "
+        f"({report['database']}, commit {report['git']['commit']}"
+        f"{'+dirty' if report['git']['dirty'] else ''})"
+    )
+    print(
+        f"{'operation':<14} {'route':<26} {'requests':>8} {'errors':>6} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    rows = list(report["routes"].items()) + [("total", {"route": ""} | report["total"])]
+    for name, r in rows:
+        print(
+            f"{name:<14} {r['route']:<26} {r['requests']:>8} {r['errors']:>6} {r['rps']:>8.1f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+        )
+
+
+def print_comparison(before: dict, after: dict) -> None:
+    for key in ("scenario", "concurrency", "dataset", "database"):
+        if before.get(key) != after.get(key):
+            print(f"warning: {key} differs ({before.get(key)} -> {after.get(key)})")
+
+    def change(old: float, new: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"\nagainst {before['git']['commit']}:")
+    print(f"{'operation':<14} {'req/s':>20} {'':>8} {'p95 ms':>18} {'':>8}")
+    names = sorted(set(before["routes"]) & set(after["routes"])) + ["total"]
+    for name in names:
+        old = before["total"] if name == "total" else before["routes"][name]
+        new = after["total"] if name == "total" else after["routes"][name]
+        print(
+            f"{name:<14} {old['rps']:>9.1f} -> {new['rps']:>7.1f} {change(old['rps'], new['rps']):>8} "
+            f"{old['p95_ms']:>7.2f} -> {new['p95_ms']:>7.2f} {change(old['p95_ms'], new['p95_ms']):>8}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-url", default="http://localhost:8005")
+    parser.add_argument("--spawn", action="store_true", help="Load data and start a server")
+    parser.add_argument("--database-url", help="With --spawn; defaults to a temporary SQLite file")
+    parser.add_argument("--brands", type=int, default=100, help="With --spawn")
+    parser.add_argument("--vehicles", type=int, default=50_000, help="With --spawn")
+    parser.add_argument("--workers", type=int, default=1, help="With --spawn")
+    parser.add_argument(
+        "--env", action="append", default=[], metavar="NAME=VALUE",
+        help="With --spawn, extra server settings, e.g. VEHICLE_CACHE_BACKEND=none",
+    )
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--compare", help="Earlier JSON report to compare with")
+    args = parser.parse_args()
+
+    if args.spawn:
+        with spawned_server(args) as (base_url, database_url):
+            results = asyncio.run(run(args, base_url))
+    else:
+        base_url, database_url = args.base_url, os.environ.get("DATABASE_URL", "unknown")
+        results = asyncio.run(run(args, base_url))
+
+    report = {
+        "scenario": args.scenario,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "database": make_url(database_url).get_backend_name() if "://" in database_url else database_url,
+        "git": git_commit(),
+        "python": platform.python_version(),
+    } | results
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
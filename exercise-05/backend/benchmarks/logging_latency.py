@@ -0,0 +1,84 @@
+"""Compare request latency with logging off, with handlers writing on the
+request thread, and with the queue-based pipeline.
+
+Runs against a throwaway SQLite database through the test client, so the
+numbers include routing and serialization but not the network.
+
+    python -m benchmarks.logging_latency --requests 2000
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+workdir = tempfile.mkdtemp(prefix="bench_logging_")
+os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+os.environ["LOG_FILE"] = os.path.join(workdir, "app.log")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.logger import TEXT_FORMAT, logger  # noqa: E402
+from app.main import app  # noqa: E402
+
+PATH = "/api/brands/resolve?name=Toyota"
+
+
+def measure(client: TestClient, requests: int) -> list:
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.get(PATH)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def synchronous_handlers() -> list:
+    """The pre-queue setup: formatting and file writes on the request thread."""
+    formatter = logging.Formatter(TEXT_FORMAT)
+    handlers = [
+        logging.StreamHandler(open(os.devnull, "w")),
+        logging.FileHandler(os.path.join(workdir, "sync.log")),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    queued = list(logger.handlers)
+    # Keep console output out of the queued run too, so only the request
+    # path differs between modes.
+    for handler in logger.listener.handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setStream(open(os.devnull, "w"))
+
+    modes = {
+        "off": lambda: setattr(logger, "disabled", True),
+        "sync": lambda: setattr(logger, "handlers", synchronous_handlers()),
+        "queue": lambda: setattr(logger, "handlers", queued),
+    }
+    with TestClient(app) as client:
+        measure(client, 100)
+        print(f"{'mode':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+        for mode, configure in modes.items():
+            logger.disabled = False
+            configure()
+            samples = measure(client, args.requests)
+            quantiles = statistics.quantiles(samples, n=100)
+            print(
+                f"{mode:<8} {quantiles[49]:>8.3f} {quantiles[94]:>8.3f} "
+                f"{quantiles[98]:>8.3f} {len(samples) / (sum(samples) / 1000):>8.0f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
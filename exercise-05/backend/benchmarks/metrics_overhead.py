@@ -0,0 +1,94 @@
+"""Measure what the metrics middleware adds to a request.
+
+Calls a minimal ASGI app directly, with and without MetricsMiddleware, so the
+difference is the middleware alone. Also times raw collector updates from
+one and several threads, and rendering /metrics with many series.
+
+    python -m benchmarks.metrics_overhead --requests 100000
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+
+from app.core.metrics import MetricsRegistry, registry
+from app.core.middleware import MetricsMiddleware
+
+
+class FakeRoute:
+    path_format = "/api/vehicles/{id}"
+
+
+async def endpoint(scope, receive, send):
+    scope["route"] = FakeRoute()
+    scope["path_params"] = {"id": 1}
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b'{"id": 1}'})
+
+
+async def drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        scope = {"type": "http", "method": "GET", "path": "/api/vehicles/1", "headers": []}
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def updates_per_second(threads: int, per_thread: int) -> float:
+    local = MetricsRegistry()
+    histogram = local.histogram("h", "h", ("route",))
+    counter = local.counter("c", "c", ("route", "status"))
+
+    def work():
+        for i in range(per_thread):
+            histogram.observe(("/a",), i % 100 / 1000)
+            counter.inc(("/a", "200"))
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * per_thread * 2 / (time.perf_counter() - started)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--series", type=int, default=200)
+    args = parser.parse_args()
+
+    bare = asyncio.run(drive(endpoint, args.requests))
+    measured = asyncio.run(drive(MetricsMiddleware(endpoint), args.requests))
+    print(f"request without middleware   {bare:8.2f} us")
+    print(f"request with middleware      {measured:8.2f} us  (+{measured - bare:.2f} us)")
+
+    for threads in (1, 4):
+        rate = updates_per_second(threads, 200_000 // threads)
+        print(f"collector updates, {threads} thread{'s' if threads > 1 else ' '} {rate:10.0f} /s")
+
+    registry.clear()
+    for i in range(args.series):
+        for metric in (registry.metrics["http_request_duration_seconds"], registry.metrics["http_response_size_bytes"]):
+            metric.observe(("GET", f"/route/{i}"), 0.01)
+        registry.metrics["http_requests_total"].inc(("GET", f"/route/{i}", "200"))
+    started = time.perf_counter()
+    text = registry.render()
+    print(
+        f"render {args.series} routes           {(time.perf_counter() - started) * 1000:8.2f} ms"
+        f"  ({len(text.splitlines())} lines)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Compare list serialization before and after the direct path, and the
+cost and effect of compressing the result, for 100- and 1000-item pages.
+
+Serialization is timed in-process on vehicle rows loaded from a throwaway
+SQLite database. Every path builds the items the way the route does:
+
+- response model + json: the page is validated against the response model,
+  dumped to Python objects and encoded with ``json``, which is what FastAPI
+  versions older than the installed one do with a returned model
+- response model + pydantic: validated again, then serialized to bytes by
+  pydantic, as recent FastAPI versions do
+- direct: ``model_dump_json`` on the page, what the list routes now return
+
+The API caps ``size`` at 100, so the end-to-end request is only measured
+at that size.
+
+    python -m benchmarks.serialization --repeat 50
+"""
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+workdir = tempfile.mkdtemp(prefix="bench_serialization_")
+os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+os.environ["LOG_FILE"] = os.path.join(workdir, "app.log")
+os.environ["VEHICLE_CACHE_BACKEND"] = "none"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from fastapi_pagination import Page, Params  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.logger import logger  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.vehicle import Vehicle  # noqa: E402
+from app.routers.vehicle import to_vehicle_response  # noqa: E402
+from app.schemas.vehicle import VehicleResponse  # noqa: E402
+
+ROWS = 1000
+page_adapter = TypeAdapter(Page[VehicleResponse])
+
+
+def populate() -> None:
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.execute(
+            insert(Vehicle),
+            [
+                {
+                    "model": f"Model {i}",
+                    "brand_id": i % 50 + 1,
+                    "color": "Blue",
+                    "year": 2000 + i % 25,
+                    "description": "A vehicle used to measure serialization",
+                    "is_sold": i % 2 == 0,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(ROWS)
+            ],
+        )
+        db.commit()
+
+
+def route_items(db, vehicles):
+    return [to_vehicle_response(db, v) for v in vehicles]
+
+
+def make_page(items):
+    return Page.create(items, Params(page=1, size=100), total=len(items))
+
+
+def model_json(db, vehicles) -> bytes:
+    page = page_adapter.validate_python(make_page(route_items(db, vehicles)))
+    return json.dumps(page_adapter.dump_python(page, mode="json")).encode()
+
+
+def model_pydantic(db, vehicles) -> bytes:
+    page = page_adapter.validate_python(make_page(route_items(db, vehicles)))
+    return page_adapter.dump_json(page)
+
+
+def direct(db, vehicles) -> bytes:
+    return make_page(route_items(db, vehicles)).model_dump_json().encode()
+
+
+def timed(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    logger.disabled = True
+    with TestClient(app) as client:
+        populate()
+        db = SessionLocal()
+        vehicles = db.query(Vehicle).order_by(Vehicle.id).all()
+
+        print(f"{'items':>5} {'path':<26} {'median ms':>10}")
+        for size in (100, 1000):
+            rows = vehicles[:size]
+            for name, func in (
+                ("response model + json", model_json),
+                ("response model + pydantic", model_pydantic),
+                ("direct", direct),
+            ):
+                ms = timed(lambda: func(db, rows), args.repeat)
+                print(f"{size:>5} {name:<26} {ms:>10.2f}")
+
+        print(f"\n{'items':>5} {'encoding':<10} {'bytes':>9} {'ms':>7}")
+        codecs = [("identity", lambda b: b), ("gzip-6", lambda b: gzip.compress(b, 6))]
+        if brotli is not None:
+            codecs.append(("br-4", lambda b: brotli.compress(b, quality=4)))
+        for size in (100, 1000):
+            body = direct(db, vehicles[:size])
+            for name, compress in codecs:
+                ms = timed(lambda: compress(body), args.repeat)
+                print(f"{size:>5} {name:<10} {len(compress(body)):>9} {ms:>7.2f}")
+
+        print("\nGET /api/vehicles/?size=100")
+        for encoding in ("identity", "gzip", "br"):
+            ms = timed(
+                lambda: client.get("/api/vehicles/?size=100", headers={"Accept-Encoding": encoding}),
+                args.repeat,
+            )
+            print(f"      {encoding:<10} {ms:>7.2f} ms")
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
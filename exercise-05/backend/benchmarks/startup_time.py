@@ -0,0 +1,72 @@
+"""Measure worker cold-start time: importing the app and running its
+startup (lifespan) against a fresh and an already initialized database.
+
+Each sample is a new interpreter, as an autoscaled worker would be.
+
+    python -m benchmarks.startup_time --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(app)
+ready = time.perf_counter()
+client.__enter__()
+booted = time.perf_counter()
+client.__exit__(None, None, None)
+print(json.dumps({"import": imported - started, "startup": booted - ready}))
+"""
+
+
+def sample(env: dict) -> dict:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process"] = time.perf_counter() - started
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{workdir}/bench.db",
+        "LOG_FILE": os.path.join(workdir, "app.log"),
+    }
+
+    first = sample(env)
+    warm = [sample(env) for _ in range(args.runs)]
+
+    print(f"{'':<22} {'import ms':>10} {'startup ms':>11} {'process ms':>11}")
+    print(
+        f"{'fresh database':<22} {first['import'] * 1000:>10.1f} "
+        f"{first['startup'] * 1000:>11.1f} {first['process'] * 1000:>11.1f}"
+    )
+    medians = {k: statistics.median(s[k] for s in warm) * 1000 for k in first}
+    print(
+        f"{'initialized (median)':<22} {medians['import']:>10.1f} "
+        f"{medians['startup']:>11.1f} {medians['process']:>11.1f}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())